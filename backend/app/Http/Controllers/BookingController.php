@@ -4,11 +4,19 @@
 
 use App\Models\Booking;
 use App\Models\Costume;
+use Illuminate\Database\DetectsConcurrencyErrors;
+use Illuminate\Database\QueryException;
 use Illuminate\Http\Request;
+use Illuminate\Support\Facades\DB;
 use Illuminate\Support\Str;
 
 class BookingController extends Controller
 {
+    use DetectsConcurrencyErrors;
+
+    // Tries for a booking transaction that loses a lock race before the client is told to retry
+    const BOOKING_ATTEMPTS = 3;
+
     public function index()
     {
         $bookings = Booking::where('user_email', auth()->user()->email)
@@ -22,18 +30,49 @@ public function store(Request $request)
     {
         $request->validate([
             'costume_id' => 'required|string',
-            'start_date' => 'required|string',
-            'end_date' => 'required|string',
+            'start_date' => 'required|string|date_format:Y-m-d',
+            'end_date' => 'required|string|date_format:Y-m-d|after_or_equal:start_date',
             'size' => 'required|string',
             'notes' => 'nullable|string',
         ]);
 
-        $costume = Costume::where('id', $request->costume_id)->first();
+        try {
+            return DB::transaction(fn () => $this->book($request), self::BOOKING_ATTEMPTS);
+        } catch (QueryException $e) {
+            // e.g. SQLite's "database is locked" once busy_timeout runs out on every attempt
+            if (!$this->causedByConcurrencyError($e)) {
+                throw $e;
+            }
+
+            return response()->json(['error' => 'This costume is being booked by someone else, please try again'], 409);
+        }
+    }
+
+    /**
+     * Check availability and insert, inside the caller's transaction. Competing
+     * bookings run one at a time: MySQL and Postgres lock the costume row, and
+     * the sqlite connection begins transactions IMMEDIATE, taking the database
+     * write lock up front (config/database.php).
+     */
+    protected function book(Request $request)
+    {
+        $costume = Costume::where('id', $request->costume_id)->lockForUpdate()->first();
 
         if (!$costume) {
             return response()->json(['error' => 'Costume not found'], 404);
         }
 
+        $alreadyBooked = Booking::where('costume_id', $costume->id)
+            ->where('size', $request->size)
+            ->where('status', '!=', 'cancelled')
+            ->where('start_date', '<=', $request->end_date)
+            ->where('end_date', '>=', $request->start_date)
+            ->exists();
+
+        if ($alreadyBooked) {
+            return response()->json(['error' => 'This size is already booked for the selected dates'], 409);
+        }
+
         $booking = Booking::create([
             'id' => Str::uuid(),
             'user_email' => auth()->user()->email,
@@ -58,6 +97,48 @@ public function adminIndex()
         return response()->json($bookings);
     }
 
+    /**
+     * Counts, rental days and revenue (price_per_day x rental days, nothing
+     * for cancelled bookings) by status, category, costume and start day.
+     */
+    public function summary(Request $request)
+    {
+        $request->validate([
+            'from' => 'nullable|date_format:Y-m-d',
+            'to' => 'nullable|date_format:Y-m-d|after_or_equal:from',
+            'costume_limit' => 'integer|min:1|max:1000',
+        ]);
+
+        // Both the start and the end date are rental days; the dates are stored as Y-m-d strings
+        $days = match (DB::connection()->getDriverName()) {
+            'sqlite' => 'cast(julianday(bookings.end_date) - julianday(bookings.start_date) as integer) + 1',
+            'pgsql' => 'cast(bookings.end_date as date) - cast(bookings.start_date as date) + 1',
+            'sqlsrv' => 'datediff(day, bookings.start_date, bookings.end_date) + 1',
+            default => 'datediff(bookings.end_date, bookings.start_date) + 1',
+        };
+        $revenue = "case when bookings.status = 'cancelled' then 0 else ({$days}) * coalesce(costumes.price_per_day, 0) end";
+        $measures = "count(*) as bookings, coalesce(sum({$days}), 0) as rental_days, round(coalesce(sum({$revenue}), 0), 2) as revenue";
+
+        $bookings = fn () => DB::table('bookings')
+            ->leftJoin('costumes', 'costumes.id', '=', 'bookings.costume_id')
+            ->when($request->from, fn ($query, $from) => $query->where('bookings.start_date', '>=', $from))
+            ->when($request->to, fn ($query, $to) => $query->where('bookings.start_date', '<=', $to));
+
+        return response()->json([
+            'range' => ['from' => $request->from, 'to' => $request->to],
+            'totals' => $bookings()->selectRaw($measures)->first(),
+            'by_status' => $bookings()->selectRaw("bookings.status, {$measures}")
+                ->groupBy('bookings.status')->orderBy('bookings.status')->get(),
+            'by_category' => $bookings()->selectRaw("costumes.category, {$measures}")
+                ->groupBy('costumes.category')->orderByDesc('revenue')->get(),
+            'by_costume' => $bookings()->selectRaw("bookings.costume_id, max(bookings.costume_name) as costume_name, {$measures}")
+                ->groupBy('bookings.costume_id')->orderByDesc('revenue')->orderBy('bookings.costume_id')
+                ->limit($request->integer('costume_limit', 50))->get(),
+            'by_day' => $bookings()->selectRaw("bookings.start_date as date, {$measures}")
+                ->groupBy('bookings.start_date')->orderBy('bookings.start_date')->get(),
+        ]);
+    }
+
     public function updateStatus(Request $request, $id)
     {
         $request->validate([
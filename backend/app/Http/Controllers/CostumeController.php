@@ -3,25 +3,62 @@
 namespace App\Http\Controllers;
 
 use App\Models\Costume;
+use App\Services\CostumeSearch;
 use Illuminate\Http\Request;
+use Illuminate\Support\Facades\Cache;
 use Illuminate\Support\Str;
 
 class CostumeController extends Controller
 {
+    // Seconds a cached list or detail response is served before it is rebuilt
+    const CACHE_TTL = 60;
+
     public function index(Request $request)
     {
+        if (str_contains($request->header('Accept', ''), 'application/x-ndjson')) {
+            return $this->listing($request);
+        }
+
+        // Costume writes bump the list version, which retires every cached list at once
+        $params = $request->only(['category', 'search', 'limit', 'cursor']);
+        ksort($params);
+        $key = 'costumes:list:'.Cache::get('costumes:list-version', 0).':'.md5(json_encode($params));
+
+        return $this->cachedJson($request, $key, fn () => $this->listing($request));
+    }
+
+    protected function listing(Request $request)
+    {
+        if ($request->filled('search')) {
+            return $this->search($request);
+        }
+
         $query = Costume::query();
 
         if ($request->has('category')) {
             $query->where('category', $request->category);
         }
 
-        if ($request->has('search')) {
-            $search = $request->search;
-            $query->where(function ($q) use ($search) {
-                $q->where('name', 'like', "%{$search}%")
-                  ->orWhere('description', 'like', "%{$search}%");
-            });
+        // Keyset order on the primary key so pages and streams stay stable while rows are added
+        if (str_contains($request->header('Accept', ''), 'application/x-ndjson')) {
+            return response()->stream(function () use ($query) {
+                foreach ($query->lazyById(500) as $costume) {
+                    echo $costume->toJson(), "\n";
+                    flush();
+                }
+            }, 200, [
+                'Content-Type' => 'application/x-ndjson',
+                'X-Accel-Buffering' => 'no',
+            ]);
+        }
+
+        if ($request->has('limit') || $request->has('cursor')) {
+            $request->validate([
+                'limit' => 'integer|min:1|max:1000',
+                'cursor' => 'string',
+            ]);
+
+            return response()->json($query->orderBy('id')->cursorPaginate($request->integer('limit', 100)));
         }
 
         $costumes = $query->get();
@@ -29,15 +66,120 @@ public function index(Request $request)
         return response()->json($costumes);
     }
 
-    public function show($id)
+    /**
+     * Ranked search through the costume_search_terms index, as a full list,
+     * a page after a {score, id} cursor, or an NDJSON stream.
+     */
+    protected function search(Request $request)
     {
-        $costume = Costume::where('id', $id)->first();
+        $request->validate([
+            'limit' => 'integer|min:1|max:1000',
+            'cursor' => 'string',
+        ]);
 
-        if (!$costume) {
-            return response()->json(['error' => 'Costume not found'], 404);
+        if (str_contains($request->header('Accept', ''), 'application/x-ndjson')) {
+            $ranked = $this->rankedCostumes(CostumeSearch::rank($request->search, $request->category));
+
+            return response()->stream(function () use ($ranked) {
+                foreach ($ranked as [$score, $costume]) {
+                    echo $costume->toJson(), "\n";
+                    flush();
+                }
+            }, 200, [
+                'Content-Type' => 'application/x-ndjson',
+                'X-Accel-Buffering' => 'no',
+            ]);
         }
 
-        return response()->json($costume);
+        if (!$request->has('limit') && !$request->has('cursor')) {
+            $ranked = $this->rankedCostumes(CostumeSearch::rank($request->search, $request->category));
+
+            return response()->json(array_map(fn ($result) => $result[1], iterator_to_array($ranked, false)));
+        }
+
+        $after = $request->filled('cursor') ? json_decode(base64_decode($request->cursor), true) : null;
+        if ($request->filled('cursor') && !isset($after['score'], $after['id'])) {
+            return response()->json(['error' => 'Invalid cursor'], 422);
+        }
+
+        // One extra result says whether there is a next page
+        $limit = $request->integer('limit', 100);
+        $scores = CostumeSearch::rank($request->search, $request->category, $limit + 1, $after);
+        $hasMore = count($scores) > $limit;
+        $page = [];
+        $position = null;
+        foreach ($this->rankedCostumes(array_slice($scores, 0, $limit, true)) as [$score, $costume]) {
+            $page[] = $costume;
+            $position = ['score' => $score, 'id' => $costume->id];
+        }
+
+        return response()->json([
+            'data' => $page,
+            'per_page' => $limit,
+            'next_cursor' => $hasMore ? base64_encode(json_encode($position)) : null,
+        ]);
+    }
+
+    /**
+     * Yield [score, costume] in rank order, loading costumes a chunk of ids at a time.
+     */
+    protected function rankedCostumes(array $scores)
+    {
+        foreach (array_chunk(array_keys($scores), 500) as $ids) {
+            $costumes = Costume::whereIn('id', $ids)->get()->keyBy('id');
+
+            foreach ($ids as $id) {
+                if (isset($costumes[$id])) {
+                    yield [$scores[$id], $costumes[$id]];
+                }
+            }
+        }
+    }
+
+    public function show(Request $request, $id)
+    {
+        $key = "costumes:{$id}:".Cache::get("costumes:{$id}:version", 0);
+
+        return $this->cachedJson($request, $key, function () use ($id) {
+            $costume = Costume::where('id', $id)->first();
+
+            if (!$costume) {
+                return response()->json(['error' => 'Costume not found'], 404);
+            }
+
+            return response()->json($costume);
+        });
+    }
+
+    /**
+     * Serve a JSON response from the cache, building and storing it on a miss.
+     * Only 200s are cached; clients revalidate with If-None-Match.
+     */
+    protected function cachedJson(Request $request, string $key, callable $respond)
+    {
+        $body = Cache::get($key);
+        $hit = $body !== null;
+
+        if (!$hit) {
+            $response = $respond();
+            if ($response->getStatusCode() !== 200) {
+                return $response;
+            }
+            $body = $response->getContent();
+            Cache::put($key, $body, self::CACHE_TTL);
+        }
+
+        $headers = [
+            'ETag' => '"'.sha1($body).'"',
+            'Cache-Control' => 'no-cache',
+            'X-Cache' => $hit ? 'HIT' : 'MISS',
+        ];
+
+        if (in_array($headers['ETag'], $request->getETags(), true)) {
+            return response('', 304, $headers);
+        }
+
+        return response($body, 200, $headers + ['Content-Type' => 'application/json']);
     }
 
     public function store(Request $request)
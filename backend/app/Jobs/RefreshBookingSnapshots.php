@@ -0,0 +1,76 @@
+<?php
+
+namespace App\Jobs;
+
+use App\Models\Booking;
+use App\Models\Costume;
+use App\Models\User;
+use Illuminate\Contracts\Queue\ShouldQueue;
+use Illuminate\Foundation\Queue\Queueable;
+
+/**
+ * Copy a renamed costume's or user's current name onto their bookings.
+ *
+ * This job is the authoritative refresh for the Laravel backend's own
+ * database; scripts/refresh_booking_snapshots.py does the same for the
+ * MongoDB store and never sees writes made here.
+ */
+class RefreshBookingSnapshots implements ShouldQueue
+{
+    use Queueable;
+
+    // Bookings updated per statement, so a popular costume never holds a long write lock
+    const CHUNK_SIZE = 500;
+
+    /**
+     * @param  string  $source  'costumes' or 'users'
+     * @param  string|null  $previousKey  a user's email before the change, when it changed
+     */
+    public function __construct(
+        public string $source,
+        public string $id,
+        public ?string $previousKey = null,
+    ) {
+    }
+
+    public function handle(): void
+    {
+        // Current values are read when the job runs, so a late job never restores an older name
+        if ($this->source === 'costumes') {
+            $costume = Costume::find($this->id);
+            if ($costume) {
+                $this->refresh('costume_id', $costume->id, ['costume_name' => $costume->name]);
+            }
+
+            return;
+        }
+
+        $user = User::find($this->id);
+        if ($user) {
+            // Bookings are keyed by email, so an email change moves them along with the name
+            $this->refresh('user_email', $this->previousKey ?? $user->email, [
+                'user_email' => $user->email,
+                'user_name' => $user->name,
+            ]);
+        }
+    }
+
+    protected function refresh(string $column, string $key, array $values): void
+    {
+        do {
+            // Only stale rows match, and each pass fixes them, so the loop always ends
+            $ids = Booking::where($column, $key)
+                ->where(function ($query) use ($values) {
+                    foreach ($values as $field => $value) {
+                        $query->orWhere($field, '!=', $value);
+                    }
+                })
+                ->limit(self::CHUNK_SIZE)
+                ->pluck('id');
+
+            if ($ids->isNotEmpty()) {
+                Booking::whereIn('id', $ids)->update($values);
+            }
+        } while ($ids->count() === self::CHUNK_SIZE);
+    }
+}
@@ -2,8 +2,12 @@
 
 namespace App\Models;
 
+use App\Jobs\RefreshBookingSnapshots;
+use App\Services\CostumeSearch;
 use Illuminate\Database\Eloquent\Factories\HasFactory;
 use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Str;
 
 class Costume extends Model
 {
@@ -31,4 +35,33 @@ class Costume extends Model
         'available' => 'boolean',
         'created_at' => 'datetime',
     ];
+
+    protected static function booted(): void
+    {
+        // Keep the search index and cached responses in step with every write
+        static::saved(function (Costume $costume) {
+            CostumeSearch::index($costume);
+            self::invalidateCache($costume->id);
+            // Bookings keep a copy of the name so admin lists need no join; a queued
+            // job updates them, so a rename never rewrites every booking in the request
+            if ($costume->wasChanged('name')) {
+                RefreshBookingSnapshots::dispatch('costumes', $costume->id)->afterCommit();
+            }
+        });
+        static::deleted(function (Costume $costume) {
+            CostumeSearch::remove($costume->id);
+            self::invalidateCache($costume->id);
+        });
+    }
+
+    /**
+     * Retire the cached detail response of a costume and every cached list.
+     * Versions are replaced rather than incremented: the database store's
+     * increment does nothing for a key that doesn't exist yet.
+     */
+    public static function invalidateCache(string $id): void
+    {
+        Cache::forever("costumes:{$id}:version", (string) Str::ulid());
+        Cache::forever('costumes:list-version', (string) Str::ulid());
+    }
 }
@@ -2,6 +2,7 @@
 
 namespace App\Models;
 
+use App\Jobs\RefreshBookingSnapshots;
 use Illuminate\Database\Eloquent\Factories\HasFactory;
 use Illuminate\Foundation\Auth\User as Authenticatable;
 use Tymon\JWTAuth\Contracts\JWTSubject;
@@ -26,6 +27,18 @@ class User extends Authenticatable implements JWTSubject
         'created_at' => 'datetime',
     ];
 
+    protected static function booted(): void
+    {
+        // Bookings keep a copy of the name, and are found by email, so a queued
+        // job moves them along with either; the original email is still set here
+        static::updated(function (User $user) {
+            if ($user->wasChanged(['name', 'email'])) {
+                RefreshBookingSnapshots::dispatch('users', (string) $user->getKey(), $user->getOriginal('email'))
+                    ->afterCommit();
+            }
+        });
+    }
+
     public function getJWTIdentifier()
     {
         return $this->getKey();
@@ -0,0 +1,278 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\Costume;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Inverted index over costume name, category and description, stored in
+ * costume_search_terms, with ranked prefix and typo-tolerant matching.
+ * search_vocabulary holds each distinct term with its document count, and
+ * search_term_variants its deletion variants for symmetric-delete typo
+ * lookup, as in scripts/search_index.py.
+ */
+class CostumeSearch
+{
+    // Per-occurrence weight of a token in each indexed field
+    const FIELD_WEIGHTS = ['name' => 10, 'category' => 5, 'description' => 2];
+
+    // Score multipliers for query terms that only match by prefix or by typo
+    const PREFIX_WEIGHT = 0.5;
+    const FUZZY_WEIGHT = 0.25;
+
+    // Shorter query terms only match exactly
+    const MIN_PREFIX_LENGTH = 2;
+
+    public static function tokenize(string $text): array
+    {
+        preg_match_all('/[a-z0-9]+/', mb_strtolower($text), $matches);
+
+        return $matches[0];
+    }
+
+    public static function index(Costume $costume): void
+    {
+        $weights = [];
+        foreach (self::FIELD_WEIGHTS as $field => $weight) {
+            foreach (self::tokenize((string) $costume->{$field}) as $token) {
+                $weights[$token] = ($weights[$token] ?? 0) + $weight;
+            }
+        }
+
+        DB::transaction(function () use ($costume, $weights) {
+            self::remove($costume->id);
+            if (!$weights) {
+                return;
+            }
+
+            $terms = array_map('strval', array_keys($weights));
+            DB::table('costume_search_terms')->insert(array_map(fn ($term, $weight) => [
+                'term' => $term,
+                'costume_id' => $costume->id,
+                'weight' => $weight,
+            ], $terms, $weights));
+
+            $known = DB::table('search_vocabulary')->whereIn('term', $terms)->pluck('term')->all();
+            $new = array_values(array_diff($terms, $known));
+            DB::table('search_vocabulary')->insertOrIgnore(array_map(fn ($term) => [
+                'term' => $term,
+                'document_count' => 0,
+            ], $new));
+            DB::table('search_vocabulary')->whereIn('term', $terms)->increment('document_count');
+            self::addVariants($new);
+        });
+    }
+
+    public static function remove(string $costumeId): void
+    {
+        $terms = DB::table('costume_search_terms')->where('costume_id', $costumeId)->pluck('term')->all();
+        if (!$terms) {
+            return;
+        }
+
+        DB::table('costume_search_terms')->where('costume_id', $costumeId)->delete();
+        DB::table('search_vocabulary')->whereIn('term', $terms)->decrement('document_count');
+
+        // Terms no costume uses any more leave the vocabulary, so typo lookups never reach them
+        $unused = DB::table('search_vocabulary')
+            ->whereIn('term', $terms)
+            ->where('document_count', '<=', 0)
+            ->pluck('term')
+            ->all();
+        if ($unused) {
+            DB::table('search_term_variants')->whereIn('term', $unused)->delete();
+            DB::table('search_vocabulary')->whereIn('term', $unused)->delete();
+        }
+    }
+
+    protected static function addVariants(array $terms): void
+    {
+        $rows = [];
+        foreach ($terms as $term) {
+            foreach (self::deletionVariants($term, self::maxEdits($term)) as $variant) {
+                $rows[] = ['variant' => $variant, 'term' => $term];
+            }
+        }
+
+        foreach (array_chunk($rows, 500) as $chunk) {
+            DB::table('search_term_variants')->insertOrIgnore($chunk);
+        }
+    }
+
+    /**
+     * The term as a LIKE pattern literal, with "!" as the escape character, which
+     * needs no quoting in any driver's string literals, unlike a backslash.
+     */
+    protected static function escapeLike(string $term): string
+    {
+        return str_replace(['!', '%', '_'], ['!!', '!%', '!_'], $term);
+    }
+
+    /**
+     * Typos tolerated in a term: none below 4 characters, one below 8, then two.
+     */
+    public static function maxEdits(string $term): int
+    {
+        return strlen($term) < 4 ? 0 : (strlen($term) < 8 ? 1 : 2);
+    }
+
+    /**
+     * The term with up to $edits characters removed, the key for symmetric-delete typo lookup.
+     */
+    public static function deletionVariants(string $term, int $edits): array
+    {
+        $variants = [$term => true];
+        $frontier = [$term => true];
+        for ($round = 0; $round < $edits; $round++) {
+            $next = [];
+            foreach (array_keys($frontier) as $word) {
+                for ($i = 0; $i < strlen($word); $i++) {
+                    $next[substr($word, 0, $i).substr($word, $i + 1)] = true;
+                }
+            }
+            $variants += $next;
+            $frontier = $next;
+        }
+
+        return array_map('strval', array_keys($variants));
+    }
+
+    /**
+     * Levenshtein distance counting an adjacent transposition as one edit.
+     */
+    public static function editDistance(string $a, string $b): int
+    {
+        $previous2 = null;
+        $previous = range(0, strlen($b));
+        for ($i = 1; $i <= strlen($a); $i++) {
+            $current = [$i];
+            for ($j = 1; $j <= strlen($b); $j++) {
+                $cost = $a[$i - 1] === $b[$j - 1] ? 0 : 1;
+                $current[$j] = min($previous[$j] + 1, $current[$j - 1] + 1, $previous[$j - 1] + $cost);
+                if ($i > 1 && $j > 1 && $a[$i - 1] === $b[$j - 2] && $a[$i - 2] === $b[$j - 1]) {
+                    $current[$j] = min($current[$j], $previous2[$j - 2] + 1);
+                }
+            }
+            $previous2 = $previous;
+            $previous = $current;
+        }
+
+        return $previous[strlen($b)];
+    }
+
+    /**
+     * Scores of the costumes matching every query term, as [id => score]
+     * ordered best first with ties broken by id, optionally only in one
+     * category, after an earlier {score, id} position, and at most $limit.
+     * Scoring, filtering and ordering all happen in one grouped query.
+     */
+    public static function rank(string $query, ?string $category = null, ?int $limit = null, ?array $after = null): array
+    {
+        $queryTerms = array_unique(self::tokenize($query));
+        if (!$queryTerms) {
+            return [];
+        }
+
+        // Read per list version, so writes are counted without a count(*) on every search
+        $total = max(Cache::remember(
+            'costumes:count:'.Cache::get('costumes:list-version', 0),
+            3600,
+            fn () => Costume::count()
+        ), 1);
+
+        $matches = null;
+        foreach ($queryTerms as $queryTerm) {
+            $expanded = self::expand($queryTerm);
+            if (!$expanded) {
+                return [];
+            }
+
+            // A costume's score for a query term is its best-scoring expansion
+            $factors = '';
+            $bindings = [];
+            foreach ($expanded as $term => [$multiplier, $documents]) {
+                $factors .= ' when ? then ?';
+                // Rare terms count for more, as in BM25's idf
+                array_push($bindings, (string) $term, $multiplier * log(1 + $total / max($documents, 1)));
+            }
+            $termMatches = DB::table('costume_search_terms')
+                ->select('costume_id')
+                ->selectRaw("max(weight * case term{$factors} end) as score", $bindings)
+                ->whereIn('term', array_map('strval', array_keys($expanded)))
+                ->groupBy('costume_id');
+            $matches = $matches ? $matches->unionAll($termMatches) : $termMatches;
+        }
+
+        // Whole millionths, so a cursor compares equal to the score it was made from
+        $ranked = DB::query()
+            ->fromSub($matches, 'matches')
+            ->select('matches.costume_id')
+            ->selectRaw('round(sum(matches.score) * 1000000) as points')
+            ->groupBy('matches.costume_id')
+            ->havingRaw('count(*) = ?', [count($queryTerms)]);
+        if ($category !== null) {
+            $ranked->join('costumes', 'costumes.id', '=', 'matches.costume_id')
+                ->where('costumes.category', $category);
+        }
+
+        $results = DB::query()->fromSub($ranked, 'ranked');
+        if ($after) {
+            $points = (int) round($after['score'] * 1000000);
+            $results->where(fn ($query) => $query
+                ->where('points', '<', $points)
+                ->orWhere(fn ($query) => $query->where('points', $points)->where('costume_id', '>', (string) $after['id'])));
+        }
+        if ($limit !== null) {
+            $results->limit($limit);
+        }
+
+        $scores = [];
+        foreach ($results->orderByDesc('points')->orderBy('costume_id')->get() as $row) {
+            $scores[$row->costume_id] = $row->points / 1000000;
+        }
+
+        return $scores;
+    }
+
+    /**
+     * Indexed terms a query term matches, as [term => [score multiplier, document count]].
+     */
+    protected static function expand(string $queryTerm): array
+    {
+        $matches = [];
+
+        // LIKE rather than a >= / < range: under a case-insensitive collation such as MySQL's
+        // utf8mb4_unicode_ci, "{" doesn't sort after every letter, so the range loses terms
+        $vocabulary = DB::table('search_vocabulary');
+        if (strlen($queryTerm) >= self::MIN_PREFIX_LENGTH) {
+            $vocabulary->whereRaw("term like ? escape '!'", [self::escapeLike($queryTerm).'%']);
+        } else {
+            $vocabulary->where('term', $queryTerm);
+        }
+        foreach ($vocabulary->pluck('document_count', 'term') as $term => $documents) {
+            $matches[$term] = [(string) $term === $queryTerm ? 1.0 : self::PREFIX_WEIGHT, $documents];
+        }
+
+        // Symmetric delete: a term within $edits typos shares a deletion variant with the query term
+        $edits = self::maxEdits($queryTerm);
+        if ($edits) {
+            $candidates = DB::table('search_term_variants')
+                ->whereIn('variant', self::deletionVariants($queryTerm, $edits))
+                ->distinct()
+                ->pluck('term')
+                ->filter(fn ($term) => !isset($matches[$term]) && self::editDistance($queryTerm, (string) $term) <= $edits)
+                ->map(fn ($term) => (string) $term)
+                ->all();
+            if ($candidates) {
+                $documents = DB::table('search_vocabulary')->whereIn('term', $candidates)->pluck('document_count', 'term');
+                foreach ($documents as $term => $count) {
+                    $matches[$term] = [self::FUZZY_WEIGHT, $count];
+                }
+            }
+        }
+
+        return $matches;
+    }
+}
@@ -37,10 +37,13 @@
             'database' => env('DB_DATABASE', database_path('database.sqlite')),
             'prefix' => '',
             'foreign_key_constraints' => env('DB_FOREIGN_KEYS', true),
-            'busy_timeout' => null,
+            // Writers wait this many milliseconds for the lock instead of failing at once
+            'busy_timeout' => env('DB_BUSY_TIMEOUT', 5000),
             'journal_mode' => null,
             'synchronous' => null,
-            'transaction_mode' => 'DEFERRED',
+            // SQLite has no row locks, so lockForUpdate is a no-op; IMMEDIATE takes the write
+            // lock at BEGIN, which is what serialises competing bookings on this connection
+            'transaction_mode' => env('DB_TRANSACTION_MODE', 'IMMEDIATE'),
         ],
 
         'mysql' => [
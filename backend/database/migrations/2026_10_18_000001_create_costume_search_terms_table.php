@@ -0,0 +1,30 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('costume_search_terms', function (Blueprint $table) {
+            $table->string('term');
+            $table->string('costume_id');
+            $table->float('weight');
+            $table->primary(['term', 'costume_id']);
+            $table->index('costume_id');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('costume_search_terms');
+    }
+};
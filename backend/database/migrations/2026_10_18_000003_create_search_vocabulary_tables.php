@@ -0,0 +1,42 @@
+<?php
+
+use App\Models\Costume;
+use App\Services\CostumeSearch;
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('search_vocabulary', function (Blueprint $table) {
+            $table->string('term')->primary();
+            $table->unsignedInteger('document_count');
+        });
+
+        Schema::create('search_term_variants', function (Blueprint $table) {
+            $table->string('variant');
+            $table->string('term');
+            $table->primary(['variant', 'term']);
+            $table->index('term');
+        });
+
+        // Indexing keeps all three tables in step, so build them together
+        foreach (Costume::lazyById(500) as $costume) {
+            CostumeSearch::index($costume);
+        }
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('search_term_variants');
+        Schema::dropIfExists('search_vocabulary');
+    }
+};
@@ -25,5 +25,6 @@
     Route::delete('/costumes/{id}', [CostumeController::class, 'destroy']);
 
     Route::get('/admin/bookings', [BookingController::class, 'adminIndex']);
+    Route::get('/admin/bookings/summary', [BookingController::class, 'summary']);
     Route::put('/admin/bookings/{id}/status', [BookingController::class, 'updateStatus']);
 });
@@ -1,8 +1,46 @@
 <?php
 
+use App\Models\Costume;
+use App\Services\CostumeSearch;
 use Illuminate\Foundation\Inspiring;
 use Illuminate\Support\Facades\Artisan;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Str;
 
 Artisan::command('inspire', function () {
     $this->comment(Inspiring::quote());
 })->purpose('Display an inspiring quote');
+
+Artisan::command('costumes:import {path : JSON lines of costumes, as scripts/seed_data.py generates them}', function (string $path) {
+    $file = new SplFileObject($path);
+    $count = 0;
+    $rows = [];
+    $import = function (array $rows) {
+        // Per-costume cache versions don't matter on a bulk load; one list version bump follows
+        Costume::withoutEvents(fn () => DB::transaction(function () use ($rows) {
+            foreach ($rows as $row) {
+                CostumeSearch::index(Costume::create($row));
+            }
+        }));
+    };
+
+    foreach ($file as $line) {
+        if (trim($line) === '') {
+            continue;
+        }
+        $rows[] = json_decode($line, true, flags: JSON_THROW_ON_ERROR);
+        if (count($rows) === 500) {
+            $import($rows);
+            $count += count($rows);
+            $rows = [];
+        }
+    }
+    if ($rows) {
+        $import($rows);
+        $count += count($rows);
+    }
+
+    Cache::forever('costumes:list-version', (string) Str::ulid());
+    $this->info("Imported {$count} costumes");
+})->purpose('Bulk load and index costumes, e.g. a synthetic catalog for the search benchmark');
@@ -0,0 +1,88 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\Booking;
+use App\Models\Costume;
+use App\Models\User;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Str;
+use PDO;
+use Tests\TestCase;
+
+class BookingContentionTest extends TestCase
+{
+    protected string $path;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        // Locking needs a database file a second connection can share, not :memory:
+        $this->path = tempnam(sys_get_temp_dir(), 'bookings');
+        config([
+            'database.connections.sqlite.database' => $this->path,
+            'database.connections.sqlite.busy_timeout' => 100,
+        ]);
+        DB::purge('sqlite');
+        $this->artisan('migrate');
+    }
+
+    protected function tearDown(): void
+    {
+        DB::disconnect('sqlite');
+        parent::tearDown();
+        @unlink($this->path);
+    }
+
+    protected function makeCostume(): Costume
+    {
+        return Costume::create([
+            'id' => (string) Str::uuid(),
+            'name' => 'Victorian Era Gown',
+            'description' => 'Period gown',
+            'category' => 'Period',
+            'sizes' => ['M'],
+            'images' => [],
+            'price_per_day' => 50,
+        ]);
+    }
+
+    protected function book(User $user, Costume $costume, string $start, string $end)
+    {
+        return $this->actingAs($user, 'api')->postJson('/api/bookings', [
+            'costume_id' => $costume->id,
+            'start_date' => $start,
+            'end_date' => $end,
+            'size' => 'M',
+        ]);
+    }
+
+    public function test_overlapping_booking_is_rejected_as_a_conflict(): void
+    {
+        $costume = $this->makeCostume();
+        [$first, $second] = User::factory()->count(2)->create();
+
+        $this->book($first, $costume, '2026-03-01', '2026-03-05')->assertStatus(201);
+        $this->book($second, $costume, '2026-03-04', '2026-03-08')->assertStatus(409);
+        $this->book($second, $costume, '2026-03-06', '2026-03-08')->assertStatus(201);
+    }
+
+    public function test_booking_that_cannot_get_the_write_lock_is_a_conflict_not_a_server_error(): void
+    {
+        $costume = $this->makeCostume();
+        $user = User::factory()->create();
+
+        // Another request's transaction, holding the write lock for the whole attempt
+        $competitor = new PDO("sqlite:{$this->path}");
+        $competitor->exec('BEGIN IMMEDIATE');
+        try {
+            $this->book($user, $costume, '2026-03-01', '2026-03-05')->assertStatus(409);
+        } finally {
+            $competitor->exec('ROLLBACK');
+        }
+
+        $this->assertSame(0, Booking::count());
+        $this->book($user, $costume, '2026-03-01', '2026-03-05')->assertStatus(201);
+    }
+}
@@ -0,0 +1,84 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Jobs\RefreshBookingSnapshots;
+use App\Models\Booking;
+use App\Models\Costume;
+use App\Models\User;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Illuminate\Support\Facades\Queue;
+use Illuminate\Support\Str;
+use Tests\TestCase;
+
+class BookingSnapshotTest extends TestCase
+{
+    use RefreshDatabase;
+
+    protected function makeCostume(): Costume
+    {
+        return Costume::create([
+            'id' => (string) Str::uuid(),
+            'name' => 'Victorian Era Gown',
+            'description' => 'Period gown',
+            'category' => 'Period',
+            'sizes' => ['M'],
+            'images' => [],
+            'price_per_day' => 50,
+        ]);
+    }
+
+    protected function makeBooking(Costume $costume, User $user): Booking
+    {
+        return Booking::create([
+            'id' => (string) Str::uuid(),
+            'user_email' => $user->email,
+            'user_name' => $user->name,
+            'costume_id' => $costume->id,
+            'costume_name' => $costume->name,
+            'start_date' => '2026-01-01',
+            'end_date' => '2026-01-03',
+            'size' => 'M',
+        ]);
+    }
+
+    public function test_renames_are_queued_instead_of_updating_bookings_in_the_request(): void
+    {
+        $costume = $this->makeCostume();
+        $user = User::factory()->create();
+        $booking = $this->makeBooking($costume, $user);
+        Queue::fake();
+
+        $costume->update(['name' => 'Edwardian Gown']);
+        $user->update(['name' => 'Renamed User']);
+
+        Queue::assertPushed(RefreshBookingSnapshots::class, 2);
+        $this->assertSame('Victorian Era Gown', $booking->fresh()->costume_name);
+    }
+
+    public function test_job_copies_current_costume_name_onto_bookings(): void
+    {
+        $costume = $this->makeCostume();
+        $user = User::factory()->create();
+        $bookings = collect(range(1, 3))->map(fn () => $this->makeBooking($costume, $user));
+
+        $costume->update(['name' => 'Edwardian Gown']);
+
+        foreach ($bookings as $booking) {
+            $this->assertSame('Edwardian Gown', $booking->fresh()->costume_name);
+        }
+    }
+
+    public function test_email_change_moves_bookings_to_the_new_email(): void
+    {
+        $costume = $this->makeCostume();
+        $user = User::factory()->create(['email' => 'old@example.com']);
+        $booking = $this->makeBooking($costume, $user);
+
+        $user->update(['email' => 'new@example.com', 'name' => 'New Name']);
+
+        $booking->refresh();
+        $this->assertSame('new@example.com', $booking->user_email);
+        $this->assertSame('New Name', $booking->user_name);
+    }
+}
@@ -0,0 +1,73 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\Costume;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Illuminate\Support\Str;
+use Tests\TestCase;
+
+class CostumeCacheTest extends TestCase
+{
+    use RefreshDatabase;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        // The default store in .env.example, whose increment ignores missing keys
+        config(['cache.default' => 'database']);
+    }
+
+    protected function makeCostume(): Costume
+    {
+        return Costume::create([
+            'id' => (string) Str::uuid(),
+            'name' => 'Victorian Era Gown',
+            'description' => 'Original description',
+            'category' => 'Period',
+            'sizes' => ['S', 'M'],
+            'images' => [],
+            'price_per_day' => 50,
+            'available' => true,
+        ]);
+    }
+
+    public function test_updated_costume_is_served_fresh_with_a_new_etag(): void
+    {
+        $costume = $this->makeCostume();
+
+        $before = $this->getJson("/api/costumes/{$costume->id}");
+        $before->assertOk()->assertJsonPath('description', 'Original description');
+        $this->getJson("/api/costumes/{$costume->id}")->assertHeader('X-Cache', 'HIT');
+
+        $costume->update(['description' => 'Updated description']);
+
+        $after = $this->getJson("/api/costumes/{$costume->id}");
+        $after->assertOk()->assertJsonPath('description', 'Updated description');
+        $this->assertNotEquals($before->headers->get('ETag'), $after->headers->get('ETag'));
+    }
+
+    public function test_costume_lists_are_rebuilt_after_a_write(): void
+    {
+        $costume = $this->makeCostume();
+        $this->getJson('/api/costumes')->assertOk()->assertJsonCount(1);
+
+        $costume->delete();
+
+        $this->getJson('/api/costumes')->assertOk()->assertHeader('X-Cache', 'MISS')->assertJsonCount(0);
+    }
+
+    public function test_stale_etag_is_not_revalidated_after_a_write(): void
+    {
+        $costume = $this->makeCostume();
+        $etag = $this->getJson("/api/costumes/{$costume->id}")->headers->get('ETag');
+        $this->getJson("/api/costumes/{$costume->id}", ['If-None-Match' => $etag])->assertStatus(304);
+
+        $costume->update(['name' => 'Edwardian Gown']);
+
+        $this->getJson("/api/costumes/{$costume->id}", ['If-None-Match' => $etag])
+            ->assertOk()
+            ->assertJsonPath('name', 'Edwardian Gown');
+    }
+}
@@ -0,0 +1,85 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\Costume;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Str;
+use Tests\TestCase;
+
+class CostumeSearchTest extends TestCase
+{
+    use RefreshDatabase;
+
+    protected function makeCostume(string $name, string $category = 'Period'): Costume
+    {
+        return Costume::create([
+            'id' => (string) Str::uuid(),
+            'name' => $name,
+            'description' => 'A costume for hire',
+            'category' => $category,
+            'sizes' => ['M'],
+            'images' => [],
+            'price_per_day' => 40,
+            'available' => true,
+        ]);
+    }
+
+    public function test_typos_and_prefixes_match_through_the_vocabulary(): void
+    {
+        $gown = $this->makeCostume('Victorian Gown');
+        $this->makeCostume('Pirate Captain', 'Adventure');
+
+        $this->getJson('/api/costumes?search=victorain')->assertOk()->assertJsonPath('0.id', $gown->id);
+        $this->getJson('/api/costumes?search=vict')->assertOk()->assertJsonCount(1)->assertJsonPath('0.id', $gown->id);
+        $this->getJson('/api/costumes?search=victorian&category=Adventure')->assertOk()->assertJsonCount(0);
+    }
+
+    public function test_prefixes_match_terms_ending_in_any_letter_or_digit(): void
+    {
+        $ids = [
+            $this->makeCostume('Zorro Cape')->id,
+            $this->makeCostume('Zorro9 Mask')->id,
+            $this->makeCostume('Zorroz Hat')->id,
+        ];
+        $this->makeCostume('Pirate Captain', 'Adventure');
+
+        $found = array_column($this->getJson('/api/costumes?search=zorro&limit=10')->assertOk()->json('data'), 'id');
+
+        $this->assertEqualsCanonicalizing($ids, $found);
+    }
+
+    public function test_cursor_pages_cover_every_match_once(): void
+    {
+        $ids = [];
+        foreach (range(1, 5) as $number) {
+            $ids[] = $this->makeCostume("Pirate Outfit {$number}")->id;
+        }
+
+        $seen = [];
+        $cursor = null;
+        do {
+            $page = $this->getJson('/api/costumes?search=pirate&limit=2'.($cursor ? '&cursor='.urlencode($cursor) : ''))
+                ->assertOk()
+                ->json();
+            $seen = array_merge($seen, array_column($page['data'], 'id'));
+            $cursor = $page['next_cursor'];
+        } while ($cursor);
+
+        sort($ids);
+        $this->assertSame($ids, $seen);
+    }
+
+    public function test_deleted_costumes_leave_the_vocabulary(): void
+    {
+        $costume = $this->makeCostume('Steampunk Aviator');
+        $this->assertTrue(DB::table('search_vocabulary')->where('term', 'steampunk')->exists());
+
+        $costume->delete();
+
+        $this->assertFalse(DB::table('search_vocabulary')->where('term', 'steampunk')->exists());
+        $this->assertFalse(DB::table('search_term_variants')->where('term', 'steampunk')->exists());
+        $this->getJson('/api/costumes?search=steampunk')->assertOk()->assertJsonCount(0);
+    }
+}
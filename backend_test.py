@@ -1,12 +1,415 @@
 #!/usr/bin/env python3
 
-import requests
+import argparse
+import asyncio
+import base64
+import contextvars
+import math
+import multiprocessing
+import os
+import random
+import re
+import resource
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
 import sys
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts')
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+# Weighted scenario mix for load mode, roughly the traffic shape of the live site
+LOAD_SCENARIOS = {
+    'login': 1,
+    'list_costumes': 4,
+    'search_costumes': 3,
+    'create_booking': 1,
+    'admin_bookings': 1,
+}
+SEARCH_TERMS = ['dress', 'gown', 'ballet', 'victorian', 'cape', 'fantasy', 'tunic']
+SEARCH_CATEGORIES = ['Period', 'Classical', 'Modern', 'Fantasy']
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+# Raw latencies kept per endpoint in load reports, for comparing runs later
+LOAD_SAMPLE_LIMIT = 2000
+# Search benchmark query mix: kind -> (weight, queries). Whole words, prefixes
+# typed so far, typos and multi-word phrases, roughly as the search box sees them
+SEARCH_QUERY_MIX = {
+    'term': (5, ['dress', 'gown', 'tutu', 'cloak', 'kimono', 'victorian', 'baroque', 'armor']),
+    'prefix': (2, ['dre', 'vic', 'ren', 'corse', 'swa', 'emb']),
+    'typo': (1, ['dres', 'victorain', 'gwon', 'renaisance', 'kimomo', 'baroqe']),
+    'phrase': (2, ['victorian gown', 'swan lake tutu', 'gothic cloak', 'art deco dress', 'silk kimono']),
+}
+SEARCH_PAGE_SIZE = 20
+# Path segments that are record ids (UUIDs, ObjectIds, integers), grouped under one endpoint label
+ID_SEGMENT = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24}|\d+')
+# Times the cache check repeats each hot read
+CACHE_CHECK_ROUNDS = 10
+# Fixed accounts the load token pool logs in, so repeated runs reuse them
+# instead of registering new users
+TOKEN_POOL_ACCOUNTS = 5
+TOKEN_POOL_PASSWORD = "LoadPool123!"
+# The one account every soak pass logs in as, so hours of passes don't register thousands of users
+SOAK_ACCOUNT = {'email': "soak_user@test.com", 'password': TOKEN_POOL_PASSWORD, 'name': "Soak User"}
+# Pooled tokens are refreshed once they have less than this many seconds left
+TOKEN_REFRESH_MARGIN = 120
+# Lifetime assumed for tokens without a readable exp claim
+TOKEN_DEFAULT_TTL = 3600
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'costume-rental-tokens.json')
+# Requests in flight when a test fans out, e.g. over every costume's detail page
+FAN_OUT_CONCURRENCY = 20
+# Listed costumes whose detail page the functional tests check; the full catalog can be tens of thousands
+COSTUME_DETAIL_SAMPLE = 50
+# Ways of reading the whole catalog the catalog benchmark compares
+CATALOG_MODES = ['full', 'paged', 'ndjson']
+# Resource metrics the soak test samples and checks for upward trends
+SOAK_METRICS = ['rss_bytes', 'open_fds', 'threads', 'mongo_connections']
+# Post-warm-up samples needed before a soak metric's trend is judged
+SOAK_MIN_SAMPLES = 12
+# Fraction of its starting level a metric may gain per hour before a rising trend counts as a leak
+SOAK_GROWTH_PER_HOUR = 0.05
+# Unprofiled scenario passes first, so lazy imports and cold caches stay out of the flame graphs
+PROFILE_WARMUP_ITERATIONS = 3
+# Days each profiled booking moves on, so repeated bookings never overlap
+PROFILE_BOOKING_STEP_DAYS = 4
+
+# (test, state it consumes, state it produces). A test starts once every test
+# producing something it consumes has finished; the rest run concurrently.
+TEST_PLAN = [
+    ('test_user_registration', (), ('user_account', 'user_token')),
+    ('test_admin_login', (), ('admin_token',)),
+    ('test_user_login', ('user_account',), ('user_token',)),
+    ('test_get_current_user', ('user_token',), ()),
+    ('test_get_costumes', (), ('listed_costume_ids',)),
+    ('test_search_costumes', (), ()),
+    ('test_costume_pagination', (), ()),
+    ('test_create_costume_admin', ('admin_token',), ('costume_id',)),
+    ('test_get_costume_detail', ('costume_id',), ()),
+    ('test_all_costume_details', ('listed_costume_ids',), ()),
+    ('test_costume_cache', ('admin_token', 'costume_id'), ()),
+    ('test_create_booking', ('user_token', 'costume_id'), ('booking_id',)),
+    ('test_get_user_bookings', ('user_token', 'booking_id'), ()),
+    ('test_get_admin_bookings', ('admin_token', 'booking_id'), ()),
+    ('test_admin_booking_summary', ('admin_token', 'booking_id'), ()),
+    ('test_unauthorized_access', ('user_token',), ()),
+]
+
+
+# Timings of the running test's requests since it last logged a result; each test
+# runs as its own task, so each gets its own list
+PENDING_TIMINGS = contextvars.ContextVar('pending_timings')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class RequestTimer:
+    """httpcore trace hook splitting a request into connect, TLS and server time"""
+
+    def __init__(self):
+        self.events = {}
+
+    async def __call__(self, event_name, info):
+        self.events[event_name] = time.perf_counter()
+
+    def span(self, name):
+        """Seconds between `<name>.started` and `<name>.complete`, matching any protocol prefix"""
+        started = complete = None
+        for event, at in self.events.items():
+            if event.endswith(f"{name}.started"):
+                started = at
+            elif event.endswith(f"{name}.complete"):
+                complete = at
+        if started is None or complete is None:
+            return 0.0
+        return complete - started
+
+    def time_to_first_byte(self):
+        """Seconds from sending the request headers to receiving the response headers"""
+        sent = received = None
+        for event, at in self.events.items():
+            if event.endswith("send_request_headers.started"):
+                sent = at
+            elif event.endswith("receive_response_headers.complete"):
+                received = at
+        if sent is None or received is None:
+            return 0.0
+        return received - sent
+
+    def timings(self, method, endpoint, params, response, total):
+        return {
+            "at": time.time() - total,
+            "endpoint": endpoint_label(method, endpoint, params),
+            "status": response.status_code if response is not None else None,
+            "http_version": response.http_version if response is not None else None,
+            "reused_connection": "connection.connect_tcp.started" not in self.events,
+            # httpcore resolves the host inside connect_tcp without tracing the lookup,
+            # so DNS time can't be told apart and is counted in connect_ms
+            "dns_ms": None,
+            "connect_ms": self.span("connect_tcp") * 1000,
+            "tls_ms": self.span("start_tls") * 1000,
+            "ttfb_ms": self.time_to_first_byte() * 1000,
+            "total_ms": total * 1000,
+            "size_bytes": response.num_bytes_downloaded if response is not None else 0,
+        }
+
+
+def latency_histogram(values_ms):
+    """Count latencies into LATENCY_BUCKETS_MS, keyed by bucket upper bound"""
+    histogram = {f"<={bound}": 0 for bound in LATENCY_BUCKETS_MS}
+    histogram[f">{LATENCY_BUCKETS_MS[-1]}"] = 0
+    for value in values_ms:
+        for bound in LATENCY_BUCKETS_MS:
+            if value <= bound:
+                histogram[f"<={bound}"] += 1
+                break
+        else:
+            histogram[f">{LATENCY_BUCKETS_MS[-1]}"] += 1
+    return histogram
+
+
+def endpoint_stats(timings):
+    """Aggregate per-request timings into per-endpoint distributions"""
+    grouped = defaultdict(list)
+    for timing in timings:
+        grouped[timing['endpoint']].append(timing)
+    
+    stats = {}
+    for label, entries in sorted(grouped.items()):
+        totals = sorted(t['total_ms'] for t in entries)
+        ttfbs = sorted(t['ttfb_ms'] for t in entries)
+        stats[label] = {
+            'requests': len(entries),
+            'errors': sum(1 for t in entries if t['status'] is None or t['status'] >= 400),
+            'mean_ms': sum(totals) / len(totals),
+            'p50_ms': percentile(totals, 50),
+            'p95_ms': percentile(totals, 95),
+            'p99_ms': percentile(totals, 99),
+            'max_ms': totals[-1],
+            'ttfb_p50_ms': percentile(ttfbs, 50),
+            'ttfb_p95_ms': percentile(ttfbs, 95),
+            'bytes': sum(t['size_bytes'] for t in entries),
+            'histogram': latency_histogram(totals),
+        }
+    return stats
+
+
+def latency_samples(results):
+    """Per-endpoint total latencies (ms) from a saved results file, reading the request rows
+    from the results history when the run recorded them there"""
+    samples = defaultdict(list)
+    rows = results.get('requests')
+    if rows is None and results.get('run_id') and results.get('history'):
+        sys.path.insert(0, SCRIPTS_DIR)
+        import results_store
+        
+        rows = results_store.ResultsStore(results['history']).requests(results['run_id'])
+    # Files written before request rows were kept apart hold them per test
+    rows = rows or [timing for result in results.get('results', []) for timing in result.get('timings') or []]
+    for timing in rows:
+        if timing.get('status') is not None and timing['status'] < 400:
+            samples[timing['endpoint']].append(timing['total_ms'])
+    for section in ('load', 'contention'):
+        for label, stats in results.get(section, {}).get('endpoints', {}).items():
+            samples[label].extend(stats.get('samples', []))
+    return samples
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided Mann-Whitney U p-value that `current` latencies are larger than `baseline`"""
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    n1, n2, n = len(current), len(baseline), len(combined)
+    
+    # Average ranks over ties, accumulating the tie correction as we go
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_kendall_increasing(values):
+    """One-sided Mann-Kendall p-value that `values`, in time order, trend upwards"""
+    n = len(values)
+    s = 0
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            s += (values[j] > values[i]) - (values[j] < values[i])
+    
+    ties = Counter(values).values()
+    variance = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties)) / 18
+    if variance <= 0 or s <= 0:
+        return 1.0
+    z = (s - 1) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def sen_slope(times, values):
+    """Median slope over all pairs of points, robust to the odd outlier sample"""
+    slopes = [(values[j] - values[i]) / (times[j] - times[i])
+              for i in range(len(values) - 1) for j in range(i + 1, len(values)) if times[j] > times[i]]
+    return statistics.median(slopes) if slopes else 0.0
+
+
+def leak_trend(times, values, alpha=0.01, threshold=SOAK_GROWTH_PER_HOUR):
+    """Judge whether a sampled metric keeps rising: a significant monotonic trend, material
+    growth per hour, and each third of the run sitting higher than the one before. A
+    one-off step, such as a pool filling up, passes the first two but not the third."""
+    third = len(values) // 3
+    levels = [statistics.median(values[:third]), statistics.median(values[third:-third]),
+              statistics.median(values[-third:])]
+    slope_per_hour = sen_slope(times, values) * 3600
+    growth_per_hour = slope_per_hour / abs(levels[0]) if levels[0] else (math.inf if slope_per_hour > 0 else 0.0)
+    p_value = mann_kendall_increasing(values)
+    rising = p_value < alpha and growth_per_hour > threshold and levels[0] < levels[1] < levels[2]
+    return {
+        'verdict': 'rising' if rising else 'flat',
+        'samples': len(values),
+        'first': values[0],
+        'last': values[-1],
+        'thirds': levels,
+        'slope_per_hour': slope_per_hour,
+        'growth_per_hour': growth_per_hour,
+        'p_value': p_value,
+    }
+
+
+def compare_results(baseline, current, threshold=0.2, alpha=0.01, min_samples=5):
+    """Flag endpoints whose latency is significantly and materially worse than the baseline"""
+    baseline_samples = latency_samples(baseline)
+    current_samples = latency_samples(current)
+    
+    endpoints = {}
+    for label in sorted(set(baseline_samples) & set(current_samples)):
+        before = sorted(baseline_samples[label])
+        after = sorted(current_samples[label])
+        if len(before) < min_samples or len(after) < min_samples:
+            endpoints[label] = {'verdict': 'insufficient samples', 'baseline_n': len(before), 'current_n': len(after)}
+            continue
+        
+        p50_change = percentile(after, 50) / percentile(before, 50) - 1 if percentile(before, 50) else 0.0
+        p95_change = percentile(after, 95) / percentile(before, 95) - 1 if percentile(before, 95) else 0.0
+        p_value = mann_whitney_greater(after, before)
+        regressed = p_value < alpha and max(p50_change, p95_change) > threshold
+        endpoints[label] = {
+            'verdict': 'regression' if regressed else 'ok',
+            'baseline_n': len(before),
+            'current_n': len(after),
+            'baseline_p50_ms': percentile(before, 50),
+            'current_p50_ms': percentile(after, 50),
+            'baseline_p95_ms': percentile(before, 95),
+            'current_p95_ms': percentile(after, 95),
+            'p50_change': p50_change,
+            'p95_change': p95_change,
+            'p_value': p_value,
+        }
+    
+    return {
+        'threshold': threshold,
+        'alpha': alpha,
+        'regressions': sorted(label for label, entry in endpoints.items() if entry['verdict'] == 'regression'),
+        'endpoints': endpoints,
+    }
+
+
+def print_comparison(comparison):
+    print(f"\n📈 Baseline Comparison (threshold {comparison['threshold']:.0%}, alpha {comparison['alpha']}):")
+    if not comparison['endpoints']:
+        print("No endpoints with latency samples in both runs")
+    for label, entry in comparison['endpoints'].items():
+        if entry['verdict'] == 'insufficient samples':
+            print(f"⚪ {label}: insufficient samples ({entry['baseline_n']} vs {entry['current_n']}), not gated")
+            continue
+        icon = "❌" if entry['verdict'] == 'regression' else "✅"
+        print(f"{icon} {label}: p50 {entry['baseline_p50_ms']:.0f}ms → {entry['current_p50_ms']:.0f}ms "
+              f"({entry['p50_change']:+.0%}), p95 {entry['baseline_p95_ms']:.0f}ms → {entry['current_p95_ms']:.0f}ms "
+              f"({entry['p95_change']:+.0%}), p={entry['p_value']:.4f}")
+
+
+def tally_bookings(bookings, costumes, start=None, end=None):
+    """Client-side totals and per-status counts, what the admin page did before the summary endpoint"""
+    prices = {costume['id']: costume.get('price_per_day') or 0 for costume in costumes}
+    totals = {'bookings': 0, 'rental_days': 0, 'revenue': 0.0}
+    by_status = defaultdict(lambda: {'bookings': 0, 'rental_days': 0, 'revenue': 0.0})
+    for booking in bookings:
+        if (start and booking['start_date'] < start) or (end and booking['start_date'] > end):
+            continue
+        days = (datetime.fromisoformat(booking['end_date']) - datetime.fromisoformat(booking['start_date'])).days + 1
+        revenue = 0.0 if booking['status'] == 'cancelled' else days * float(prices.get(booking['costume_id'], 0))
+        for group in (totals, by_status[booking['status']]):
+            group['bookings'] += 1
+            group['rental_days'] += days
+            group['revenue'] += revenue
+    return totals, dict(by_status)
+
+
+def summary_mismatches(summary, bookings, costumes, start=None, end=None):
+    """Differences between the summary endpoint's totals and a client-side tally of the same bookings"""
+    totals, by_status = tally_bookings(bookings, costumes, start, end)
+    expected = {'totals': totals, **{f"status {status}": group for status, group in by_status.items()}}
+    actual = {'totals': summary['totals'], **{f"status {row['status']}": row for row in summary['by_status']}}
+    mismatches = []
+    for name in sorted(set(expected) | set(actual)):
+        want, got = expected.get(name, {}), actual.get(name, {})
+        for measure in ('bookings', 'rental_days', 'revenue'):
+            # Revenue is summed in a different order and rounded to cents server-side
+            if abs(float(want.get(measure, 0)) - float(got.get(measure, 0))) > (0.01 * max(want.get('bookings', 0), 1)):
+                mismatches.append(f"{name} {measure}: expected {want.get(measure, 0)}, got {got.get(measure, 0)}")
+    return mismatches
+
+
+def endpoint_label(method, endpoint, params=None):
+    """Group requests by route and query keys, e.g. 'GET /api/costumes/{id}' or 'GET /api/costumes?search='"""
+    path = "/".join("{id}" if ID_SEGMENT.fullmatch(segment) else segment for segment in endpoint.split("/"))
+    label = f"{method} /api/{path}"
+    if params:
+        label += "?" + "&".join(f"{key}=" for key in sorted(params))
+    return label
+
+
+def error_detail(response):
+    """The API's error detail, or the start of the body when it isn't JSON, e.g. a proxy's HTML 502 page"""
+    if response is None:
+        return "No response"
+    try:
+        body = response.json()
+    except ValueError:
+        return response.text[:200].strip() or 'Unknown error'
+    return body.get('detail', 'Unknown error') if isinstance(body, dict) else 'Unknown error'
+
 
 class CostumeRentalAPITester:
-    def __init__(self, base_url="https://costume-lease.preview.emergentagent.com"):
+    def __init__(self, base_url="https://costume-lease.preview.emergentagent.com", pool_size=10, http2=False,
+                 concurrency=FAN_OUT_CONCURRENCY, detail_sample=COSTUME_DETAIL_SAMPLE):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.user_token = None
@@ -14,6 +417,22 @@ class CostumeRentalAPITester:
         self.tests_run = 0
         self.tests_passed = 0
         self.test_results = []
+        # Only failures are printed when quiet, for long soak runs
+        self.quiet = False
+        
+        # One async client shared by every test; pooled keep-alive connections, so
+        # handshakes are paid once per connection, sized for fan-out batches
+        self.pool_size = max(pool_size, concurrency)
+        self.http2 = http2
+        self.concurrency = concurrency
+        # None checks every listed costume's detail
+        self.detail_sample = detail_sample
+        self.client = httpx.AsyncClient(
+            http2=http2,
+            timeout=10,
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+        self.request_timings = []
         
         # Test data
         self.test_user_email = f"testuser_{datetime.now().strftime('%H%M%S')}@test.com"
@@ -23,14 +442,39 @@ class CostumeRentalAPITester:
         self.admin_email = "admin@theatrical.com"
         self.admin_password = "admin123"
         
+        # Only ever a costume this run created, so tests that modify it never touch catalog data
         self.test_costume_id = None
+        self.listed_costume_ids = []
+        self.test_booking_id = None
+        # How far ahead bookings start; replays move it on so they don't conflict
+        self.booking_days_ahead = 7
+        # Costumes this tester created, so long runs can delete them again
+        self.created_costume_ids = []
+        # endpoint label -> (endpoint, token, params) of a GET that succeeded, for topping up latency samples
+        self.repeatable = {}
+
+    def pending_timings(self):
+        """Timings of this task's requests since its last logged test"""
+        timings = PENDING_TIMINGS.get(None)
+        if timings is None:
+            timings = []
+            PENDING_TIMINGS.set(timings)
+        return timings
+
+    def announce(self, message):
+        if not self.quiet:
+            print(f"\n🔍 {message}")
 
     def log_test(self, name, success, details="", response_data=None):
         """Log test result"""
+        timings = self.pending_timings()
+        PENDING_TIMINGS.set([])
+        
         self.tests_run += 1
         if success:
             self.tests_passed += 1
-            print(f"✅ {name}: PASSED")
+            if not self.quiet:
+                print(f"✅ {name}: PASSED")
         else:
             print(f"❌ {name}: FAILED - {details}")
         
@@ -38,10 +482,11 @@ class CostumeRentalAPITester:
             "test": name,
             "success": success,
             "details": details,
-            "response_data": response_data
+            "response_data": response_data,
+            "timings": timings
         })
 
-    def make_request(self, method, endpoint, data=None, token=None, params=None):
+    async def make_request(self, method, endpoint, data=None, token=None, params=None):
         """Make HTTP request with proper headers"""
         url = f"{self.api_url}/{endpoint}"
         headers = {'Content-Type': 'application/json'}
@@ -49,26 +494,95 @@ class CostumeRentalAPITester:
         if token:
             headers['Authorization'] = f'Bearer {token}'
         
+        timer = RequestTimer()
+        response = None
+        started = time.perf_counter()
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=10)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=10)
-            
+            response = await self.client.request(method, url, json=data, headers=headers, params=params,
+                                                 extensions={'trace': timer})
             return response
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Request failed: {str(e)}")
             return None
+        finally:
+            timing = timer.timings(method, endpoint, params, response, time.perf_counter() - started)
+            self.request_timings.append(timing)
+            self.pending_timings().append(timing)
+            if method == 'GET' and timing['status'] == 200:
+                # A copy, since paging callers reuse their params dict for the next page
+                self.repeatable.setdefault(timing['endpoint'], (endpoint, token, dict(params or {})))
+
+    async def fan_out(self, method, endpoints, check, token=None, limit=None):
+        """Request every endpoint with at most `limit` in flight, returning check(endpoint, response)
+        for each in order; only the checks' results are kept, so big batches stay small in memory"""
+        endpoints = list(endpoints)
+        results = [None] * len(endpoints)
+        remaining = iter(range(len(endpoints)))
+        
+        async def worker():
+            # Workers share one iterator, so each endpoint is taken exactly once
+            for index in remaining:
+                response = await self.make_request(method, endpoints[index], token=token)
+                results[index] = check(endpoints[index], response)
+        
+        await asyncio.gather(*(worker() for _ in range(min(limit or self.concurrency, len(endpoints)))))
+        return results
+
+    def timing_summary(self):
+        """Split recorded request time into connection setup and server time"""
+        timings = self.request_timings
+        return {
+            'requests': len(timings),
+            'new_connections': sum(1 for t in timings if not t['reused_connection']),
+            'connect_ms': sum(t['connect_ms'] for t in timings),
+            'tls_ms': sum(t['tls_ms'] for t in timings),
+            'ttfb_ms': sum(t['ttfb_ms'] for t in timings),
+            'total_ms': sum(t['total_ms'] for t in timings),
+            'bytes': sum(t['size_bytes'] for t in timings),
+            'pool_size': self.pool_size,
+            'http2': self.http2,
+        }
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def iter_costumes(self, page_size=100, params=None):
+        """Yield costumes page by page, following the API's keyset cursor"""
+        query = dict(params or {}, limit=page_size)
+        while True:
+            response = await self.make_request('GET', 'costumes', params=query)
+            if response is None or response.status_code != 200:
+                raise RuntimeError(f"Costume page failed with status {response.status_code if response else 'None'}")
+            page = response.json()
+            if isinstance(page, list):
+                # Servers without pagination ignore limit and send the whole list
+                for costume in page:
+                    yield costume
+                return
+            for costume in page['data']:
+                yield costume
+            if not page.get('next_cursor'):
+                return
+            query['cursor'] = page['next_cursor']
 
-    def test_user_registration(self):
+    async def stream_costumes(self, params=None):
+        """Yield costumes from the NDJSON catalog stream as each line arrives"""
+        headers = {'Accept': 'application/x-ndjson'}
+        async with self.client.stream('GET', f"{self.api_url}/costumes", params=params, headers=headers) as response:
+            response.raise_for_status()
+            if not response.headers.get('content-type', '').startswith('application/x-ndjson'):
+                for costume in json.loads(await response.aread()):
+                    yield costume
+                return
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    async def test_user_registration(self):
         """Test user registration"""
-        print("\n🔍 Testing User Registration...")
+        self.announce("Testing User Registration...")
         
-        response = self.make_request('POST', 'auth/register', {
+        response = await self.make_request('POST', 'auth/register', {
             "email": self.test_user_email,
             "password": self.test_user_password,
             "name": self.test_user_name
@@ -78,21 +592,21 @@ class CostumeRentalAPITester:
             data = response.json()
             if 'access_token' in data and 'user' in data:
                 self.user_token = data['access_token']
-                self.log_test("User Registration", True, response_data=data)
+                self.log_test("User Registration", True)
                 return True
             else:
                 self.log_test("User Registration", False, "Missing token or user data")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("User Registration", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_admin_login(self):
+    async def test_admin_login(self):
         """Test admin login"""
-        print("\n🔍 Testing Admin Login...")
+        self.announce("Testing Admin Login...")
         
-        response = self.make_request('POST', 'auth/login', {
+        response = await self.make_request('POST', 'auth/login', {
             "email": self.admin_email,
             "password": self.admin_password
         })
@@ -101,21 +615,21 @@ class CostumeRentalAPITester:
             data = response.json()
             if 'access_token' in data and data.get('user', {}).get('role') == 'admin':
                 self.admin_token = data['access_token']
-                self.log_test("Admin Login", True, response_data=data)
+                self.log_test("Admin Login", True)
                 return True
             else:
                 self.log_test("Admin Login", False, "Missing token or not admin role")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Admin Login", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_user_login(self):
+    async def test_user_login(self):
         """Test user login with registered user"""
-        print("\n🔍 Testing User Login...")
+        self.announce("Testing User Login...")
         
-        response = self.make_request('POST', 'auth/login', {
+        response = await self.make_request('POST', 'auth/login', {
             "email": self.test_user_email,
             "password": self.test_user_password
         })
@@ -124,66 +638,65 @@ class CostumeRentalAPITester:
             data = response.json()
             if 'access_token' in data:
                 self.user_token = data['access_token']
-                self.log_test("User Login", True, response_data=data)
+                self.log_test("User Login", True)
                 return True
             else:
                 self.log_test("User Login", False, "Missing access token")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("User Login", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_get_current_user(self):
+    async def test_get_current_user(self):
         """Test getting current user info"""
-        print("\n🔍 Testing Get Current User...")
+        self.announce("Testing Get Current User...")
         
         if not self.user_token:
             self.log_test("Get Current User", False, "No user token available")
             return False
         
-        response = self.make_request('GET', 'auth/me', token=self.user_token)
+        response = await self.make_request('GET', 'auth/me', token=self.user_token)
         
         if response and response.status_code == 200:
             data = response.json()
             if 'email' in data and 'name' in data:
-                self.log_test("Get Current User", True, response_data=data)
+                self.log_test("Get Current User", True)
                 return True
             else:
                 self.log_test("Get Current User", False, "Missing user data")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Get Current User", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_get_costumes(self):
+    async def test_get_costumes(self):
         """Test getting costumes list"""
-        print("\n🔍 Testing Get Costumes...")
+        self.announce("Testing Get Costumes...")
         
-        response = self.make_request('GET', 'costumes')
+        response = await self.make_request('GET', 'costumes')
         
         if response and response.status_code == 200:
             data = response.json()
             if isinstance(data, list):
                 self.log_test("Get Costumes", True, f"Found {len(data)} costumes", response_data={"count": len(data)})
-                if len(data) > 0:
-                    self.test_costume_id = data[0].get('id')
+                self.listed_costume_ids = [costume['id'] for costume in data if costume.get('id')]
                 return True
             else:
                 self.log_test("Get Costumes", False, "Response is not a list")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Get Costumes", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_search_costumes(self):
+    async def test_search_costumes(self):
         """Test searching costumes"""
-        print("\n🔍 Testing Search Costumes...")
+        self.announce("Testing Search Costumes...")
         
         # Test search by category
-        response = self.make_request('GET', 'costumes', params={'category': 'Period'})
+        response = await self.make_request('GET', 'costumes', params={'category': 'Period'})
         
         if response and response.status_code == 200:
             data = response.json()
@@ -192,7 +705,7 @@ class CostumeRentalAPITester:
             self.log_test("Search Costumes by Category", False, "Search failed")
         
         # Test search by text
-        response = self.make_request('GET', 'costumes', params={'search': 'dress'})
+        response = await self.make_request('GET', 'costumes', params={'search': 'dress'})
         
         if response and response.status_code == 200:
             data = response.json()
@@ -203,32 +716,173 @@ class CostumeRentalAPITester:
         
         return False
 
-    def test_get_costume_detail(self):
+    async def test_costume_pagination(self):
+        """Test cursor pagination and NDJSON streaming of the catalog"""
+        self.announce("Testing Costume Pagination...")
+        
+        try:
+            paged = [costume['id'] async for costume in self.iter_costumes(page_size=2)]
+            streamed = [costume['id'] async for costume in self.stream_costumes()]
+        except (RuntimeError, httpx.HTTPError, ValueError) as e:
+            self.log_test("Costume Pagination", False, f"Error: {e}")
+            return False
+        
+        if not paged or len(set(paged)) != len(paged):
+            self.log_test("Costume Pagination", False, f"Pages returned {len(paged)} costumes, {len(set(paged))} unique")
+        elif not streamed or len(set(streamed)) != len(streamed):
+            self.log_test("Costume Pagination", False, f"Stream returned {len(streamed)} costumes, {len(set(streamed))} unique")
+        else:
+            self.log_test("Costume Pagination", True, f"{len(paged)} costumes paged, {len(streamed)} streamed",
+                          response_data={"paged": len(paged), "streamed": len(streamed)})
+            return True
+        
+        return False
+
+    async def test_get_costume_detail(self):
         """Test getting costume details"""
-        print("\n🔍 Testing Get Costume Detail...")
+        self.announce("Testing Get Costume Detail...")
         
         if not self.test_costume_id:
             self.log_test("Get Costume Detail", False, "No costume ID available")
             return False
         
-        response = self.make_request('GET', f'costumes/{self.test_costume_id}')
+        response = await self.make_request('GET', f'costumes/{self.test_costume_id}')
         
         if response and response.status_code == 200:
             data = response.json()
             if 'id' in data and 'name' in data:
-                self.log_test("Get Costume Detail", True, response_data=data)
+                self.log_test("Get Costume Detail", True, response_data={"id": data['id']})
                 return True
             else:
                 self.log_test("Get Costume Detail", False, "Missing costume data")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Get Costume Detail", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_create_costume_admin(self):
+    async def test_all_costume_details(self):
+        """Test the first detail_sample listed costumes' details, or every one's, fetched concurrently"""
+        self.announce("Testing All Costume Details...")
+        
+        listed = len(self.listed_costume_ids)
+        costume_ids = self.listed_costume_ids[:self.detail_sample]
+        if not costume_ids:
+            self.log_test("All Costume Details", False, "No costume IDs available")
+            return False
+        
+        def check(endpoint, response):
+            if response is None:
+                return "no response"
+            if response.status_code != 200:
+                return f"status {response.status_code}"
+            data = response.json()
+            if data.get('id') != endpoint.rsplit('/', 1)[-1] or 'name' not in data:
+                return "wrong or incomplete costume"
+            return None
+        
+        started = time.perf_counter()
+        problems = await self.fan_out('GET', [f'costumes/{costume_id}' for costume_id in costume_ids], check)
+        elapsed = time.perf_counter() - started
+        failed = [(costume_id, problem) for costume_id, problem in zip(costume_ids, problems) if problem]
+        
+        result = {"checked": len(costume_ids), "listed": listed, "failed": len(failed), "concurrency": self.concurrency,
+                  "elapsed_ms": elapsed * 1000}
+        if failed:
+            self.log_test("All Costume Details", False,
+                          f"{len(failed)} of {len(costume_ids)} failed: " +
+                          "; ".join(f"{costume_id}: {problem}" for costume_id, problem in failed[:5]),
+                          response_data=result)
+            return False
+        self.log_test("All Costume Details", True,
+                      f"{len(costume_ids)} of {listed} costumes in {elapsed:.2f}s at concurrency {self.concurrency}",
+                      response_data=result)
+        return True
+
+    async def test_costume_cache(self):
+        """Test costume response caching: hit ratio, cold vs warm latency, ETags and no stale reads"""
+        self.announce("Testing Costume Cache...")
+        
+        if not self.admin_token or not self.test_costume_id:
+            self.log_test("Costume Cache", False, "No admin token or costume ID available")
+            return False
+        
+        detail_endpoint = f'costumes/{self.test_costume_id}'
+        response = await self.make_request('GET', detail_endpoint)
+        if not response or response.status_code != 200:
+            self.log_test("Costume Cache", False, f"Status: {response.status_code if response else 'None'}")
+            return False
+        category = response.json().get('category')
+        
+        # Repeat the hottest reads, splitting latencies by the server's X-Cache header
+        reads = [('costumes', None), ('costumes', {'category': category}), (detail_endpoint, None)]
+        latencies = defaultdict(list)
+        for _ in range(CACHE_CHECK_ROUNDS):
+            for endpoint, params in reads:
+                started = time.perf_counter()
+                response = await self.make_request('GET', endpoint, params=params)
+                if not response or response.status_code != 200:
+                    self.log_test("Costume Cache", False, f"GET {endpoint} failed")
+                    return False
+                latencies[response.headers.get('x-cache', 'n/a')].append((time.perf_counter() - started) * 1000)
+        
+        async def listed(costume_id, params=None):
+            response = await self.make_request('GET', 'costumes', params=params)
+            return response is not None and any(c.get('id') == costume_id for c in response.json())
+        
+        stale = []
+        # The costume test_create_costume_admin created must show up despite the warm list caches
+        if not await listed(self.test_costume_id):
+            stale.append("costume missing from list")
+        if not await listed(self.test_costume_id, {'category': category}):
+            stale.append(f"costume missing from {category} list")
+        
+        etag = (await self.make_request('GET', detail_endpoint)).headers.get('etag')
+        if etag:
+            response = await self.client.get(f"{self.api_url}/{detail_endpoint}", headers={'If-None-Match': etag})
+            if response.status_code != 304:
+                stale.append(f"If-None-Match with a current ETag returned {response.status_code}, not 304")
+        
+        # An update has to reach every cached view of the costume
+        marker = f"Cache check {datetime.now().isoformat()}"
+        response = await self.make_request('PUT', detail_endpoint, {'description': marker}, token=self.admin_token)
+        if not response or response.status_code != 200:
+            self.log_test("Costume Cache", False, f"Update failed with status {response.status_code if response else 'None'}")
+            return False
+        if (await self.make_request('GET', detail_endpoint)).json().get('description') != marker:
+            stale.append("stale costume detail after update")
+        for params in (None, {'category': category}):
+            costumes = (await self.make_request('GET', 'costumes', params=params)).json()
+            if not any(c.get('id') == self.test_costume_id and c.get('description') == marker for c in costumes):
+                stale.append(f"stale {(params or {}).get('category', 'full')} list after update")
+        if etag:
+            response = await self.client.get(f"{self.api_url}/{detail_endpoint}", headers={'If-None-Match': etag})
+            if response.status_code != 200:
+                stale.append(f"outdated ETag revalidated with {response.status_code} after update")
+        
+        hits, misses = sorted(latencies['HIT']), sorted(latencies['MISS'])
+        cache = {
+            'hit_ratio': len(hits) / (len(hits) + len(misses)) if hits or misses else None,
+            'cold_p50_ms': percentile(misses, 50) if misses else None,
+            'warm_p50_ms': percentile(hits, 50) if hits else None,
+            'etag': bool(etag),
+            'stale': stale,
+        }
+        if stale:
+            self.log_test("Costume Cache", False, "; ".join(stale), response_data=cache)
+            return False
+        
+        if cache['hit_ratio'] is None:
+            details = "no X-Cache header, hit ratio unknown; no stale reads"
+        else:
+            details = (f"hit ratio {cache['hit_ratio']:.0%}, cold p50 {cache['cold_p50_ms'] or 0:.1f}ms, "
+                       f"warm p50 {cache['warm_p50_ms'] or 0:.1f}ms; no stale reads")
+        self.log_test("Costume Cache", True, details, response_data=cache)
+        return True
+
+    async def test_create_costume_admin(self):
         """Test creating costume as admin"""
-        print("\n🔍 Testing Create Costume (Admin)...")
+        self.announce("Testing Create Costume (Admin)...")
         
         if not self.admin_token:
             self.log_test("Create Costume (Admin)", False, "No admin token available")
@@ -244,33 +898,34 @@ class CostumeRentalAPITester:
             "available": True
         }
         
-        response = self.make_request('POST', 'costumes', costume_data, token=self.admin_token)
+        response = await self.make_request('POST', 'costumes', costume_data, token=self.admin_token)
         
         if response and response.status_code == 200:
             data = response.json()
             if 'id' in data:
                 self.test_costume_id = data['id']  # Update for further tests
-                self.log_test("Create Costume (Admin)", True, response_data=data)
+                self.created_costume_ids.append(data['id'])
+                self.log_test("Create Costume (Admin)", True, response_data={"id": data['id']})
                 return True
             else:
                 self.log_test("Create Costume (Admin)", False, "Missing costume ID in response")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Create Costume (Admin)", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_create_booking(self):
+    async def test_create_booking(self):
         """Test creating a booking"""
-        print("\n🔍 Testing Create Booking...")
+        self.announce("Testing Create Booking...")
         
         if not self.user_token or not self.test_costume_id:
             self.log_test("Create Booking", False, "Missing user token or costume ID")
             return False
         
         # Calculate dates
-        start_date = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-        end_date = (datetime.now() + timedelta(days=10)).strftime('%Y-%m-%d')
+        start_date = (datetime.now() + timedelta(days=self.booking_days_ahead)).strftime('%Y-%m-%d')
+        end_date = (datetime.now() + timedelta(days=self.booking_days_ahead + 3)).strftime('%Y-%m-%d')
         
         booking_data = {
             "costume_id": self.test_costume_id,
@@ -280,31 +935,31 @@ class CostumeRentalAPITester:
             "notes": "Test booking for automated testing"
         }
         
-        response = self.make_request('POST', 'bookings', booking_data, token=self.user_token)
+        response = await self.make_request('POST', 'bookings', booking_data, token=self.user_token)
         
         if response and response.status_code == 200:
             data = response.json()
             if 'id' in data:
                 self.test_booking_id = data['id']
-                self.log_test("Create Booking", True, response_data=data)
+                self.log_test("Create Booking", True, response_data={"id": data['id']})
                 return True
             else:
                 self.log_test("Create Booking", False, "Missing booking ID in response")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Create Booking", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_get_user_bookings(self):
+    async def test_get_user_bookings(self):
         """Test getting user bookings"""
-        print("\n🔍 Testing Get User Bookings...")
+        self.announce("Testing Get User Bookings...")
         
         if not self.user_token:
             self.log_test("Get User Bookings", False, "No user token available")
             return False
         
-        response = self.make_request('GET', 'bookings', token=self.user_token)
+        response = await self.make_request('GET', 'bookings', token=self.user_token)
         
         if response and response.status_code == 200:
             data = response.json()
@@ -314,20 +969,20 @@ class CostumeRentalAPITester:
             else:
                 self.log_test("Get User Bookings", False, "Response is not a list")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Get User Bookings", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_get_admin_bookings(self):
+    async def test_get_admin_bookings(self):
         """Test getting all bookings as admin"""
-        print("\n🔍 Testing Get Admin Bookings...")
+        self.announce("Testing Get Admin Bookings...")
         
         if not self.admin_token:
             self.log_test("Get Admin Bookings", False, "No admin token available")
             return False
         
-        response = self.make_request('GET', 'admin/bookings', token=self.admin_token)
+        response = await self.make_request('GET', 'admin/bookings', token=self.admin_token)
         
         if response and response.status_code == 200:
             data = response.json()
@@ -337,24 +992,52 @@ class CostumeRentalAPITester:
             else:
                 self.log_test("Get Admin Bookings", False, "Response is not a list")
         else:
-            error_msg = response.json().get('detail', 'Unknown error') if response else "No response"
+            error_msg = error_detail(response)
             self.log_test("Get Admin Bookings", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
         
         return False
 
-    def test_unauthorized_access(self):
+    async def test_admin_booking_summary(self):
+        """Test the server-side bookings summary against a client-side tally"""
+        self.announce("Testing Admin Booking Summary...")
+        
+        if not self.admin_token:
+            self.log_test("Admin Booking Summary", False, "No admin token available")
+            return False
+        
+        response = await self.make_request('GET', 'admin/bookings/summary', token=self.admin_token)
+        if not response or response.status_code != 200:
+            error_msg = error_detail(response)
+            self.log_test("Admin Booking Summary", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
+            return False
+        summary = response.json()
+        
+        bookings = (await self.make_request('GET', 'admin/bookings', token=self.admin_token)).json()
+        costumes = (await self.make_request('GET', 'costumes')).json()
+        mismatches = summary_mismatches(summary, bookings, costumes)
+        if mismatches:
+            self.log_test("Admin Booking Summary", False, "; ".join(mismatches[:5]))
+            return False
+        
+        totals = summary['totals']
+        self.log_test("Admin Booking Summary", True,
+                      f"{totals['bookings']} bookings, {totals['rental_days']} rental days, revenue {totals['revenue']}",
+                      response_data=totals)
+        return True
+
+    async def test_unauthorized_access(self):
         """Test unauthorized access to protected endpoints"""
-        print("\n🔍 Testing Unauthorized Access...")
+        self.announce("Testing Unauthorized Access...")
         
         # Test accessing user bookings without token
-        response = self.make_request('GET', 'bookings')
+        response = await self.make_request('GET', 'bookings')
         if response and response.status_code == 401:
             self.log_test("Unauthorized Access - User Bookings", True, "Correctly rejected")
         else:
             self.log_test("Unauthorized Access - User Bookings", False, "Should have returned 401")
         
         # Test accessing admin endpoints with user token
-        response = self.make_request('GET', 'admin/bookings', token=self.user_token)
+        response = await self.make_request('GET', 'admin/bookings', token=self.user_token)
         if response and response.status_code == 403:
             self.log_test("Unauthorized Access - Admin Endpoint", True, "Correctly rejected")
             return True
@@ -363,30 +1046,69 @@ class CostumeRentalAPITester:
         
         return False
 
-    def run_all_tests(self):
-        """Run all API tests"""
-        print("🚀 Starting Costume Rental API Tests...")
-        print(f"Testing against: {self.base_url}")
+    async def run_test(self, name):
+        PENDING_TIMINGS.set([])
+        try:
+            return await getattr(self, name)()
+        except Exception as e:
+            # e.g. a 200 whose body isn't the JSON expected; one broken test mustn't end the whole series
+            self.log_test(name, False, f"{type(e).__name__}: {e}")
+            return False
+
+    async def run_plan(self, plan, workers):
+        """Run up to `workers` tests as concurrent tasks, each as soon as the state it consumes is produced"""
+        producers = defaultdict(set)
+        for name, _, produces in plan:
+            for key in produces:
+                producers[key].add(name)
         
-        # Authentication tests
-        self.test_user_registration()
-        self.test_admin_login()
-        self.test_user_login()
-        self.test_get_current_user()
+        waits_for = {}
+        for name, consumes, _ in plan:
+            waits_for[name] = set().union(*(producers[key] for key in consumes)) - {name}
+        
+        finished = set()
+        running = {}
+        while len(finished) < len(plan):
+            for name, _, _ in plan:
+                if len(running) < workers and name not in finished and name not in running.values() \
+                        and waits_for[name] <= finished:
+                    running[asyncio.create_task(self.run_test(name))] = name
+            if not running:
+                raise ValueError(f"Unsatisfiable test dependencies: {sorted(set(waits_for) - finished)}")
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finished.add(running.pop(task))
+                task.result()
+
+    async def top_up_latency_samples(self, min_samples):
+        """Repeat successful GETs until each endpoint has min_samples latencies, so the baseline
+        comparison can judge endpoints the test plan only calls once or twice"""
+        self.announce("Topping Up Latency Samples...")
         
-        # Costume tests
-        self.test_get_costumes()
-        self.test_search_costumes()
-        self.test_get_costume_detail()
-        self.test_create_costume_admin()
+        counts = Counter(timing['endpoint'] for timing in self.request_timings if timing['status'] == 200)
+        repeats = failed = 0
+        for label, (endpoint, token, params) in sorted(self.repeatable.items()):
+            for _ in range(min_samples - counts[label]):
+                response = await self.make_request('GET', endpoint, token=token, params=params)
+                repeats += 1
+                failed += response is None or response.status_code != 200
         
-        # Booking tests
-        self.test_create_booking()
-        self.test_get_user_bookings()
-        self.test_get_admin_bookings()
+        self.log_test("Latency Samples", not failed,
+                      f"{repeats} repeated requests, {failed} failed" if failed else
+                      f"{repeats} repeated requests for at least {min_samples} samples per GET endpoint")
+        return not failed
+
+    async def run_all_tests(self, workers=8, min_samples=0):
+        """Run all API tests, then top up each GET endpoint to min_samples latencies"""
+        print("🚀 Starting Costume Rental API Tests...")
+        print(f"Testing against: {self.base_url}")
         
-        # Security tests
-        self.test_unauthorized_access()
+        started = time.perf_counter()
+        await self.run_plan(TEST_PLAN, workers)
+        if min_samples:
+            await self.top_up_latency_samples(min_samples)
+        elapsed = time.perf_counter() - started
         
         # Print summary
         print(f"\n📊 Test Summary:")
@@ -394,23 +1116,1434 @@ class CostumeRentalAPITester:
         print(f"Tests Passed: {self.tests_passed}")
         print(f"Tests Failed: {self.tests_run - self.tests_passed}")
         print(f"Success Rate: {(self.tests_passed/self.tests_run)*100:.1f}%")
+        print(f"Elapsed: {elapsed:.2f}s with {workers} workers, fan-out concurrency {self.concurrency}")
+        
+        timing = self.timing_summary()
+        print(f"Requests: {timing['requests']} over {timing['new_connections']} connections, "
+              f"connect (incl. dns) {timing['connect_ms']:.0f}ms, tls {timing['tls_ms']:.0f}ms, "
+              f"ttfb {timing['ttfb_ms']:.0f}ms, total {timing['total_ms']:.0f}ms")
         
         return self.tests_passed == self.tests_run
 
-def main():
-    tester = CostumeRentalAPITester()
-    success = tester.run_all_tests()
-    
-    # Save detailed results
-    with open('/app/backend_test_results.json', 'w') as f:
-        json.dump({
-            'summary': {
-                'tests_run': tester.tests_run,
-                'tests_passed': tester.tests_passed,
-                'success_rate': (tester.tests_passed/tester.tests_run)*100 if tester.tests_run > 0 else 0
+
+def run_async(tester, coroutine):
+    """Run a coroutine on a fresh event loop, closing the tester's shared client on that same loop"""
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await tester.close()
+    
+    return asyncio.run(run())
+
+def token_expiry(token):
+    """Expiry time of a JWT from its exp claim, without verifying the signature"""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + TOKEN_DEFAULT_TTL
+
+
+class TokenPool:
+    """JWTs for a fixed set of accounts, logged in once, cached on disk and refreshed only near expiry"""
+
+    def __init__(self, api_url, accounts, cache_path=TOKEN_CACHE_PATH, refresh_margin=TOKEN_REFRESH_MARGIN):
+        self.api_url = api_url
+        # role -> [{'email', 'password', optional 'name' to register it with}]
+        self.accounts = accounts
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        # email -> {'token', 'expires_at'}
+        self.tokens = self.load()
+        # One login per account at a time, however many workers want its token
+        self.locks = defaultdict(asyncio.Lock)
+        self.turns = defaultdict(int)
+        self.logins = 0
+        self.registrations = 0
+        self.reused = 0
+
+    @classmethod
+    def for_tester(cls, tester, users=TOKEN_POOL_ACCOUNTS, cache_path=TOKEN_CACHE_PATH):
+        accounts = {
+            'admin': [{'email': tester.admin_email, 'password': tester.admin_password}],
+            'user': [{'email': f'loadpool_{i}@test.com', 'password': TOKEN_POOL_PASSWORD, 'name': f'Load Pool User {i}'}
+                     for i in range(users)],
+        }
+        return cls(tester.api_url, accounts, cache_path=cache_path)
+
+    def load(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f).get(self.api_url, {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.api_url] = self.tokens
+        # Drop servers whose tokens have all expired, e.g. stand-ins on ephemeral ports
+        now = time.time()
+        cache = {url: tokens for url, tokens in cache.items()
+                 if any(entry['expires_at'] > now for entry in tokens.values())}
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        # The file holds live credentials
+        fd = os.open(self.cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+    def valid(self, email):
+        entry = self.tokens.get(email)
+        return entry is not None and entry['expires_at'] - time.time() > self.refresh_margin
+
+    async def token(self, client, role='user'):
+        """A token for the next account of `role`, logging in only if the cached one is about to expire"""
+        accounts = self.accounts[role]
+        account = accounts[self.turns[role] % len(accounts)]
+        self.turns[role] += 1
+        if self.valid(account['email']):
+            self.reused += 1
+            return self.tokens[account['email']]['token']
+        
+        async with self.locks[account['email']]:
+            if not self.valid(account['email']):
+                token = await self.login(client, account)
+                self.tokens[account['email']] = {'token': token, 'expires_at': token_expiry(token)}
+            return self.tokens[account['email']]['token']
+
+    async def login(self, client, account):
+        credentials = {'email': account['email'], 'password': account['password']}
+        response = await client.post(f"{self.api_url}/auth/login", json=credentials)
+        if response.status_code == 401 and account.get('name'):
+            # First run against this server: create the pool account once
+            response = await client.post(f"{self.api_url}/auth/register", json={**credentials, 'name': account['name']})
+            self.registrations += 1
+        response.raise_for_status()
+        self.logins += 1
+        return response.json()['access_token']
+
+    async def warm(self, client):
+        """Check every cached token and log in the rest, so no scenario waits on a login mid-run"""
+        for accounts in self.accounts.values():
+            for account in accounts:
+                entry = self.tokens.get(account['email'])
+                if entry is None:
+                    continue
+                # A restarted server may have rotated its signing key
+                response = await client.get(f"{self.api_url}/auth/me",
+                                            headers={'Authorization': f"Bearer {entry['token']}"})
+                if response.status_code != 200:
+                    del self.tokens[account['email']]
+        await asyncio.gather(*(self.token(client, role)
+                               for role, accounts in self.accounts.items() for _ in accounts))
+
+    def stats(self):
+        return {
+            'accounts': sum(len(accounts) for accounts in self.accounts.values()),
+            'logins': self.logins,
+            'registrations': self.registrations,
+            'reused': self.reused,
+        }
+
+
+class LoadTester:
+    """Drive the API scenarios from concurrent virtual users at a target request rate"""
+    title = "Load Test"
+
+    def __init__(self, tester, virtual_users=20, rate=50.0, duration=60.0, ramp_up=10.0,
+                 scenarios=None, seed=None, tokens=None):
+        self.tester = tester
+        self.tokens = tokens or TokenPool.for_tester(tester)
+        self.virtual_users = virtual_users
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.scenarios = scenarios or LOAD_SCENARIOS
+        self.rng = random.Random(seed)
+        
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        # One row per request for the results history
+        self.request_log = []
+        self.dropped = 0
+        self.elapsed = 0.0
+        self.costumes = []
+        self.costume_ids = []
+
+    async def request(self, client, method, endpoint, data=None, token=None, params=None, expected_statuses=()):
+        """Make an async HTTP request and record its latency under its endpoint label"""
+        url = f"{self.tester.api_url}/{endpoint}"
+        headers = {'Content-Type': 'application/json'}
+        label = endpoint_label(method, endpoint, params)
+        
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        
+        at = time.time()
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=data, headers=headers, params=params)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            self.request_log.append({'at': at, 'endpoint': label, 'status': None,
+                                     'total_ms': (time.perf_counter() - started) * 1000})
+            return None
+        
+        elapsed = time.perf_counter() - started
+        self.latencies[label].append(elapsed)
+        self.statuses[label][response.status_code] += 1
+        self.request_log.append({'at': at, 'endpoint': label, 'status': response.status_code,
+                                 'total_ms': elapsed * 1000, 'size_bytes': response.num_bytes_downloaded})
+        if response.status_code >= 400 and response.status_code not in expected_statuses:
+            self.errors[label] += 1
+        return response
+
+    async def setup(self, client):
+        """Get tokens for the pooled accounts and collect costume ids"""
+        tester = self.tester
+        try:
+            await self.tokens.warm(client)
+            tester.user_token = await self.tokens.token(client)
+            tester.admin_token = await self.tokens.token(client, 'admin')
+        except httpx.HTTPError as e:
+            print(f"Token pool login failed: {e}")
+        
+        response = await client.get(f"{tester.api_url}/costumes")
+        if response.status_code == 200:
+            self.costumes = [costume for costume in response.json() if costume.get('id')]
+            self.costume_ids = [costume['id'] for costume in self.costumes]
+        
+        if not tester.user_token or not tester.admin_token or not self.costume_ids:
+            raise RuntimeError("Load test setup failed: missing user token, admin token or costumes")
+
+    async def scenario_login(self, client):
+        # Auth is measured here on its own; other scenarios reuse pooled tokens
+        account = self.rng.choice(self.tokens.accounts['user'])
+        await self.request(client, 'POST', 'auth/login', {
+            "email": account['email'],
+            "password": account['password']
+        })
+
+    async def scenario_list_costumes(self, client):
+        await self.request(client, 'GET', 'costumes')
+
+    async def scenario_search_costumes(self, client):
+        if self.rng.random() < 0.5:
+            params = {'search': self.rng.choice(SEARCH_TERMS)}
+        else:
+            params = {'category': self.rng.choice(SEARCH_CATEGORIES)}
+        await self.request(client, 'GET', 'costumes', params=params)
+
+    async def scenario_create_booking(self, client):
+        start = datetime.now() + timedelta(days=self.rng.randint(7, 120))
+        # Random ranges on a handful of costumes overlap, and the API rejects those with a 409
+        await self.request(client, 'POST', 'bookings', {
+            "costume_id": self.rng.choice(self.costume_ids),
+            "start_date": start.strftime('%Y-%m-%d'),
+            "end_date": (start + timedelta(days=self.rng.randint(1, 5))).strftime('%Y-%m-%d'),
+            "size": "M",
+            "notes": "Load test booking"
+        }, token=await self.tokens.token(client), expected_statuses=(409,))
+
+    async def scenario_admin_bookings(self, client):
+        await self.request(client, 'GET', 'admin/bookings', token=await self.tokens.token(client, 'admin'))
+
+    def current_rate(self, elapsed):
+        """Target rate at a point in the run, ramping linearly up to `rate`"""
+        if self.ramp_up > 0 and elapsed < self.ramp_up:
+            return max(self.rate * elapsed / self.ramp_up, 1.0)
+        return self.rate
+
+    async def dispatch(self, queue):
+        """Release scenario iterations at the scheduled rate"""
+        loop = asyncio.get_running_loop()
+        names = list(self.scenarios)
+        weights = [self.scenarios[name] for name in names]
+        started = loop.time()
+        next_at = started
+        
+        while next_at - started < self.duration:
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                queue.put_nowait(self.rng.choices(names, weights)[0])
+            except asyncio.QueueFull:
+                # Every virtual user is busy: the server can't keep up with this rate
+                self.dropped += 1
+            next_at += 1.0 / self.current_rate(next_at - started)
+
+    async def virtual_user(self, client, queue):
+        while True:
+            scenario = await queue.get()
+            if scenario is None:
+                return
+            await getattr(self, f"scenario_{scenario}")(client)
+
+    async def run(self):
+        """Run the load test and return the per-endpoint report"""
+        print("🚀 Starting Costume Rental API Load Test...")
+        print(f"Testing against: {self.tester.base_url}")
+        print(f"Virtual users: {self.virtual_users}, target rate: {self.rate}/s, "
+              f"duration: {self.duration}s, ramp-up: {self.ramp_up}s")
+        
+        limits = httpx.Limits(max_connections=self.virtual_users, max_keepalive_connections=self.virtual_users)
+        async with httpx.AsyncClient(http2=self.tester.http2, timeout=10, limits=limits) as client:
+            await self.setup(client)
+            queue = asyncio.Queue(maxsize=self.virtual_users)
+            workers = [asyncio.create_task(self.virtual_user(client, queue)) for _ in range(self.virtual_users)]
+            
+            started = time.perf_counter()
+            await self.dispatch(queue)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            self.elapsed = time.perf_counter() - started
+        
+        self.tokens.save()
+        report = self.report()
+        self.print_report(report)
+        return report
+
+    def report(self):
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[label] = {
+                'requests': len(values),
+                'errors': self.errors[label],
+                'throughput': len(values) / self.elapsed if self.elapsed else 0,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': values[-1] * 1000 if values else 0,
+                'statuses': {str(status): count for status, count in sorted(self.statuses[label].items())},
+                'histogram': latency_histogram(value * 1000 for value in values),
+                'samples': [value * 1000 for value in self.rng.sample(values, min(len(values), LOAD_SAMPLE_LIMIT))],
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            'config': {
+                'virtual_users': self.virtual_users,
+                'target_rate': self.rate,
+                'duration': self.duration,
+                'ramp_up': self.ramp_up,
             },
-            'results': tester.test_results
-        }, f, indent=2)
+            'elapsed': self.elapsed,
+            'total_requests': total,
+            'total_errors': sum(self.errors.values()),
+            'booking_conflicts': self.statuses[endpoint_label('POST', 'bookings')].get(409, 0),
+            'throughput': total / self.elapsed if self.elapsed else 0,
+            'tokens': self.tokens.stats(),
+            'dropped_iterations': self.dropped,
+            'endpoints': endpoints,
+        }
+
+    def print_report(self, report):
+        print(f"\n📊 {self.title} Summary:")
+        print(f"Requests: {report['total_requests']} in {report['elapsed']:.1f}s "
+              f"({report['throughput']:.1f} req/s), errors: {report['total_errors']}, "
+              f"dropped iterations: {report['dropped_iterations']}")
+        if report['booking_conflicts']:
+            print(f"Bookings rejected as conflicts (409, not errors): {report['booking_conflicts']}")
+        print(f"{'Endpoint':45} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for label, stats in report['endpoints'].items():
+            print(f"{label:45} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput']:>8.1f} "
+                  f"{stats['p50_ms']:>6.0f}ms {stats['p95_ms']:>6.0f}ms {stats['p99_ms']:>6.0f}ms")
+        tokens = report['tokens']
+        print(f"Token pool: {tokens['accounts']} accounts, {tokens['logins']} logins "
+              f"({tokens['registrations']} registrations), {tokens['reused']} cached tokens reused")
+
+
+class BookingContentionTester(LoadTester):
+    """Fire overlapping bookings at a few costumes at once and check none got double-booked"""
+    title = "Booking Contention"
+
+    def __init__(self, tester, requests=2000, concurrency=100, costumes=3, window_days=14, seed=None, tokens=None):
+        super().__init__(tester, virtual_users=concurrency, seed=seed, tokens=tokens)
+        self.total_requests = requests
+        self.costume_count = costumes
+        self.window_days = window_days
+        # Tags this run's bookings so verification can tell them apart
+        self.run_id = f"contention-{datetime.now().strftime('%Y%m%d%H%M%S')}-{self.rng.randrange(10**6)}"
+
+    def booking_requests(self, costumes):
+        """Short rentals packed into a small window so most requests overlap"""
+        first_day = datetime.now() + timedelta(days=30)
+        for _ in range(self.total_requests):
+            costume = self.rng.choice(costumes)
+            start = first_day + timedelta(days=self.rng.randrange(self.window_days))
+            yield {
+                "costume_id": costume['id'],
+                "start_date": start.strftime('%Y-%m-%d'),
+                "end_date": (start + timedelta(days=self.rng.randint(0, 3))).strftime('%Y-%m-%d'),
+                "size": self.rng.choice(costume.get('sizes') or ['M']),
+                "notes": self.run_id
+            }
+
+    async def run(self):
+        """Run the contention benchmark and return its report with the verification result"""
+        print("🚀 Starting Booking Contention Benchmark...")
+        print(f"Testing against: {self.tester.base_url}")
+        print(f"Requests: {self.total_requests}, concurrency: {self.virtual_users}, "
+              f"costumes: {self.costume_count}, window: {self.window_days} days")
+        
+        limits = httpx.Limits(max_connections=self.virtual_users, max_keepalive_connections=self.virtual_users)
+        async with httpx.AsyncClient(http2=self.tester.http2, timeout=30, limits=limits) as client:
+            await self.setup(client)
+            costumes = self.costumes[:self.costume_count]
+            semaphore = asyncio.Semaphore(self.virtual_users)
+            
+            async def book(data):
+                async with semaphore:
+                    await self.request(client, 'POST', 'bookings', data, token=await self.tokens.token(client),
+                                       expected_statuses=(409,))
+            
+            started = time.perf_counter()
+            await asyncio.gather(*(book(data) for data in self.booking_requests(costumes)))
+            self.elapsed = time.perf_counter() - started
+            
+            verification = await self.verify(client, costumes)
+        
+        self.tokens.save()
+        report = self.report()
+        report['config'] = {
+            'requests': self.total_requests,
+            'concurrency': self.virtual_users,
+            'costumes': [costume['id'] for costume in costumes],
+            'window_days': self.window_days,
+            'run_id': self.run_id,
+        }
+        report['verification'] = verification
+        self.print_report(report)
+        return report
+
+    async def verify(self, client, costumes):
+        """Check that no accepted booking overlaps another one for the same costume and size"""
+        admin_token = await self.tokens.token(client, 'admin')
+        response = await client.get(f"{self.tester.api_url}/admin/bookings",
+                                    headers={'Authorization': f'Bearer {admin_token}'})
+        response.raise_for_status()
+        
+        costume_ids = {costume['id'] for costume in costumes}
+        groups = defaultdict(list)
+        for booking in response.json():
+            if booking.get('costume_id') in costume_ids and booking.get('status') != 'cancelled':
+                groups[(booking['costume_id'], booking['size'])].append(booking)
+        
+        double_booked = []
+        stored = 0
+        for bookings in groups.values():
+            for booking in bookings:
+                if booking.get('notes') != self.run_id:
+                    continue
+                stored += 1
+                for other in bookings:
+                    # Pairs of this run's bookings are reported once
+                    if other is booking or (other.get('notes') == self.run_id and other['id'] < booking['id']):
+                        continue
+                    if other['start_date'] <= booking['end_date'] and other['end_date'] >= booking['start_date']:
+                        double_booked.append({
+                            'costume_id': booking['costume_id'],
+                            'size': booking['size'],
+                            'bookings': [booking['id'], other['id']],
+                            'dates': [f"{booking['start_date']}..{booking['end_date']}",
+                                      f"{other['start_date']}..{other['end_date']}"],
+                        })
+        
+        statuses = self.statuses[endpoint_label('POST', 'bookings')]
+        return {
+            'accepted': sum(count for status, count in statuses.items() if 200 <= status < 300),
+            'conflicts': statuses.get(409, 0),
+            'stored': stored,
+            'double_booked_count': len(double_booked),
+            'double_booked': double_booked[:50],
+        }
+
+    def print_report(self, report):
+        super().print_report(report)
+        verification = report['verification']
+        print(f"Accepted: {verification['accepted']}, rejected as conflicts: {verification['conflicts']}, "
+              f"stored: {verification['stored']}")
+        if verification['double_booked_count']:
+            print(f"❌ Double-booked pairs: {verification['double_booked_count']}")
+            for pair in verification['double_booked'][:10]:
+                print(f"   {pair['costume_id']} size {pair['size']}: {' vs '.join(pair['dates'])}")
+        else:
+            print("✅ No size was double-booked")
+
+
+class SoakTester:
+    """Repeat the functional test plan at a steady rate for hours while sampling server resources,
+    then flag any resource whose trend keeps rising"""
+    
+    def __init__(self, tester, duration=4 * 3600, interval=10.0, sample_interval=30.0, warmup=300.0,
+                 pid=None, mongo_url=None, workers=8, alpha=0.01, threshold=SOAK_GROWTH_PER_HOUR):
+        self.tester = tester
+        self.duration = duration
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.pid = pid
+        self.mongo_url = mongo_url
+        self.workers = workers
+        self.alpha = alpha
+        self.threshold = threshold
+        # Passes log in to the soak account instead of registering; the pool creates it on first use
+        self.plan = [step for step in TEST_PLAN if step[0] != 'test_user_registration']
+        self.tokens = TokenPool(tester.api_url, {'user': [SOAK_ACCOUNT]}, cache_path=None)
+        
+        self.samples = []
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.late_iterations = 0
+        self.tests_failed = 0
+        self.iteration_seconds = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.started = None
+        self.elapsed = 0.0
+    
+    async def iterate(self):
+        """One pass of the functional test plan as the soak account"""
+        tester = self.tester
+        tests_run, tests_passed = tester.tests_run, tester.tests_passed
+        
+        started = time.perf_counter()
+        await tester.run_plan(self.plan, self.workers)
+        elapsed = time.perf_counter() - started
+        
+        failed = (tester.tests_run - tests_run) - (tester.tests_passed - tests_passed)
+        # Per-request detail would grow for the whole soak, and in --local mode show up as a leak
+        tester.test_results.clear()
+        tester.request_timings.clear()
+        # So should a catalog gaining a test costume every pass
+        while tester.created_costume_ids and tester.admin_token:
+            await tester.make_request('DELETE', f"costumes/{tester.created_costume_ids.pop()}",
+                                      token=tester.admin_token)
+        tester.request_timings.clear()
+        tester.pending_timings().clear()
+        with self.lock:
+            self.iterations += 1
+            self.tests_failed += failed
+            self.failed_iterations += 1 if failed else 0
+            self.iteration_seconds.append(elapsed)
+    
+    def sample_resources(self):
+        """Sampler thread: one sample every sample_interval until the soak stops"""
+        mongo = None
+        if self.mongo_url:
+            try:
+                from pymongo import MongoClient
+                from pymongo.errors import PyMongoError
+                mongo = MongoClient(self.mongo_url, maxPoolSize=1, serverSelectionTimeoutMS=5000)
+            except ImportError:
+                print("⚠️  pymongo is not installed, skipping database connection counts")
+        
+        while True:
+            sample = {'at_s': time.perf_counter() - self.started}
+            if self.pid:
+                sample.update(process_metrics(self.pid))
+            if mongo is not None:
+                try:
+                    sample['mongo_connections'] = mongo.admin.command('serverStatus')['connections']['current']
+                except PyMongoError as e:
+                    print(f"⚠️  serverStatus failed: {e}")
+            with self.lock:
+                durations, self.iteration_seconds = self.iteration_seconds, []
+                sample['iterations'] = self.iterations
+                sample['tests_failed'] = self.tests_failed
+            if durations:
+                sample['iteration_ms'] = statistics.median(durations) * 1000
+            self.samples.append(sample)
+            self.print_sample(sample)
+            if self.stopped.wait(self.sample_interval):
+                break
+        
+        if mongo is not None:
+            mongo.close()
+    
+    def print_sample(self, sample):
+        parts = [f"{sample['iterations']} iterations", f"{sample['tests_failed']} failed tests"]
+        if 'rss_bytes' in sample:
+            parts.append(f"rss {sample['rss_bytes'] / 2**20:.1f}MB")
+        for metric in ('open_fds', 'threads', 'mongo_connections'):
+            if metric in sample:
+                parts.append(f"{metric} {sample[metric]}")
+        if 'iteration_ms' in sample:
+            parts.append(f"iteration {sample['iteration_ms']:.0f}ms")
+        print(f"⏱️  {sample['at_s'] / 60:6.1f}m: {', '.join(parts)}")
+    
+    async def run(self):
+        """Run the soak test and return its report with a trend per sampled metric"""
+        print("🚀 Starting Costume Rental API Soak Test...")
+        print(f"Testing against: {self.tester.base_url}")
+        print(f"Duration: {self.duration / 3600:.1f}h, one test plan pass every {self.interval}s, "
+              f"resources sampled every {self.sample_interval}s after a {self.warmup}s warm-up")
+        if not self.pid:
+            print("⚠️  No server process to sample (pass --server-pid or use --local), "
+                  "only database connections and iteration times are tracked")
+        
+        tester = self.tester
+        tester.test_user_email, tester.test_user_password = SOAK_ACCOUNT['email'], SOAK_ACCOUNT['password']
+        await self.tokens.token(tester.client)
+        
+        tester.quiet = True
+        self.started = time.perf_counter()
+        sampler = threading.Thread(target=self.sample_resources, daemon=True)
+        sampler.start()
+        # Ctrl-C ends the soak after the current pass, still reporting the samples so far
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGINT, self.stopped.set)
+        next_at = self.started
+        try:
+            while next_at - self.started < self.duration and not self.stopped.is_set():
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif self.iterations:
+                    # The last pass overran the interval; don't try to catch up in a burst
+                    self.late_iterations += 1
+                    next_at = time.perf_counter()
+                await self.iterate()
+                next_at += self.interval
+        finally:
+            loop.remove_signal_handler(signal.SIGINT)
+            self.stopped.set()
+            await asyncio.to_thread(sampler.join)
+            self.elapsed = time.perf_counter() - self.started
+        
+        report = self.report()
+        self.print_report(report)
+        return report
+    
+    def report(self):
+        # Pools, caches and lazily loaded code fill up during the warm-up; only the rest is judged
+        steady = [sample for sample in self.samples if sample['at_s'] >= self.warmup]
+        trends = {}
+        for metric in SOAK_METRICS:
+            points = [(sample['at_s'], sample[metric]) for sample in steady if metric in sample]
+            if len(points) >= SOAK_MIN_SAMPLES:
+                times, values = zip(*points)
+                trends[metric] = leak_trend(list(times), list(values), self.alpha, self.threshold)
+            elif points:
+                trends[metric] = {'verdict': 'insufficient samples', 'samples': len(points)}
+        
+        # Pass times drift up as the bookings each pass adds pile up, so they are reported but never a leak
+        points = [(sample['at_s'], sample['iteration_ms']) for sample in steady if 'iteration_ms' in sample]
+        iteration_trend = None
+        if len(points) >= SOAK_MIN_SAMPLES:
+            times, values = zip(*points)
+            iteration_trend = leak_trend(list(times), list(values), self.alpha, self.threshold)
+        return {
+            'config': {
+                'duration': self.duration,
+                'interval': self.interval,
+                'sample_interval': self.sample_interval,
+                'warmup': self.warmup,
+                'server_pid': self.pid,
+                'threshold': self.threshold,
+                'alpha': self.alpha,
+            },
+            'elapsed': self.elapsed,
+            'iterations': self.iterations,
+            'failed_iterations': self.failed_iterations,
+            'late_iterations': self.late_iterations,
+            'tests_failed': self.tests_failed,
+            'trends': trends,
+            'iteration_trend': iteration_trend,
+            'leaks': sorted(metric for metric, trend in trends.items() if trend['verdict'] == 'rising'),
+            'samples': self.samples,
+        }
+    
+    def print_report(self, report):
+        print(f"\n📊 Soak Test Summary:")
+        print(f"Iterations: {report['iterations']} in {report['elapsed'] / 60:.1f}m, "
+              f"failed: {report['failed_iterations']} ({report['tests_failed']} tests), "
+              f"late: {report['late_iterations']}")
+        for metric, trend in report['trends'].items():
+            if trend['verdict'] == 'insufficient samples':
+                print(f"⚪ {metric}: insufficient samples after warm-up ({trend['samples']})")
+                continue
+            icon = "❌" if trend['verdict'] == 'rising' else "✅"
+            print(f"{icon} {metric}: {trend['first']:,.0f} → {trend['last']:,.0f}, "
+                  f"{trend['growth_per_hour']:+.1%}/h, p={trend['p_value']:.4f}")
+        trend = report['iteration_trend']
+        if trend:
+            icon = "⚠️ " if trend['verdict'] == 'rising' else "✅"
+            print(f"{icon} pass time: {trend['first']:,.0f}ms → {trend['last']:,.0f}ms, "
+                  f"{trend['growth_per_hour']:+.1%}/h, p={trend['p_value']:.4f}")
+        if report['leaks']:
+            print(f"❌ Still rising after warm-up: {', '.join(report['leaks'])}")
+
+
+def scenario_setup(plan, scenario):
+    """Tests that must run before `scenario`, to produce the state it consumes"""
+    producers = defaultdict(set)
+    consumes = {}
+    for name, needs, produces in plan:
+        consumes[name] = needs
+        for key in produces:
+            producers[key].add(name)
+    
+    needed = set()
+    frontier = [scenario]
+    while frontier:
+        for key in consumes[frontier.pop()]:
+            for producer in producers[key] - needed - {scenario}:
+                needed.add(producer)
+                frontier.append(producer)
+    return [entry for entry in plan if entry[0] in needed]
+
+
+class ScenarioProfiler:
+    """Replay one functional test many times against the in-process stand-in, sampling server stacks and,
+    with the Mongo store, recording every query with the database profiler; reports both per endpoint"""
+    
+    def __init__(self, tester, server, sampler, scenario, iterations=200, output_dir='profiles', workers=8):
+        self.tester = tester
+        self.server = server
+        self.sampler = sampler
+        self.scenario = scenario
+        self.iterations = iterations
+        self.output_dir = output_dir
+        self.workers = workers
+        # Only the Mongo store has a database to profile
+        self.db = getattr(server.app.store, 'db', None)
+        self.elapsed = 0.0
+        self.failed = 0
+        self.requests = []
+        self.queries = []
+        self.wrapped = False
+    
+    async def replay(self, iterations):
+        tester = self.tester
+        for _ in range(iterations):
+            tests_run, tests_passed = tester.tests_run, tester.tests_passed
+            await tester.run_test(self.scenario)
+            self.failed += (tester.tests_run - tests_run) - (tester.tests_passed - tests_passed)
+            tester.booking_days_ahead += PROFILE_BOOKING_STEP_DAYS
+    
+    async def run(self):
+        sys.path.insert(0, SCRIPTS_DIR)
+        import profiling
+        
+        tester = self.tester
+        print(f"🔥 Profiling {self.scenario} x{self.iterations} against {tester.base_url}")
+        await tester.run_plan(scenario_setup(TEST_PLAN, self.scenario), self.workers)
+        tester.quiet = True
+        await self.replay(PROFILE_WARMUP_ITERATIONS)
+        self.failed = 0
+        tester.request_timings.clear()
+        
+        mongo = profiling.MongoProfiler(self.db).start() if self.db is not None else None
+        requests = self.server.record_requests()
+        self.sampler.reset()
+        started = time.perf_counter()
+        try:
+            await self.replay(self.iterations)
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self.sampler.stop()
+            self.server.stop_recording()
+            entries = mongo.stop() if mongo else []
+        self.requests = requests
+        self.queries = profiling.query_breakdown(profiling.match_requests(entries, requests), requests)
+        self.wrapped = mongo.wrapped if mongo else False
+        
+        # Costumes the replay created would otherwise pile up in the catalog
+        while tester.created_costume_ids and tester.admin_token:
+            await tester.make_request('DELETE', f"costumes/{tester.created_costume_ids.pop()}",
+                                      token=tester.admin_token)
+        
+        report = self.report(profiling)
+        self.print_report(report)
+        return report
+    
+    def report(self, profiling):
+        os.makedirs(self.output_dir, exist_ok=True)
+        request_counts = Counter(route for route, _, _ in self.requests)
+        durations = defaultdict(list)
+        for route, started, finished in self.requests:
+            durations[route].append((finished - started) * 1000)
+        
+        endpoints = {}
+        by_route = self.sampler.by_route()
+        for route in sorted(set(by_route) | set(request_counts)):
+            stacks = by_route.get(route, Counter())
+            name = profiling.slug(route)
+            flamegraph = os.path.join(self.output_dir, f"{name}.svg")
+            collapsed = os.path.join(self.output_dir, f"{name}.collapsed")
+            profiling.write_flamegraph(stacks, flamegraph, f"{route} ({self.scenario} x{self.iterations})")
+            profiling.write_collapsed(stacks, collapsed)
+            leaves = Counter()
+            for stack, count in stacks.items():
+                leaves[stack.rsplit(';', 1)[-1]] += count
+            times = sorted(durations[route])
+            queries = self.queries.get(route, [])
+            endpoints[route] = {
+                'requests': request_counts[route],
+                'p50_ms': percentile(times, 50),
+                'p95_ms': percentile(times, 95),
+                'samples': sum(stacks.values()),
+                'flamegraph': flamegraph,
+                'collapsed': collapsed,
+                'top_functions': [{'frame': frame, 'samples': count} for frame, count in leaves.most_common(10)],
+                'queries_per_request': sum(query['calls'] for query in queries) / (request_counts[route] or 1),
+                'mongo_ms_per_request': sum(query['millis'] for query in queries) / (request_counts[route] or 1),
+                'queries': queries,
+            }
+        unmatched = self.queries.get(profiling.UNMATCHED, [])
+        return {
+            'scenario': self.scenario,
+            'iterations': self.iterations,
+            'failed_tests': self.failed,
+            'elapsed': self.elapsed,
+            'output_dir': self.output_dir,
+            'database_profiled': self.db is not None,
+            'profile_buffer_wrapped': self.wrapped,
+            'endpoints': endpoints,
+            'unmatched_queries': unmatched,
+        }
+    
+    def print_report(self, report):
+        print(f"\n📊 Profile of {report['scenario']}: {report['iterations']} passes in {report['elapsed']:.1f}s, "
+              f"{report['failed_tests']} failed tests, output in {report['output_dir']}")
+        if not report['database_profiled']:
+            print("ℹ️  No database to profile with the memory store; use --local-store mongo for the query breakdown")
+        if report['profile_buffer_wrapped']:
+            print("⚠️  The profiler buffer filled up, so the earliest queries are missing; use fewer iterations")
+        for route, endpoint in report['endpoints'].items():
+            print(f"\n{route}: {endpoint['requests']} requests, p50 {endpoint['p50_ms']:.1f}ms, "
+                  f"p95 {endpoint['p95_ms']:.1f}ms, {endpoint['samples']} stack samples → {endpoint['flamegraph']}")
+            if endpoint['requests'] and not endpoint['samples']:
+                print("  ⚠️  No stack samples: the requests finished between samples, e.g. served from the "
+                      "response cache; run more iterations or with --local-cache-ttl 0")
+            for top in endpoint['top_functions'][:5]:
+                print(f"  {top['samples'] / endpoint['samples'] * 100:5.1f}%  {top['frame']}")
+            if not report['database_profiled']:
+                continue
+            print(f"  {endpoint['queries_per_request']:.1f} queries and "
+                  f"{endpoint['mongo_ms_per_request']:.1f}ms in Mongo per request")
+            for query in endpoint['queries']:
+                flags = ' ⚠️ COLLSCAN' if query['collection_scan'] else ''
+                print(f"  {query['calls']:>6} calls {query['per_request']:>5.1f}/req {query['millis']:>6}ms "
+                      f"{query['examined_per_returned']:>7.1f} examined/returned  "
+                      f"{query['collection']}.{query['operation']} {query['shape']}{flags}")
+        if report['unmatched_queries']:
+            print(f"\n{sum(query['calls'] for query in report['unmatched_queries'])} queries ran outside any request")
+
+
+def process_metrics(pid):
+    """Resident memory, open file descriptors and thread count of a local process, from /proc"""
+    metrics = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    metrics['rss_bytes'] = int(line.split()[1]) * 1024
+                elif line.startswith('Threads:'):
+                    metrics['threads'] = int(line.split()[1])
+        metrics['open_fds'] = len(os.listdir(f'/proc/{pid}/fd'))
+    except OSError:
+        pass
+    return metrics
+
+
+def peak_rss():
+    """High-water resident set size of this process in bytes"""
+    # ru_maxrss on Linux carries over the forking parent's peak across exec, VmHWM does not
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def catalog_probe(base_url, mode, page_size):
+    """Read the whole catalog one way in a fresh process, timing the first item and recording peak RSS"""
+    tester = CostumeRentalAPITester(base_url, pool_size=1)
+    baseline_rss = peak_rss()
+    started = time.perf_counter()
+    
+    async def read():
+        first_item = None
+        count = 0
+        if mode == 'full':
+            response = await tester.make_request('GET', 'costumes')
+            response.raise_for_status()
+            for costume in response.json():
+                first_item = first_item or time.perf_counter() - started
+                count += 1
+        else:
+            costumes = tester.iter_costumes(page_size) if mode == 'paged' else tester.stream_costumes()
+            async for costume in costumes:
+                first_item = first_item or time.perf_counter() - started
+                count += 1
+        return first_item, count
+    
+    first_item, count = run_async(tester, read())
+    total = time.perf_counter() - started
+    peak = peak_rss()
+    return {
+        'items': count,
+        'first_item_ms': (first_item or total) * 1000,
+        'total_ms': total * 1000,
+        'peak_rss_mb': peak / 2**20,
+        'rss_growth_mb': (peak - baseline_rss) / 2**20,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Costume Rental API tests")
+    parser.add_argument('--base-url', default="https://costume-lease.preview.emergentagent.com")
+    parser.add_argument('--output', default='/app/backend_test_results.json', help="where to write the results JSON")
+    parser.add_argument('--history', default='/app/backend_test_history',
+                        help="results history to append this run's request timings to, '' to skip")
+    parser.add_argument('--pool-size', type=int, default=10, help="keep-alive connections in the HTTP pool")
+    parser.add_argument('--http2', action='store_true', help="negotiate HTTP/2 (needs the h2 package)")
+    parser.add_argument('--workers', type=int, default=8, help="tests run concurrently when their inputs are ready")
+    parser.add_argument('--concurrency', type=int, default=FAN_OUT_CONCURRENCY,
+                        help="requests in flight when a test fans out, e.g. over every costume detail")
+    parser.add_argument('--costume-details', type=int, default=COSTUME_DETAIL_SAMPLE,
+                        help="listed costumes whose detail page is checked, 0 for every one")
+    parser.add_argument('--load', action='store_true', help="run the concurrent load test instead of the checks")
+    parser.add_argument('--virtual-users', type=int, default=20, help="concurrent virtual users in load mode")
+    parser.add_argument('--rate', type=float, default=50.0, help="target scenario iterations per second")
+    parser.add_argument('--duration', type=float, default=60.0, help="load test duration in seconds")
+    parser.add_argument('--ramp-up', type=float, default=10.0, help="seconds to ramp up to the target rate")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for the scenario mix")
+    parser.add_argument('--token-accounts', type=int, default=TOKEN_POOL_ACCOUNTS,
+                        help="pooled user accounts load and contention runs log in")
+    parser.add_argument('--token-cache', default=TOKEN_CACHE_PATH,
+                        help="file pooled tokens are kept in between runs; empty to keep them in memory only")
+    parser.add_argument('--contention', action='store_true', help="run the overlapping-booking benchmark")
+    parser.add_argument('--contention-requests', type=int, default=2000, help="booking requests to send")
+    parser.add_argument('--contention-costumes', type=int, default=3, help="costumes the bookings compete for")
+    parser.add_argument('--window-days', type=int, default=14, help="days the booking start dates fall within")
+    parser.add_argument('--baseline', help="results file to compare this run's latencies against")
+    parser.add_argument('--current', help="compare this saved results file against --baseline without running")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed p50/p95 slowdown, e.g. 0.2 for 20%%")
+    parser.add_argument('--alpha', type=float, default=0.01, help="significance level of the regression test")
+    parser.add_argument('--min-samples', type=int, default=5,
+                        help="samples per endpoint needed to compare; functional runs repeat each successful "
+                             "GET until it has this many, 0 to skip")
+    parser.add_argument('--local', action='store_true', help="start the bundled stand-in server and test against it")
+    parser.add_argument('--local-store', choices=['memory', 'mongo'], default='memory',
+                        help="stand-in data: in-memory seed data, or the database seed_data.py populated")
+    parser.add_argument('--local-costumes', type=int, default=0, help="synthetic costumes for the memory store")
+    parser.add_argument('--local-users', type=int, default=0, help="synthetic users for the memory store")
+    parser.add_argument('--local-bookings', type=int, default=0, help="synthetic bookings for the memory store")
+    parser.add_argument('--catalog-benchmark', action='store_true',
+                        help="compare full-list, paged and NDJSON catalog reads")
+    parser.add_argument('--catalog-runs', type=int, default=3, help="runs per catalog read mode")
+    parser.add_argument('--page-size', type=int, default=500, help="costumes per page in paged catalog reads")
+    parser.add_argument('--search-benchmark', action='store_true',
+                        help="time the search query mix against --base-url, or with --local against servers "
+                             "seeded at each --search-sizes")
+    parser.add_argument('--search-target', choices=['laravel', 'stand-in'], default='laravel',
+                        help="what --local search benchmarks serve: the Laravel backend through php artisan serve "
+                             "on a scratch SQLite database, or the Python stand-in's search index")
+    parser.add_argument('--backend-dir', default=BACKEND_DIR, help="Laravel app for --search-target laravel")
+    parser.add_argument('--search-sizes', type=lambda value: [int(size) for size in value.split(',')],
+                        default=[10000, 100000, 1000000], help="comma-separated catalog sizes to benchmark")
+    parser.add_argument('--search-queries', type=int, default=500, help="search requests per catalog size")
+    parser.add_argument('--local-cache-ttl', type=float,
+                        help="seconds the stand-in caches costume responses, 0 to disable; "
+                             "defaults to 60, or 0 when profiling so handlers actually run")
+    parser.add_argument('--summary-benchmark', action='store_true',
+                        help="compare the bookings summary endpoint with tallying the full bookings list")
+    parser.add_argument('--summary-runs', type=int, default=5, help="runs per bookings summary variant")
+    parser.add_argument('--soak', action='store_true',
+                        help="repeat the functional tests for hours, watching server resources for leaks")
+    parser.add_argument('--soak-duration', type=float, default=4 * 3600, help="soak test length in seconds")
+    parser.add_argument('--soak-interval', type=float, default=10.0, help="seconds between test plan passes")
+    parser.add_argument('--soak-warmup', type=float, default=300.0,
+                        help="seconds of samples left out of the leak check while pools and caches fill")
+    parser.add_argument('--sample-interval', type=float, default=30.0, help="seconds between resource samples")
+    parser.add_argument('--server-pid', type=int, help="local server process to sample memory and descriptors of")
+    parser.add_argument('--mongo-url', default=os.environ.get('MONGO_URL'),
+                        help="Mongo instance to count connections on with serverStatus (default $MONGO_URL)")
+    parser.add_argument('--leak-threshold', type=float, default=SOAK_GROWTH_PER_HOUR,
+                        help="growth per hour, as a fraction of the starting level, that counts as a leak")
+    parser.add_argument('--profile', help="sample the stand-in server's stacks and write them here (collapsed format)")
+    parser.add_argument('--profile-scenario', choices=[name for name, _, _ in TEST_PLAN],
+                        help="replay one test against the --local stand-in, writing a flame graph and, with "
+                             "--local-store mongo, a query breakdown per endpoint (--local-cache-ttl 0 to "
+                             "profile uncached reads)")
+    parser.add_argument('--profile-iterations', type=int, default=200, help="profiled passes of the scenario")
+    parser.add_argument('--profile-dir', default='/app/backend_test_profiles',
+                        help="where per-endpoint flame graphs and collapsed stacks are written")
+    return parser.parse_args()
+
+
+def start_local_server(args):
+    """Start the stand-in API in this process, with the stack sampler if profiling"""
+    sys.path.insert(0, SCRIPTS_DIR)
+    import local_server
+    
+    store = local_server.create_store(args.local_store, args.local_costumes, args.local_users, args.local_bookings)
+    profiling = args.profile or args.profile_scenario
+    # A profile of cached reads only shows the cache lookup
+    cache_ttl = args.local_cache_ttl if args.local_cache_ttl is not None else (0 if profiling else 60.0)
+    cache = local_server.ResponseCache(ttl=cache_ttl) if cache_ttl > 0 else None
+    server = local_server.LocalServer(store, cache=cache).start()
+    sampler = local_server.StackSampler(server.active_threads).start() if profiling else None
+    print(f"🏠 Local stand-in server on {server.base_url} ({args.local_store} store)")
+    return server, sampler
+
+
+def finish_profile(sampler, path):
+    sampler.stop()
+    sampler.write_collapsed(path)
+    top = sampler.top_functions()
+    
+    print(f"\n🔥 Profile: {sampler.samples} samples written to {path}")
+    if not sampler.samples:
+        print("⚠️  No stack samples: every request finished between samples; run more requests")
+    for frame, count in top:
+        print(f"{count / sampler.samples * 100 if sampler.samples else 0:5.1f}%  {frame}")
+    
+    return {
+        'samples': sampler.samples,
+        'output': path,
+        'top_functions': [{'frame': frame, 'samples': count} for frame, count in top],
+    }
+
+
+def run_scenario_profile(args, server, sampler):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2,
+                                    concurrency=args.concurrency, detail_sample=args.costume_details or None)
+    profiler = ScenarioProfiler(tester, server, sampler, args.profile_scenario, iterations=args.profile_iterations,
+                                output_dir=args.profile_dir, workers=args.workers)
+    report = run_async(tester, profiler.run())
+    
+    return ({'scenario_profile': report,
+             'requests': [{**timing, 'test': args.profile_scenario} for timing in tester.request_timings]},
+            report['failed_tests'] == 0)
+
+
+def run_load_test(args):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2)
+    load_tester = LoadTester(tester, virtual_users=args.virtual_users, rate=args.rate,
+                             duration=args.duration, ramp_up=args.ramp_up, seed=args.seed,
+                             tokens=TokenPool.for_tester(tester, args.token_accounts, args.token_cache))
+    report = run_async(tester, load_tester.run())
+    
+    return ({'load': report, 'requests': load_tester.request_log},
+            report['total_errors'] == 0 and report['dropped_iterations'] == 0)
+
+
+def run_contention_test(args):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2)
+    contention_tester = BookingContentionTester(tester, requests=args.contention_requests,
+                                                concurrency=args.virtual_users, costumes=args.contention_costumes,
+                                                window_days=args.window_days, seed=args.seed,
+                                                tokens=TokenPool.for_tester(tester, args.token_accounts,
+                                                                            args.token_cache))
+    report = run_async(tester, contention_tester.run())
+    
+    verification = report['verification']
+    success = (report['total_errors'] == 0 and verification['double_booked_count'] == 0
+               and verification['stored'] == verification['accepted'])
+    return {'contention': report, 'requests': contention_tester.request_log}, success
+
+
+def run_soak_test(args):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2,
+                                    concurrency=args.concurrency, detail_sample=args.costume_details or None)
+    # With --local the stand-in server runs in this process
+    pid = args.server_pid or (os.getpid() if args.local else None)
+    soak_tester = SoakTester(tester, duration=args.soak_duration, interval=args.soak_interval,
+                             sample_interval=args.sample_interval, warmup=args.soak_warmup, pid=pid,
+                             mongo_url=args.mongo_url, workers=args.workers, alpha=args.alpha,
+                             threshold=args.leak_threshold)
+    report = run_async(tester, soak_tester.run())
+    
+    return {'soak': report}, report['failed_iterations'] == 0 and not report['leaks']
+
+
+def run_catalog_benchmark(args):
+    # Each run gets a fresh process, since peak RSS only ever grows within one
+    context = multiprocessing.get_context('spawn')
+    report = {}
+    for mode in CATALOG_MODES:
+        runs = []
+        for _ in range(args.catalog_runs):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                runs.append(pool.submit(catalog_probe, args.base_url, mode, args.page_size).result())
+        report[mode] = {
+            'items': runs[0]['items'],
+            'first_item_ms': sorted(run['first_item_ms'] for run in runs)[len(runs) // 2],
+            'total_ms': sorted(run['total_ms'] for run in runs)[len(runs) // 2],
+            'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+            'rss_growth_mb': max(run['rss_growth_mb'] for run in runs),
+            'runs': runs,
+        }
+    
+    print(f"\n📊 Catalog Read Benchmark (median of {args.catalog_runs} runs):")
+    print(f"{'Mode':<8} {'items':>8} {'first item':>11} {'total':>10} {'peak RSS':>10} {'growth':>9}")
+    for mode, stats in report.items():
+        print(f"{mode:<8} {stats['items']:>8} {stats['first_item_ms']:>9.1f}ms {stats['total_ms']:>8.1f}ms "
+              f"{stats['peak_rss_mb']:>8.1f}MB {stats['rss_growth_mb']:>7.1f}MB")
+    
+    counts = {run['items'] for stats in report.values() for run in stats['runs']}
+    return {'catalog': report}, len(counts) == 1
+
+
+def time_searches(tester, args, rng):
+    """Latencies of --search-queries requests from the query mix, by kind, and the error
+    and cache hit counts; cached responses aren't timed, since they don't run the search"""
+    kinds = list(SEARCH_QUERY_MIX)
+    weights = [SEARCH_QUERY_MIX[kind][0] for kind in kinds]
+    latencies = defaultdict(list)
+    
+    async def search():
+        # One query at a time, so latencies aren't queueing behind each other
+        errors = hits = 0
+        for _ in range(args.search_queries):
+            kind = rng.choices(kinds, weights)[0]
+            params = {'search': rng.choice(SEARCH_QUERY_MIX[kind][1]), 'limit': SEARCH_PAGE_SIZE}
+            if rng.random() < 0.25:
+                params['category'] = rng.choice(SEARCH_CATEGORIES)
+            started = time.perf_counter()
+            response = await tester.make_request('GET', 'costumes', params=params)
+            if response is None or response.status_code != 200:
+                errors += 1
+            elif response.headers.get('X-Cache') == 'HIT':
+                hits += 1
+            else:
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+        return errors, hits
+    
+    errors, hits = run_async(tester, search())
+    return latencies, errors, hits
+
+
+def search_report(latencies, errors, hits, **fields):
+    def stats(values):
+        values = sorted(values)
+        return {'requests': len(values), 'p50_ms': percentile(values, 50),
+                'p95_ms': percentile(values, 95), 'p99_ms': percentile(values, 99)}
+    
+    return {
+        **fields,
+        'errors': errors,
+        'cache_hits': hits,
+        'overall': stats([value for values in latencies.values() for value in values]),
+        'kinds': {kind: stats(values) for kind, values in latencies.items()},
+    }
+
+
+class LaravelServer:
+    """The Laravel backend under php artisan serve, on a scratch SQLite database"""
+    
+    def __init__(self, backend_dir):
+        self.backend_dir = backend_dir
+        self.workdir = tempfile.TemporaryDirectory(prefix='costume-search-')
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        # Process variables win over backend/.env, so a developer's own database is never touched
+        self.env = dict(os.environ,
+                        APP_ENV='local',
+                        APP_DEBUG='false',
+                        APP_KEY='base64:' + base64.b64encode(os.urandom(32)).decode(),
+                        DB_CONNECTION='sqlite',
+                        DB_DATABASE=os.path.join(self.workdir.name, 'database.sqlite'),
+                        CACHE_STORE='database',
+                        QUEUE_CONNECTION='sync',
+                        LOG_LEVEL='error')
+        self.process = None
+    
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+    
+    def artisan(self, *command):
+        subprocess.run(['php', 'artisan', *command], cwd=self.backend_dir, env=self.env, check=True,
+                       stdout=subprocess.DEVNULL)
+    
+    def seed(self, costume_count, seed=42):
+        """Migrate and import the catalog the stand-in would hold at this size, so both targets search the same data"""
+        import seed_data
+        
+        open(self.env['DB_DATABASE'], 'w').close()
+        self.artisan('migrate', '--force')
+        samples = seed_data.sample_costumes()
+        images = sorted({url for costume in samples for url in costume['images']})
+        generated = seed_data.generate_costumes(random.Random(f"{seed}:costumes"), costume_count, images,
+                                                datetime.now(timezone.utc))
+        path = os.path.join(self.workdir.name, 'costumes.jsonl')
+        with open(path, 'w') as f:
+            for costume in samples + list(generated):
+                f.write(json.dumps(costume) + '\n')
+        self.artisan('costumes:import', path)
+        return self
+    
+    def start(self, timeout=30):
+        self.process = subprocess.Popen(['php', 'artisan', 'serve', '--host=127.0.0.1', f'--port={self.port}'],
+                                        cwd=self.backend_dir, env=self.env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(f"{self.base_url}/up", timeout=1.0)
+                return self
+            except httpx.TransportError:
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"php artisan serve didn't come up on {self.base_url}")
+    
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+        self.workdir.cleanup()
+
+
+def run_search_benchmark(args):
+    rng = random.Random(args.seed)
+    report = {}
+    if not args.local:
+        # The deployed catalog is whatever it was seeded with, e.g. by
+        # scripts/seed_data.py --costumes N, so one pass per invocation
+        tester = CostumeRentalAPITester(args.base_url, pool_size=1)
+        report[args.base_url] = search_report(*time_searches(tester, args, rng), costumes=None,
+                                              base_url=args.base_url)
+    else:
+        sys.path.insert(0, SCRIPTS_DIR)
+        import local_server
+        
+        for size in args.search_sizes:
+            started = time.perf_counter()
+            if args.search_target == 'laravel':
+                server = LaravelServer(args.backend_dir).seed(size)
+            else:
+                store = local_server.create_store('memory', size, 0, 0)
+                server = local_server.LocalServer(store)
+            load_s = time.perf_counter() - started
+            server.start()
+            tester = CostumeRentalAPITester(server.base_url, pool_size=1)
+            try:
+                results = time_searches(tester, args, rng)
+            finally:
+                server.stop()
+            report[str(size)] = search_report(*results, costumes=size, load_s=load_s, target=args.search_target)
+            del server
+    
+    target = args.search_target if args.local else args.base_url
+    print(f"\n📊 Search Benchmark on {target} ({args.search_queries} queries per target, "
+          f"top {SEARCH_PAGE_SIZE} results):")
+    print(f"{'Target':>9} {'kind':<8} {'req':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for target, result in report.items():
+        label = result['costumes'] if result['costumes'] is not None else 'remote'
+        for kind, stats in [('all', result['overall'])] + sorted(result['kinds'].items()):
+            print(f"{label:>9} {kind:<8} {stats['requests']:>5} {stats['p50_ms']:>6.1f}ms "
+                  f"{stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms")
+        if result['cache_hits']:
+            print(f"{'':>9} {result['cache_hits']} cached responses from {target} left out of the timings")
+    
+    return {'search': report}, all(result['errors'] == 0 for result in report.values())
+
+
+def run_summary_benchmark(args):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2)
+    return run_async(tester, summary_benchmark(tester, args))
+
+
+async def summary_benchmark(tester, args):
+    response = await tester.make_request('POST', 'auth/login', {'email': tester.admin_email,
+                                                                 'password': tester.admin_password})
+    if not response or response.status_code != 200:
+        print("❌ Admin login failed")
+        return {'summary_benchmark': {}}, False
+    token = response.json()['access_token']
+    
+    today = datetime.now().date()
+    ranges = {'all': (None, None), 'last_30_days': ((today - timedelta(days=30)).isoformat(), today.isoformat())}
+    report = {}
+    success = True
+    for name, (start, end) in ranges.items():
+        params = {key: value for key, value in (('from', start), ('to', end)) if value}
+        client_ms, server_ms = [], []
+        for _ in range(args.summary_runs):
+            # What the admin page did: pull every booking and costume, then tally
+            started = time.perf_counter()
+            bookings_response = await tester.make_request('GET', 'admin/bookings', token=token)
+            costumes_response = await tester.make_request('GET', 'costumes')
+            bookings, costumes = bookings_response.json(), costumes_response.json()
+            tally_bookings(bookings, costumes, start, end)
+            client_ms.append((time.perf_counter() - started) * 1000)
+            
+            started = time.perf_counter()
+            summary_response = await tester.make_request('GET', 'admin/bookings/summary', token=token, params=params)
+            summary = summary_response.json()
+            server_ms.append((time.perf_counter() - started) * 1000)
+        
+        mismatches = summary_mismatches(summary, bookings, costumes, start, end)
+        success = success and not mismatches and summary_response.status_code == 200
+        report[name] = {
+            'range': params,
+            'bookings': summary['totals']['bookings'],
+            'client_tally_p50_ms': percentile(sorted(client_ms), 50),
+            'client_tally_bytes': len(bookings_response.content) + len(costumes_response.content),
+            'summary_p50_ms': percentile(sorted(server_ms), 50),
+            'summary_bytes': len(summary_response.content),
+            'mismatches': mismatches,
+        }
+    
+    print(f"\n📊 Bookings Summary Benchmark (median of {args.summary_runs} runs):")
+    print(f"{'Range':<14} {'bookings':>9} {'client tally':>13} {'bytes':>12} {'summary':>10} {'bytes':>9}")
+    for name, result in report.items():
+        print(f"{name:<14} {result['bookings']:>9} {result['client_tally_p50_ms']:>11.1f}ms "
+              f"{result['client_tally_bytes']:>12,} {result['summary_p50_ms']:>8.1f}ms {result['summary_bytes']:>9,}")
+        for mismatch in result['mismatches'][:5]:
+            print(f"   ❌ {mismatch}")
+    
+    return {'summary_benchmark': report}, success
+
+
+def run_functional_tests(args):
+    tester = CostumeRentalAPITester(args.base_url, pool_size=args.pool_size, http2=args.http2,
+                                    concurrency=args.concurrency, detail_sample=args.costume_details or None)
+    success = run_async(tester, tester.run_all_tests(workers=args.workers, min_samples=args.min_samples))
+    
+    return {
+        'summary': {
+            'tests_run': tester.tests_run,
+            'tests_passed': tester.tests_passed,
+            'success_rate': (tester.tests_passed/tester.tests_run)*100 if tester.tests_run > 0 else 0
+        },
+        'connections': tester.timing_summary(),
+        'endpoints': endpoint_stats(tester.request_timings),
+        # Request timings are saved once, as the request rows
+        'results': [{key: value for key, value in result.items() if key != 'timings'}
+                    for result in tester.test_results],
+        'requests': [{**timing, 'test': result['test']} for result in tester.test_results
+                     for timing in result['timings']],
+    }, success
+
+
+def run_mode(args):
+    for mode in ('profile_scenario', 'search_benchmark', 'catalog_benchmark', 'summary_benchmark', 'soak',
+                 'contention', 'load'):
+        if getattr(args, mode):
+            return mode
+    return 'functional'
+
+
+def record_history(args, started_at, elapsed, success, results, rows):
+    """Append this run's request rows and per-endpoint percentiles to the results history"""
+    sys.path.insert(0, SCRIPTS_DIR)
+    import results_store
+    
+    store = results_store.ResultsStore(args.history)
+    entry = store.append({
+        'run_id': results_store.new_run_id(started_at),
+        'started_at': started_at.isoformat(),
+        'mode': run_mode(args),
+        'base_url': args.base_url,
+        'success': success,
+        'elapsed_s': round(elapsed, 3),
+        'summary': results.get('summary'),
+    }, rows)
+    print(f"\n🗄️  Run {entry['run_id']}: {entry['requests']} requests appended to {args.history}")
+    return entry['run_id']
+
+
+def compare_with_baseline(args, results):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    comparison = compare_results(baseline, results, threshold=args.threshold, alpha=args.alpha,
+                                 min_samples=args.min_samples)
+    print_comparison(comparison)
+    return comparison
+
+
+def main():
+    args = parse_args()
+    if args.current:
+        if not args.baseline:
+            print("--current needs a --baseline to compare against")
+            return 2
+        with open(args.current) as f:
+            comparison = compare_with_baseline(args, json.load(f))
+        return 1 if comparison['regressions'] else 0
+    if args.profile and (not args.local or args.search_benchmark):
+        print("--profile samples the stand-in server, so it needs --local and no --search-benchmark")
+        return 2
+    if args.profile_scenario and (not args.local or args.search_benchmark):
+        print("--profile-scenario replays against the stand-in server, so it needs --local and no --search-benchmark")
+        return 2
+    if args.search_benchmark and args.local and args.search_target == 'laravel' and not shutil.which('php'):
+        print("--search-target laravel serves the backend with php artisan serve, so it needs PHP on the PATH; "
+              "use --search-target stand-in to time the Python stand-in instead")
+        return 2
+    
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    server = sampler = None
+    # The search benchmark starts its own stand-in per catalog size
+    if args.local and not args.search_benchmark:
+        server, sampler = start_local_server(args)
+        args.base_url = server.base_url
+    
+    try:
+        if args.profile_scenario:
+            results, success = run_scenario_profile(args, server, sampler)
+        elif args.search_benchmark:
+            results, success = run_search_benchmark(args)
+        elif args.catalog_benchmark:
+            results, success = run_catalog_benchmark(args)
+        elif args.summary_benchmark:
+            results, success = run_summary_benchmark(args)
+        elif args.soak:
+            results, success = run_soak_test(args)
+        elif args.contention:
+            results, success = run_contention_test(args)
+        elif args.load:
+            results, success = run_load_test(args)
+        else:
+            results, success = run_functional_tests(args)
+        
+        if args.profile:
+            results['profile'] = finish_profile(sampler, args.profile)
+    finally:
+        if server:
+            server.stop()
+    
+    if args.baseline:
+        results['comparison'] = compare_with_baseline(args, results)
+        success = success and not results['comparison']['regressions']
+    
+    # Request rows are kept once: in the history when there is one, which a
+    # later --baseline of this file reads them back from, else in the results JSON
+    rows = results.pop('requests', [])
+    if args.history:
+        results['run_id'] = record_history(args, started_at, time.perf_counter() - started, success, results, rows)
+        results['history'] = args.history
+    elif rows:
+        results['requests'] = rows
+    
+    with open(args.output, 'w') as f:
+        json.dump(results, f, separators=(',', ':'))
     
     return 0 if success else 1
 
@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from PIL import Image, ImageOps
+from pymongo import UpdateOne
+
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+# Thumbnail name -> longest edge in pixels, largest first
+THUMBNAIL_SIZES = {"medium": 640, "small": 240}
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_QUALITY = 80
+# Source URL -> rendered thumbnails, so re-runs only render new images
+INDEX_FILE = "index.json"
+
+
+def fixture_path(fixtures, url):
+    """Local stand-in for a remote image: the last path segment of its URL, with or without .jpg"""
+    name = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    for candidate in (name, f"{name}.jpg"):
+        path = os.path.join(fixtures, candidate)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No fixture for {url} in {fixtures}")
+
+
+def load_source(url, fixtures=None, timeout=30.0):
+    if fixtures:
+        with open(fixture_path(fixtures, url), "rb") as f:
+            return f.read()
+    response = httpx.get(url, timeout=timeout, follow_redirects=True)
+    response.raise_for_status()
+    return response.content
+
+
+def write_asset(output_dir, data):
+    """Store bytes under their own SHA-256, so identical thumbnails are kept once"""
+    digest = hashlib.sha256(data).hexdigest()
+    relative = f"{digest[:2]}/{digest}.{THUMBNAIL_FORMAT.lower()}"
+    path = os.path.join(output_dir, relative)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    return relative
+
+
+def render_thumbnails(url, output_dir, base_url, fixtures=None, timeout=30.0):
+    """Worker: load one source image and write every thumbnail size; runs in a pool process"""
+    data = load_source(url, fixtures, timeout)
+    image = Image.open(io.BytesIO(data))
+    # Lets JPEG decode at a reduced scale that still covers the largest thumbnail
+    largest = max(THUMBNAIL_SIZES.values())
+    image.draft("RGB", (largest, largest))
+    image = ImageOps.exif_transpose(image).convert("RGB")
+
+    variants = {}
+    for name, edge in THUMBNAIL_SIZES.items():
+        # Each size is cut from the previous, larger one rather than the full source
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=4)
+        relative = write_asset(output_dir, buffer.getvalue())
+        variants[name] = {
+            "url": f"{base_url.rstrip('/')}/{relative}",
+            "width": image.width,
+            "height": image.height,
+            "bytes": buffer.tell(),
+        }
+    return {
+        "source_sha256": hashlib.sha256(data).hexdigest(),
+        "source_bytes": len(data),
+        **variants,
+    }
+
+
+def load_index(output_dir):
+    try:
+        with open(os.path.join(output_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_index(output_dir, index):
+    path = os.path.join(output_dir, INDEX_FILE)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def rendered(output_dir, base_url, entry):
+    """Whether every thumbnail an index entry points to is still on disk"""
+    prefix = base_url.rstrip("/") + "/"
+    return all(os.path.exists(os.path.join(output_dir, entry[name]["url"].removeprefix(prefix)))
+               for name in THUMBNAIL_SIZES)
+
+
+def costume_manifest(images, index):
+    """What a costume's `thumbnails` field should hold: one entry per image, in the order of `images`"""
+    manifest = []
+    for url in images:
+        entry = index.get(url)
+        if entry:
+            manifest.append({"source": url, **{name: entry[name] for name in THUMBNAIL_SIZES}})
+    return manifest
+
+
+def render_safely(url, output_dir, base_url, fixtures=None, timeout=30.0):
+    """render_thumbnails, with failures returned as text, since not every exception pickles back"""
+    try:
+        return render_thumbnails(url, output_dir, base_url, fixtures, timeout), None
+    except (OSError, ValueError, Image.DecompressionBombError, httpx.HTTPError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+async def render_all(urls, output_dir, base_url, fixtures, workers, timeout):
+    """Render URLs on a pool of at most `workers` processes, yielding (url, entry, error) as each finishes"""
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async def render(url):
+            entry, error = await loop.run_in_executor(pool, render_safely, url, output_dir, base_url, fixtures,
+                                                      timeout)
+            return url, entry, error
+
+        for finished in asyncio.as_completed([render(url) for url in urls]):
+            yield await finished
+
+
+async def write_manifests(db, costumes, index, batch_size):
+    """Set each costume's thumbnails to match the index, skipping costumes already up to date"""
+    updated = unchanged = 0
+    requests = []
+    for costume in costumes:
+        manifest = costume_manifest(costume.get("images") or [], index)
+        if manifest == costume.get("thumbnails"):
+            unchanged += 1
+            continue
+        requests.append(UpdateOne({"id": costume["id"]}, {"$set": {"thumbnails": manifest}}))
+        if len(requests) >= batch_size:
+            updated += (await db.costumes.bulk_write(requests, ordered=False)).modified_count
+            requests = []
+    if requests:
+        updated += (await db.costumes.bulk_write(requests, ordered=False)).modified_count
+    return updated, unchanged
+
+
+async def build_thumbnails(db, output_dir, base_url="/thumbnails", fixtures=None, workers=None, batch_size=500,
+                           force=False, timeout=30.0):
+    """Render thumbnails for every distinct costume image and point each costume at them"""
+    started = time.perf_counter()
+    costumes = await db.costumes.find({}, {"_id": 0, "id": 1, "images": 1, "thumbnails": 1}).to_list(length=None)
+    references = Counter(url for costume in costumes for url in costume.get("images") or [])
+    index = load_index(output_dir)
+    pending = [url for url in references
+               if force or url not in index or not rendered(output_dir, base_url, index[url])]
+    print(f"{sum(references.values()):,} image references across {len(costumes):,} costumes, "
+          f"{len(references):,} distinct; {len(pending):,} to render"
+          f"{' from ' + fixtures if fixtures else ''}")
+
+    stats = {"rendered": 0, "failed": 0, "source_bytes": 0}
+    render_started = time.perf_counter()
+    async for url, entry, error in render_all(pending, output_dir, base_url, fixtures, workers, timeout):
+        if error:
+            stats["failed"] += 1
+            print(f"  ❌ {url}: {error}")
+            continue
+        index[url] = entry
+        stats["rendered"] += 1
+        stats["source_bytes"] += entry["source_bytes"]
+    render_seconds = time.perf_counter() - render_started
+    save_index(output_dir, index)
+
+    updated, unchanged = await write_manifests(db, costumes, index, batch_size)
+    report = {
+        "costumes": len(costumes),
+        "references": sum(references.values()),
+        "distinct": len(references),
+        "cached": len(references) - len(pending),
+        **stats,
+        "render_s": render_seconds,
+        "images_per_s": stats["rendered"] / render_seconds if render_seconds else 0.0,
+        "source_mb_per_s": stats["source_bytes"] / 2**20 / render_seconds if render_seconds else 0.0,
+        "costumes_updated": updated,
+        "costumes_unchanged": unchanged,
+        "elapsed_s": time.perf_counter() - started,
+    }
+    # What clients download: every reference, as the original versus as each thumbnail size
+    known = [(url, count) for url, count in references.items() if url in index]
+    report["original_bytes"] = sum(index[url]["source_bytes"] * count for url, count in known)
+    for name in THUMBNAIL_SIZES:
+        report[f"{name}_bytes"] = sum(index[url][name]["bytes"] * count for url, count in known)
+    return report
+
+
+def print_report(report):
+    print(f"Rendered {report['rendered']:,} images ({report['cached']:,} already cached, {report['failed']:,} failed) "
+          f"in {report['render_s']:.1f}s: {report['images_per_s']:,.1f} images/s, "
+          f"{report['source_mb_per_s']:,.1f} MB/s of originals")
+    original = report["original_bytes"]
+    for name in THUMBNAIL_SIZES:
+        size = report[f"{name}_bytes"]
+        saved = 1 - size / original if original else 0.0
+        print(f"  {name:>6}: {size / 2**20:,.2f} MB instead of {original / 2**20:,.2f} MB of originals "
+              f"across all references, {saved:.1%} saved")
+    print(f"Costumes updated: {report['costumes_updated']:,} ({report['costumes_unchanged']:,} unchanged) "
+          f"in {report['elapsed_s']:.1f}s total")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render costume image thumbnails and record them on each costume")
+    parser.add_argument("--fixtures", help="offline mode: read images from this directory, named after the last "
+                                           "path segment of their URL, instead of downloading them")
+    parser.add_argument("--output-dir", default=str(ROOT_DIR / "public" / "thumbnails"),
+                        help="where content-addressed thumbnails and the render index are written")
+    parser.add_argument("--base-url", default="/thumbnails", help="URL prefix the output directory is served under")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=500, help="costume updates per bulk_write")
+    parser.add_argument("--timeout", type=float, default=30.0, help="download timeout in seconds when online")
+    parser.add_argument("--force", action="store_true", help="re-render images already in the index")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        report = await build_thumbnails(db, args.output_dir, args.base_url, args.fixtures, args.workers,
+                                        args.batch_size, args.force, args.timeout)
+    finally:
+        client.close()
+    print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,974 @@
+import argparse
+import asyncio
+import base64
+import bisect
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import traceback
+import types
+import uuid
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+from pymongo import ASCENDING, DESCENDING, MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import seed_data
+from search_index import SearchIndex
+from seed_data import pwd_context
+
+# Fields that never leave the server
+PRIVATE_FIELDS = ("_id", "password", "content_hash")
+# Statuses that release a costume size for other bookings
+RELEASED_STATUSES = ("cancelled",)
+TOKEN_TTL = 3600
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Costumes fetched per store query and written per chunk when streaming NDJSON
+STREAM_BATCH_SIZE = 500
+CACHE_TTL = 60.0
+CACHE_MAX_ENTRIES = 1024
+# Costumes listed in a bookings summary, highest revenue first
+SUMMARY_COSTUME_LIMIT = 50
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _public(document):
+    return {key: value for key, value in document.items() if key not in PRIVATE_FIELDS}
+
+
+def _etags(header):
+    # If-None-Match is a comma-separated list; weak validators compare equal here
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _overlaps(booking, start_date, end_date):
+    return booking["start_date"] <= end_date and booking["end_date"] >= start_date
+
+
+def _rental_days(booking):
+    # Both the start and the end date are rental days
+    return (date.fromisoformat(booking["end_date"]) - date.fromisoformat(booking["start_date"])).days + 1
+
+
+def _summary_rows(groups, key, sort_key, limit=None):
+    rows = [{key: name, "bookings": measures[0], "rental_days": measures[1], "revenue": round(measures[2], 2)}
+            for name, measures in groups.items()]
+    rows.sort(key=sort_key)
+    return rows[:limit] if limit is not None else rows
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def write_cursor(position):
+    return _b64(json.dumps(position).encode())
+
+
+def read_cursor(cursor):
+    position = json.loads(_unb64(cursor))
+    if not isinstance(position, dict) or not isinstance(position.get("id"), str):
+        raise ValueError("malformed cursor")
+    return position
+
+
+def issue_token(secret, email, ttl=TOKEN_TTL):
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64(json.dumps({"sub": email, "exp": int(time.time()) + ttl}, separators=(",", ":")).encode())
+    signature = _b64(hmac.new(secret, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+    return f"{header}.{payload}.{signature}"
+
+
+def read_token(secret, token):
+    try:
+        header, payload, signature = token.split(".")
+        expected = _b64(hmac.new(secret, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            return None
+        claims = json.loads(_unb64(payload))
+    except (ValueError, json.JSONDecodeError):
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims.get("sub")
+
+
+class _SeedSink:
+    """Just enough of a Motor collection for seed_data's loaders to fill a MemoryStore"""
+
+    def __init__(self, name, documents, key):
+        self.name = name
+        self.documents = documents
+        self.key = key
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            self.documents[document[self.key]] = document
+        return SimpleNamespace(inserted_ids=[document[self.key] for document in documents])
+
+
+class ResponseCache:
+    """LRU cache of serialised GET responses with a TTL, invalidated by tag"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires, status, body, etag, tags), least recently used first
+        self.entries = OrderedDict()
+        # Bumped on every invalidation, so a response built from data read
+        # before a write is never stored after it
+        self.generation = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, key, tags, build):
+        """(status, body, etag, hit) for key, calling build() -> (status, body) on a miss; only 200s are kept"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2], entry[3], True
+            self.misses += 1
+            generation = self.generation
+
+        status, body = build()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self.lock:
+            if status == 200 and generation == self.generation:
+                self.entries[key] = (time.monotonic() + self.ttl, status, body, etag, frozenset(tags))
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return status, body, etag, False
+
+    def invalidate(self, tags):
+        with self.lock:
+            self.generation += 1
+            stale = [key for key, entry in self.entries.items() if entry[4] & tags]
+            for key in stale:
+                del self.entries[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+class MemoryStore:
+    """Dict-backed store with the same query shapes as the API's database"""
+
+    def __init__(self):
+        self.users = {}
+        self.costumes = {}
+        # Sorted costume ids, the keyset pages and streams walk
+        self.costume_ids = []
+        self.search_index = SearchIndex()
+        self.bookings = {}
+        # (costume id, size) -> its bookings, so availability checks only read that costume size's bookings
+        self.slot_bookings = defaultdict(list)
+        self.lock = threading.RLock()
+
+    def load_seed_data(self, costume_count=0, user_count=0, booking_count=0, seed=42):
+        # Reuse the seed script's loaders so the store matches a seeded database
+        sinks = SimpleNamespace(
+            users=_SeedSink("users", self.users, "email"),
+            costumes=_SeedSink("costumes", self.costumes, "id"),
+            bookings=_SeedSink("bookings", self.bookings, "id"),
+        )
+        users = seed_data.sample_users()
+        costumes = seed_data.sample_costumes()
+
+        async def load():
+            await seed_data.load_collection(sinks.users, users, reuse_hashes=True)
+            await seed_data.load_collection(sinks.costumes, costumes)
+            if costume_count or user_count or booking_count:
+                await seed_data.seed_bulk(sinks, costume_count, user_count, booking_count, seed=seed,
+                                          sample_costumes=costumes, sample_users=users, reuse_hashes=True)
+
+        asyncio.run(load())
+        self.costume_ids = sorted(self.costumes)
+        for costume in self.costumes.values():
+            self.search_index.add(costume)
+        for booking in self.bookings.values():
+            self.slot_bookings[(booking["costume_id"], booking["size"])].append(booking)
+        return self
+
+    def find_user(self, email):
+        return self.users.get(email)
+
+    def insert_user(self, user):
+        with self.lock:
+            if user["email"] in self.users:
+                return False
+            self.users[user["email"]] = user
+            return True
+
+    def list_costumes(self, category=None, search=None):
+        if search is not None:
+            return [costume for _, costume in self.search_costumes(search, category)]
+        # Handler threads insert concurrently, so filter a snapshot taken under the lock
+        with self.lock:
+            costumes = list(self.costumes.values())
+        return [c for c in costumes if category is None or c["category"] == category]
+
+    def costumes_page(self, category=None, after=None, limit=DEFAULT_PAGE_SIZE):
+        page = []
+        with self.lock:
+            start = bisect.bisect_right(self.costume_ids, after) if after is not None else 0
+            for costume_id in self.costume_ids[start:]:
+                costume = self.costumes[costume_id]
+                if category is None or costume["category"] == category:
+                    page.append(costume)
+                    if len(page) >= limit:
+                        break
+        return page
+
+    def search_costumes(self, search, category=None, after=None, limit=None):
+        accept = (lambda costume_id: self.costumes[costume_id]["category"] == category) if category else None
+        with self.lock:
+            results = self.search_index.search(search, limit=limit, after=after, accept=accept)
+            return [(score, self.costumes[costume_id]) for score, costume_id in results]
+
+    def get_costume(self, costume_id):
+        return self.costumes.get(costume_id)
+
+    def insert_costume(self, costume):
+        with self.lock:
+            if costume["id"] not in self.costumes:
+                bisect.insort(self.costume_ids, costume["id"])
+            self.costumes[costume["id"]] = costume
+            self.search_index.add(costume)
+
+    def update_costume(self, costume_id, fields):
+        with self.lock:
+            costume = self.costumes.get(costume_id)
+            if costume is not None:
+                costume.update(fields)
+                self.search_index.add(costume)
+            return costume
+
+    def delete_costume(self, costume_id):
+        with self.lock:
+            if self.costumes.pop(costume_id, None) is None:
+                return False
+            del self.costume_ids[bisect.bisect_left(self.costume_ids, costume_id)]
+            self.search_index.remove(costume_id)
+            return True
+
+    def insert_booking_if_available(self, booking):
+        with self.lock:
+            slot = self.slot_bookings[(booking["costume_id"], booking["size"])]
+            for other in slot:
+                if other["status"] not in RELEASED_STATUSES and _overlaps(other, booking["start_date"],
+                                                                          booking["end_date"]):
+                    return False
+            self.bookings[booking["id"]] = booking
+            slot.append(booking)
+            return True
+
+    def user_bookings(self, email):
+        with self.lock:
+            bookings = list(self.bookings.values())
+        bookings = [b for b in bookings if b["user_email"] == email]
+        return sorted(bookings, key=lambda b: b["created_at"], reverse=True)
+
+    def all_bookings(self):
+        with self.lock:
+            bookings = list(self.bookings.values())
+        return sorted(bookings, key=lambda b: b["created_at"], reverse=True)
+
+    def booking_summary(self, start=None, end=None, costume_limit=SUMMARY_COSTUME_LIMIT):
+        # [bookings, rental days, revenue] per group, filled in one pass over the bookings
+        groups = {name: defaultdict(lambda: [0, 0, 0.0]) for name in ("totals", "status", "category", "costume", "day")}
+        costume_names = {}
+        with self.lock:
+            bookings = list(self.bookings.values())
+        for booking in bookings:
+            if (start and booking["start_date"] < start) or (end and booking["start_date"] > end):
+                continue
+            costume = self.costumes.get(booking["costume_id"]) or {}
+            days = _rental_days(booking)
+            revenue = 0.0 if booking["status"] in RELEASED_STATUSES else days * costume.get("price_per_day", 0.0)
+            costume_names[booking["costume_id"]] = booking.get("costume_name")
+            for name, key in (("totals", None), ("status", booking["status"]), ("category", costume.get("category")),
+                              ("costume", booking["costume_id"]), ("day", booking["start_date"])):
+                measures = groups[name][key]
+                measures[0] += 1
+                measures[1] += days
+                measures[2] += revenue
+
+        totals = groups["totals"].get(None, [0, 0, 0.0])
+        by_costume = _summary_rows(groups["costume"], "costume_id", lambda row: (-row["revenue"], row["costume_id"]),
+                                   costume_limit)
+        for row in by_costume:
+            row["costume_name"] = costume_names[row["costume_id"]]
+        return {
+            "totals": {"bookings": totals[0], "rental_days": totals[1], "revenue": round(totals[2], 2)},
+            "by_status": _summary_rows(groups["status"], "status", lambda row: row["status"]),
+            "by_category": _summary_rows(groups["category"], "category",
+                                         lambda row: (-row["revenue"], row["category"] or "")),
+            "by_costume": by_costume,
+            "by_day": _summary_rows(groups["day"], "date", lambda row: row["date"]),
+        }
+
+    def update_booking_status(self, booking_id, status):
+        with self.lock:
+            booking = self.bookings.get(booking_id)
+            if booking is not None:
+                booking["status"] = status
+            return booking
+
+
+class MongoStore:
+    """Store backed by the seed script's MongoDB database"""
+
+    def __init__(self, mongo_url=None, db_name=None):
+        self.client = MongoClient(mongo_url or os.environ["MONGO_URL"])
+        self.db = self.client[db_name or os.environ["DB_NAME"]]
+        self.newest_first = [("created_at", DESCENDING)]
+        # One process serves the stand-in, so a lock is enough to make the
+        # availability check and insert atomic
+        self.booking_lock = threading.Lock()
+
+    def find_user(self, email):
+        return self.db.users.find_one({"email": email})
+
+    def insert_user(self, user):
+        if self.find_user(user["email"]):
+            return False
+        try:
+            self.db.users.insert_one(user)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def list_costumes(self, category=None, search=None):
+        if search is not None:
+            return [costume for _, costume in self.search_costumes(search, category)]
+        return list(self.db.costumes.find({"category": category} if category is not None else {}))
+
+    def costumes_page(self, category=None, after=None, limit=DEFAULT_PAGE_SIZE):
+        query = {"category": category} if category is not None else {}
+        if after is not None:
+            query["id"] = {"$gt": after}
+        return list(self.db.costumes.find(query).sort("id", ASCENDING).limit(limit))
+
+    def search_costumes(self, search, category=None, after=None, limit=None):
+        # The seed script's text index stems words but has no prefix or fuzzy
+        # matching; the memory store's SearchIndex is the full implementation
+        query = {"$text": {"$search": search}}
+        if category is not None:
+            query["category"] = category
+        results = []
+        for costume in self.db.costumes.find(query, {"score": {"$meta": "textScore"}}):
+            results.append((costume.pop("score"), costume))
+        results.sort(key=lambda result: (-result[0], result[1]["id"]))
+        if after is not None:
+            results = [result for result in results if (-result[0], result[1]["id"]) > (-after[0], after[1])]
+        return results[:limit]
+
+    def get_costume(self, costume_id):
+        return self.db.costumes.find_one({"id": costume_id})
+
+    def insert_costume(self, costume):
+        self.db.costumes.insert_one(costume)
+
+    def update_costume(self, costume_id, fields):
+        return self.db.costumes.find_one_and_update({"id": costume_id}, {"$set": fields},
+                                                    return_document=ReturnDocument.AFTER)
+
+    def delete_costume(self, costume_id):
+        return self.db.costumes.delete_one({"id": costume_id}).deleted_count > 0
+
+    def insert_booking_if_available(self, booking):
+        with self.booking_lock:
+            conflict = self.db.bookings.find_one({
+                "costume_id": booking["costume_id"],
+                "size": booking["size"],
+                "status": {"$nin": list(RELEASED_STATUSES)},
+                "start_date": {"$lte": booking["end_date"]},
+                "end_date": {"$gte": booking["start_date"]},
+            })
+            if conflict:
+                return False
+            self.db.bookings.insert_one(booking)
+            return True
+
+    def user_bookings(self, email):
+        return list(self.db.bookings.find({"user_email": email}).sort(self.newest_first))
+
+    def all_bookings(self):
+        return list(self.db.bookings.find({}).sort(self.newest_first))
+
+    def booking_summary(self, start=None, end=None, costume_limit=SUMMARY_COSTUME_LIMIT):
+        match = {}
+        if start:
+            match["$gte"] = start
+        if end:
+            match["$lte"] = end
+        measures = {"bookings": {"$sum": 1}, "rental_days": {"$sum": "$days"}, "revenue": {"$sum": "$revenue"}}
+        pipeline = [
+            {"$match": {"start_date": match}} if match else {"$match": {}},
+            {"$lookup": {"from": "costumes", "localField": "costume_id", "foreignField": "id", "as": "costume",
+                         "pipeline": [{"$project": {"_id": 0, "price_per_day": 1, "category": 1}}]}},
+            {"$unwind": {"path": "$costume", "preserveNullAndEmptyArrays": True}},
+            {"$addFields": {"days": {"$add": [{"$dateDiff": {
+                "startDate": {"$dateFromString": {"dateString": "$start_date"}},
+                "endDate": {"$dateFromString": {"dateString": "$end_date"}},
+                "unit": "day",
+            }}, 1]}}},
+            {"$addFields": {"revenue": {"$cond": [
+                {"$in": ["$status", list(RELEASED_STATUSES)]}, 0,
+                {"$multiply": ["$days", {"$ifNull": ["$costume.price_per_day", 0]}]},
+            ]}}},
+            {"$facet": {
+                "totals": [{"$group": {"_id": None, **measures}}],
+                "status": [{"$group": {"_id": "$status", **measures}}],
+                "category": [{"$group": {"_id": "$costume.category", **measures}}],
+                "costume": [{"$group": {"_id": "$costume_id", "costume_name": {"$first": "$costume_name"}, **measures}},
+                            {"$sort": {"revenue": -1, "_id": 1}}, {"$limit": costume_limit}],
+                "day": [{"$group": {"_id": "$start_date", **measures}}],
+            }},
+        ]
+        facets = next(self.db.bookings.aggregate(pipeline, allowDiskUse=True))
+
+        def groups(name):
+            return {row["_id"]: (row["bookings"], row["rental_days"], row["revenue"]) for row in facets[name]}
+
+        totals = facets["totals"][0] if facets["totals"] else {"bookings": 0, "rental_days": 0, "revenue": 0.0}
+        costume_names = {row["_id"]: row["costume_name"] for row in facets["costume"]}
+        by_costume = _summary_rows(groups("costume"), "costume_id", lambda row: (-row["revenue"], row["costume_id"]))
+        for row in by_costume:
+            row["costume_name"] = costume_names[row["costume_id"]]
+        return {
+            "totals": {"bookings": totals["bookings"], "rental_days": totals["rental_days"],
+                       "revenue": round(totals["revenue"], 2)},
+            "by_status": _summary_rows(groups("status"), "status", lambda row: row["status"]),
+            "by_category": _summary_rows(groups("category"), "category",
+                                         lambda row: (-row["revenue"], row["category"] or "")),
+            "by_costume": by_costume,
+            "by_day": _summary_rows(groups("day"), "date", lambda row: row["date"]),
+        }
+
+    def update_booking_status(self, booking_id, status):
+        return self.db.bookings.find_one_and_update({"id": booking_id}, {"$set": {"status": status}},
+                                                    return_document=ReturnDocument.AFTER)
+
+
+class CostumeRentalApp:
+    """The API's routes and rules, with the status codes and error bodies the tester expects"""
+
+    # (method, path pattern, handler, required role)
+    ROUTES = [
+        ("POST", r"/api/auth/register", "register", None),
+        ("POST", r"/api/auth/login", "login", None),
+        ("GET", r"/api/auth/me", "me", "user"),
+        ("GET", r"/api/costumes", "list_costumes", None),
+        ("GET", r"/api/costumes/(?P<id>[^/]+)", "show_costume", None),
+        ("POST", r"/api/costumes", "create_costume", "admin"),
+        ("PUT", r"/api/costumes/(?P<id>[^/]+)", "update_costume", "admin"),
+        ("DELETE", r"/api/costumes/(?P<id>[^/]+)", "delete_costume", "admin"),
+        ("POST", r"/api/bookings", "create_booking", "user"),
+        ("GET", r"/api/bookings", "list_bookings", "user"),
+        ("GET", r"/api/admin/bookings", "admin_bookings", "admin"),
+        ("GET", r"/api/admin/bookings/summary", "booking_summary", "admin"),
+        ("PUT", r"/api/admin/bookings/(?P<id>[^/]+)/status", "update_booking_status", "admin"),
+    ]
+
+    def __init__(self, store, secret=None, cache=None):
+        self.store = store
+        self.secret = secret or secrets.token_bytes(32)
+        self.cache = cache
+        self.routes = [(method, re.compile(pattern + "$"), handler, role)
+                       for method, pattern, handler, role in self.ROUTES]
+        # Route patterns as readable templates, e.g. /api/costumes/{id}
+        self.templates = {route[1]: re.sub(r"\(\?P<(\w+)>[^)]*\)", r"{\1}", pattern)
+                          for route, (_, pattern, _, _) in zip(self.routes, self.ROUTES)}
+
+    def route_label(self, method, path, params=None):
+        """Requests grouped by route and query keys, e.g. 'GET /api/costumes/{id}' or 'GET /api/costumes?search='"""
+        label = f"{method} {path}"
+        for route_method, pattern, _, _ in self.routes:
+            if route_method == method and pattern.match(path):
+                label = f"{method} {self.templates[pattern]}"
+                break
+        if params:
+            label += "?" + "&".join(f"{key}=" for key in sorted(params))
+        return label
+
+    def dispatch(self, method, path, params, body, headers):
+        """(status, payload) or (status, payload, response headers); bytes payloads are sent as they are"""
+        for route_method, pattern, handler, role in self.routes:
+            match = pattern.match(path)
+            if not match or route_method != method:
+                continue
+            user = None
+            if role:
+                user = self.authenticate(headers.get("Authorization"))
+                if user is None:
+                    return 401, {"detail": "Not authenticated"}
+                if role == "admin" and user.get("role") != "admin":
+                    return 403, {"detail": "Admin access required"}
+            request = SimpleNamespace(params=params, body=body, user=user, headers=headers, **match.groupdict())
+            return getattr(self, handler)(request)
+        return 404, {"detail": "Not Found"}
+
+    def authenticate(self, authorization):
+        if not authorization or not authorization.startswith("Bearer "):
+            return None
+        email = read_token(self.secret, authorization[len("Bearer "):])
+        return self.store.find_user(email) if email else None
+
+    def token_response(self, user):
+        return 200, {
+            "access_token": issue_token(self.secret, user["email"]),
+            "token_type": "bearer",
+            "user": _public(user),
+        }
+
+    @staticmethod
+    def invalid(body, required):
+        missing = [field for field in required if body.get(field) in (None, "")]
+        if missing:
+            return 422, {"detail": [{"loc": ["body", field], "msg": "Field required"} for field in missing]}
+        return None
+
+    def register(self, request):
+        error = self.invalid(request.body, ("email", "password", "name"))
+        if error:
+            return error
+        user = {
+            "email": request.body["email"],
+            "password": pwd_context.hash(request.body["password"]),
+            "name": request.body["name"],
+            "role": "user",
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        if not self.store.insert_user(user):
+            return 400, {"detail": "Email already registered"}
+        return self.token_response(user)
+
+    def login(self, request):
+        error = self.invalid(request.body, ("email", "password"))
+        if error:
+            return error
+        user = self.store.find_user(request.body["email"])
+        if not user or not pwd_context.verify(request.body["password"], user["password"]):
+            return 401, {"detail": "Invalid email or password"}
+        return self.token_response(user)
+
+    def me(self, request):
+        return 200, _public(request.user)
+
+    def cached(self, request, key, tags, handler):
+        """Serve handler()'s response through the cache, with an ETag clients can revalidate against"""
+        if self.cache is None:
+            return handler()
+
+        def build():
+            status, payload = handler()
+            return status, json.dumps(payload, default=str).encode()
+
+        status, body, etag, hit = self.cache.fetch(key, tags, build)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": "HIT" if hit else "MISS"}
+        if status == 200 and etag in _etags(request.headers.get("If-None-Match")):
+            return 304, None, headers
+        return status, body, headers
+
+    def invalidate_costume(self, costume_id, *categories):
+        # Lists filtered to another category can't contain the costume
+        if self.cache is not None:
+            self.cache.invalidate({f"costume:{costume_id}", "costumes:*"} | {f"costumes:{c}" for c in categories})
+
+    def list_costumes(self, request):
+        category, search = request.params.get("category"), request.params.get("search")
+        if "application/x-ndjson" in (request.headers.get("Accept") or ""):
+            return 200, self.stream_costumes(category, search)
+        key = ("costumes",) + tuple(sorted(request.params.items()))
+        return self.cached(request, key, {f"costumes:{category or '*'}"},
+                           lambda: self.costume_listing(request, category, search))
+
+    def costume_listing(self, request, category, search):
+        if "limit" in request.params or "cursor" in request.params:
+            return self.costume_page(request, category, search)
+        costumes = self.store.list_costumes(category, search)
+        return 200, [_public(costume) for costume in costumes]
+
+    def costume_batch(self, category, search, after, limit):
+        """Costumes after a cursor position, each with its own position: by relevance when searching, else by id"""
+        if search:
+            after = (after["score"], after["id"]) if after else None
+            return [({"score": score, "id": costume["id"]}, costume)
+                    for score, costume in self.store.search_costumes(search, category, after, limit)]
+        return [({"id": costume["id"]}, costume)
+                for costume in self.store.costumes_page(category, after["id"] if after else None, limit)]
+
+    def costume_page(self, request, category, search):
+        try:
+            limit = int(request.params.get("limit", DEFAULT_PAGE_SIZE))
+            after = read_cursor(request.params["cursor"]) if request.params.get("cursor") else None
+            if after and search and not isinstance(after.get("score"), (int, float)):
+                raise ValueError("search cursor without a score")
+        except (ValueError, KeyError, TypeError):
+            return 422, {"detail": "Invalid limit or cursor"}
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return 422, {"detail": f"limit must be between 1 and {MAX_PAGE_SIZE}"}
+
+        # One extra row tells whether another page follows without a count query
+        batch = self.costume_batch(category, search, after, limit + 1)
+        page = batch[:limit]
+        return 200, {
+            "data": [_public(costume) for _, costume in page],
+            "per_page": limit,
+            "next_cursor": write_cursor(page[-1][0]) if len(batch) > limit else None,
+        }
+
+    def stream_costumes(self, category, search):
+        # Walk the catalog one keyset batch at a time so memory stays flat however large it is
+        after = None
+        while True:
+            batch = self.costume_batch(category, search, after, STREAM_BATCH_SIZE)
+            if batch:
+                yield b"".join(json.dumps(_public(costume), default=str).encode() + b"\n" for _, costume in batch)
+            if len(batch) < STREAM_BATCH_SIZE:
+                return
+            after = batch[-1][0]
+
+    def show_costume(self, request):
+        return self.cached(request, ("costume", request.id), {f"costume:{request.id}"},
+                           lambda: self.costume_detail(request.id))
+
+    def costume_detail(self, costume_id):
+        costume = self.store.get_costume(costume_id)
+        if not costume:
+            return 404, {"detail": "Costume not found"}
+        return 200, _public(costume)
+
+    def create_costume(self, request):
+        error = self.invalid(request.body, ("name", "description", "category", "sizes", "images", "price_per_day"))
+        if error:
+            return error
+        costume = {
+            "id": str(uuid.uuid4()),
+            **{field: request.body[field] for field in ("name", "description", "category", "sizes", "images")},
+            "price_per_day": float(request.body["price_per_day"]),
+            "available": request.body.get("available", True),
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        self.store.insert_costume(costume)
+        self.invalidate_costume(costume["id"], costume["category"])
+        return 200, _public(costume)
+
+    def update_costume(self, request):
+        fields = {key: value for key, value in request.body.items()
+                  if key in ("name", "description", "category", "sizes", "images", "price_per_day", "available")}
+        fields["updated_at"] = _now()
+        previous = self.store.get_costume(request.id)
+        previous_category = previous["category"] if previous else None
+        costume = self.store.update_costume(request.id, fields)
+        if not costume:
+            return 404, {"detail": "Costume not found"}
+        self.invalidate_costume(request.id, previous_category, costume["category"])
+        return 200, _public(costume)
+
+    def delete_costume(self, request):
+        costume = self.store.get_costume(request.id)
+        if not costume or not self.store.delete_costume(request.id):
+            return 404, {"detail": "Costume not found"}
+        self.invalidate_costume(request.id, costume["category"])
+        return 200, {"message": "Costume deleted successfully"}
+
+    def create_booking(self, request):
+        error = self.invalid(request.body, ("costume_id", "start_date", "end_date", "size"))
+        if error:
+            return error
+        body = request.body
+        if body["end_date"] < body["start_date"]:
+            return 422, {"detail": "End date must not be before start date"}
+        costume = self.store.get_costume(body["costume_id"])
+        if not costume:
+            return 404, {"detail": "Costume not found"}
+        booking = {
+            "id": str(uuid.uuid4()),
+            "user_email": request.user["email"],
+            "user_name": request.user["name"],
+            "costume_id": costume["id"],
+            "costume_name": costume["name"],
+            "start_date": body["start_date"],
+            "end_date": body["end_date"],
+            "size": body["size"],
+            "notes": body.get("notes"),
+            "status": "pending",
+            "created_at": _now(),
+        }
+        if not self.store.insert_booking_if_available(booking):
+            return 409, {"detail": "This size is already booked for the selected dates"}
+        return 200, _public(booking)
+
+    def list_bookings(self, request):
+        return 200, [_public(booking) for booking in self.store.user_bookings(request.user["email"])]
+
+    def admin_bookings(self, request):
+        return 200, [_public(booking) for booking in self.store.all_bookings()]
+
+    def booking_summary(self, request):
+        start, end = request.params.get("from"), request.params.get("to")
+        try:
+            for value in (start, end):
+                if value:
+                    date.fromisoformat(value)
+            costume_limit = int(request.params.get("costume_limit", SUMMARY_COSTUME_LIMIT))
+        except ValueError:
+            return 422, {"detail": "from and to must be YYYY-MM-DD dates and costume_limit an integer"}
+        if start and end and end < start:
+            return 422, {"detail": "to must not be before from"}
+        summary = self.store.booking_summary(start, end, max(costume_limit, 1))
+        return 200, {"range": {"from": start, "to": end}, **summary}
+
+    def update_booking_status(self, request):
+        error = self.invalid(request.body, ("status",))
+        if error:
+            return error
+        booking = self.store.update_booking_status(request.id, request.body["status"])
+        if not booking:
+            return 404, {"detail": "Booking not found"}
+        return 200, _public(booking)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer each response into a single write and skip Nagle, otherwise
+    # delayed ACKs add ~40ms to every keep-alive request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    app = None
+    active_threads = None
+    request_log = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_request(self, method):
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        label = self.app.route_label(method, url.path, params)
+        self.active_threads[threading.get_ident()] = label
+        started = time.time()
+        headers = {}
+        try:
+            body = json.loads(self.rfile.read(length)) if length else {}
+            status, payload, *extra = self.app.dispatch(method, url.path, params, body, self.headers)
+            headers = extra[0] if extra else {}
+        except json.JSONDecodeError:
+            status, payload = 400, {"detail": "Malformed JSON body"}
+        except Exception:
+            traceback.print_exc()
+            status, payload = 500, {"detail": "Server Error"}
+
+        try:
+            if isinstance(payload, types.GeneratorType):
+                self.send_stream(status, payload)
+                return
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status == 304:
+                self.end_headers()
+                return
+            data = payload if isinstance(payload, bytes) else json.dumps(payload, default=str).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            self.active_threads.pop(threading.get_ident(), None)
+            if self.request_log is not None:
+                self.request_log.append((label, started, time.time()))
+
+    def send_stream(self, status, chunks):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+        except Exception:
+            # The status line is already out, so all that is left is to cut the stream short
+            traceback.print_exc()
+            self.close_connection = True
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+
+class LocalServer:
+    """Serve the stand-in API from background threads of the current process"""
+
+    def __init__(self, store, host="127.0.0.1", port=0, cache=None):
+        self.app = CostumeRentalApp(store, cache=cache)
+        # Thread -> route it is handling, so profiles skip idle keep-alive waits and split by endpoint
+        self.active_threads = {}
+        # (route, started, finished) wall-clock times of each request while recording
+        self.request_log = None
+        handler = type("RequestHandler", (_RequestHandler,), {"app": self.app, "active_threads": self.active_threads})
+        self.handler = handler
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="local-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def record_requests(self):
+        """Start logging request times, for matching database profiler entries to routes"""
+        self.request_log = self.handler.request_log = []
+        return self.request_log
+
+    def stop_recording(self):
+        self.request_log = self.handler.request_log = None
+
+
+class StackSampler:
+    """Sampling profiler for threads busy with a stand-in request, recording collapsed stacks
+    rooted at the route each thread was handling"""
+
+    def __init__(self, active_threads, interval=0.005):
+        self.active_threads = active_threads
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            active = dict(self.active_threads)
+            for ident, frame in sys._current_frames().items():
+                route = active.get(ident)
+                if route is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(route)
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def reset(self):
+        """Drop what was sampled so far, e.g. requests made while setting up"""
+        self.stacks = Counter()
+        self.samples = 0
+
+    def by_route(self):
+        """route -> collapsed stacks below it"""
+        routes = defaultdict(Counter)
+        for stack, count in self.stacks.items():
+            route, _, frames = stack.partition(";")
+            routes[route][frames] += count
+        return routes
+
+    def write_collapsed(self, path):
+        # One "frame;frame;frame count" line per stack, the input flamegraph tools expect
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit=15):
+        # Self time: how often each frame was the innermost one sampled
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def create_store(kind="memory", costume_count=0, user_count=0, booking_count=0, seed=42):
+    if kind == "mongo":
+        return MongoStore()
+    return MemoryStore().load_seed_data(costume_count, user_count, booking_count, seed=seed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local stand-in for the costume rental API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--store", choices=["memory", "mongo"], default="memory",
+                        help="in-memory seed data, or the database seed_data.py populated")
+    parser.add_argument("--costumes", type=int, default=0, help="synthetic costumes for the memory store")
+    parser.add_argument("--users", type=int, default=0, help="synthetic users for the memory store")
+    parser.add_argument("--bookings", type=int, default=0, help="synthetic bookings for the memory store")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for synthetic data")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="seconds costume responses are cached, 0 to disable")
+    parser.add_argument("--cache-size", type=int, default=CACHE_MAX_ENTRIES, help="cached costume responses kept")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    cache = ResponseCache(args.cache_size, args.cache_ttl) if args.cache_ttl > 0 else None
+    server = LocalServer(create_store(args.store, args.costumes, args.users, args.bookings, args.seed),
+                         args.host, args.port, cache=cache)
+    print(f"Serving the costume rental API on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
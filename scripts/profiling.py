@@ -0,0 +1,214 @@
+import bisect
+import html
+import json
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+
+FLAME_WIDTH = 1200
+FLAME_FRAME_HEIGHT = 16
+# Frames narrower than this many pixels are left out of the SVG
+FLAME_MIN_WIDTH = 0.5
+# Capped system.profile size while profiling; the server default of 1MB wraps within seconds at level 2
+PROFILE_BUFFER_BYTES = 64 * 2**20
+# Profiler timestamps are truncated to milliseconds, so request windows are widened by this much
+MATCH_SLACK_S = 0.002
+UNMATCHED = "(no request)"
+
+
+def _frame_tree(stacks):
+    # name -> [samples, children]
+    root = [0, {}]
+    for stack, count in stacks.items():
+        root[0] += count
+        node = root
+        for frame in stack.split(";"):
+            node = node[1].setdefault(frame, [0, {}])
+            node[0] += count
+    return root
+
+
+def _frame_color(name):
+    # Stable warm colours, so a function keeps its colour across graphs
+    hue = zlib.crc32(name.encode()) % 1000 / 1000
+    return f"rgb({205 + int(50 * hue)},{int(80 + 150 * (1 - hue))},{int(55 * hue)})"
+
+
+def flamegraph_svg(stacks, title="Flame graph"):
+    """SVG flame graph of collapsed stacks: root at the bottom, width proportional to samples"""
+    root = _frame_tree(stacks)
+    total = root[0] or 1
+    scale = FLAME_WIDTH / total
+    frames = []
+
+    def place(children, x, depth):
+        # Alphabetical siblings, as flamegraph.pl draws them
+        for name, (count, grandchildren) in sorted(children.items()):
+            width = count * scale
+            if width >= FLAME_MIN_WIDTH:
+                frames.append((name, count, x, depth, width))
+                place(grandchildren, x, depth + 1)
+            x += width
+
+    place(root[1], 0.0, 0)
+    depth = max((frame[3] for frame in frames), default=0) + 1
+    height = (depth + 2) * FLAME_FRAME_HEIGHT
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{FLAME_WIDTH}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<text x="{FLAME_WIDTH / 2}" y="12" text-anchor="middle" font-size="13">'
+        f'{html.escape(title)} ({root[0]} samples)</text>',
+    ]
+    for name, count, x, level, width in frames:
+        y = height - (level + 1) * FLAME_FRAME_HEIGHT
+        label = html.escape(name)
+        lines.append(f'<g><title>{label} ({count} samples, {count / total:.1%})</title>'
+                     f'<rect x="{x:.2f}" y="{y}" width="{width:.2f}" height="{FLAME_FRAME_HEIGHT - 1}" '
+                     f'fill="{_frame_color(name)}"/>')
+        # Roughly 7px per character at this font size
+        characters = int(width / 7)
+        if characters >= 3:
+            text = name if len(name) <= characters else name[:characters - 2] + ".."
+            lines.append(f'<text x="{x + 3:.2f}" y="{y + FLAME_FRAME_HEIGHT - 4}">{html.escape(text)}</text>')
+        lines.append('</g>')
+    lines.append('</svg>')
+    return "\n".join(lines)
+
+
+def write_flamegraph(stacks, path, title="Flame graph"):
+    with open(path, "w") as f:
+        f.write(flamegraph_svg(stacks, title))
+
+
+def write_collapsed(stacks, path):
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _shape(value):
+    """A filter with its values replaced by '?', so queries differing only in values group together"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [_shape(item) for item in value]
+    return "?"
+
+
+def query_shape(entry):
+    """(collection, operation, shape) of a system.profile entry"""
+    collection = entry.get("ns", "").partition(".")[2]
+    command = entry.get("command") or {}
+    operation = entry.get("op", "command")
+    if operation == "getmore":
+        # Later batches of a cursor count against the query that opened it
+        command = entry.get("originatingCommand") or command
+    name = next(iter(command), operation)
+    if name == "aggregate":
+        shape = " | ".join(
+            f"$match {json.dumps(_shape(stage['$match']))}" if "$match" in stage else next(iter(stage))
+            for stage in command.get("pipeline", []))
+    else:
+        query = command.get("filter", command.get("q", command.get("query")))
+        shape = json.dumps(_shape(query)) if query is not None else ""
+        if command.get("sort"):
+            shape += f" sort {json.dumps(_shape(command['sort']))}"
+    if name in ("find", "aggregate", "findAndModify", "count", "distinct"):
+        operation = name if operation != "getmore" else f"{name} getMore"
+    return collection, operation, shape
+
+
+class MongoProfiler:
+    """Records every operation on a database with its profiler at level 2, for the time between start and stop"""
+
+    def __init__(self, db, buffer_bytes=PROFILE_BUFFER_BYTES):
+        self.db = db
+        self.buffer_bytes = buffer_bytes
+        self.previous = None
+        self.started = None
+        self.wrapped = False
+
+    def start(self):
+        self.previous = self.db.command("profile", -1)
+        self.db.command("profile", 0)
+        # system.profile can only be resized by recreating it while profiling is off
+        self.db.drop_collection("system.profile")
+        self.db.create_collection("system.profile", capped=True, size=self.buffer_bytes)
+        self.started = datetime.now(timezone.utc)
+        self.db.command("profile", 2)
+        return self
+
+    def stop(self):
+        """Profiler entries recorded since start, oldest first"""
+        self.db.command("profile", 0)
+        entries = [entry for entry in self.db["system.profile"].find({"ts": {"$gte": self.started}}).sort("ts", 1)
+                   if not {"profile", "collStats"} & set(entry.get("command") or {})]
+        stats = self.db.command("collStats", "system.profile")
+        self.wrapped = stats.get("size", 0) >= stats.get("maxSize", self.buffer_bytes) * 0.9
+        self.db.command("profile", self.previous.get("was", 0), slowms=self.previous.get("slowms", 100))
+        return entries
+
+
+def match_requests(entries, requests):
+    """Pair profiler entries with the (route, started, finished) request they ran during;
+    where requests overlap, the latest to start wins"""
+    requests = sorted(requests, key=lambda request: request[1])
+    starts = [request[1] for request in requests]
+    matched = []
+    for entry in entries:
+        ts = entry["ts"]
+        ts = (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp()
+        route = UNMATCHED
+        for index in range(bisect.bisect_right(starts, ts + MATCH_SLACK_S) - 1, -1, -1):
+            request_route, started, finished = requests[index]
+            if finished + MATCH_SLACK_S >= ts:
+                route = request_route
+                break
+            # Requests are short, so one that started long before ts won't contain it
+            if ts - started > 60:
+                break
+        matched.append((route, entry))
+    return matched
+
+
+def query_breakdown(matched, requests):
+    """route -> per query shape counts, time and documents examined, slowest total first"""
+    request_counts = defaultdict(int)
+    for route, _, _ in requests:
+        request_counts[route] += 1
+    groups = defaultdict(lambda: {"calls": 0, "millis": 0, "docs_examined": 0, "keys_examined": 0,
+                                  "returned": 0, "plans": set()})
+    for route, entry in matched:
+        group = groups[(route, *query_shape(entry))]
+        group["calls"] += 1
+        group["millis"] += entry.get("millis", 0)
+        group["docs_examined"] += entry.get("docsExamined", 0)
+        group["keys_examined"] += entry.get("keysExamined", 0)
+        group["returned"] += entry.get("nreturned", entry.get("ninserted", entry.get("nModified", 0)))
+        if entry.get("planSummary"):
+            group["plans"].add(entry["planSummary"])
+
+    breakdown = defaultdict(list)
+    for (route, collection, operation, shape), group in groups.items():
+        requests_seen = request_counts.get(route) or 1
+        plans = sorted(group.pop("plans"))
+        breakdown[route].append({
+            "collection": collection,
+            "operation": operation,
+            "shape": shape,
+            **group,
+            "per_request": group["calls"] / requests_seen,
+            "plans": plans,
+            # Full scans, and scans reading many documents per one returned, point at missing indexes
+            "collection_scan": any(plan.startswith("COLLSCAN") for plan in plans),
+            "examined_per_returned": group["docs_examined"] / max(group["returned"], 1),
+        })
+    for queries in breakdown.values():
+        queries.sort(key=lambda query: -query["millis"])
+    return dict(breakdown)
+
+
+def slug(label):
+    """File name for a route label"""
+    return re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_") or "root"
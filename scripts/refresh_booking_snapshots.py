@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, UpdateMany
+from pymongo.errors import OperationFailure
+
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+# This job is authoritative for the MongoDB store seed_data.py and the stand-in use. The Laravel
+# backend writes to its own database and refreshes those copies with its queued
+# App\Jobs\RefreshBookingSnapshots, so renames made there never reach this job and need not.
+
+# Fields bookings copy from other collections when they are created:
+# source collection -> (source key, booking key, [(source field, booking field)])
+SNAPSHOTS = {
+    "costumes": ("id", "costume_id", [("name", "costume_name")]),
+    "users": ("email", "user_email", [("name", "user_name")]),
+}
+# Resume tokens and updated_at checkpoints live here between runs
+STATE_COLLECTION = "maintenance_state"
+STATE_ID = "booking_snapshots"
+
+
+class RefreshStats:
+    """Throughput and lag of applied snapshot changes"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.changes = 0
+        self.batches = 0
+        self.modified = 0
+        self.lags = []
+
+    def record(self, changes, modified, lags):
+        self.changes += changes
+        self.batches += 1
+        self.modified += modified
+        self.lags.extend(lags)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        lags = sorted(self.lags)
+        return {
+            "elapsed_s": elapsed,
+            "changes": self.changes,
+            "batches": self.batches,
+            "bookings_modified": self.modified,
+            "changes_per_s": self.changes / elapsed if elapsed else 0.0,
+            "bookings_per_s": self.modified / elapsed if elapsed else 0.0,
+            "lag_p50_s": lags[len(lags) // 2] if lags else 0.0,
+            "lag_p95_s": lags[int(len(lags) * 0.95)] if lags else 0.0,
+            "lag_max_s": lags[-1] if lags else 0.0,
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"  {report['changes']} changes in {report['batches']} batches, {report['bookings_modified']} bookings "
+              f"updated in {report['elapsed_s']:.1f}s ({report['changes_per_s']:,.0f} changes/s, "
+              f"{report['bookings_per_s']:,.0f} bookings/s), lag p50 {report['lag_p50_s']:.2f}s "
+              f"p95 {report['lag_p95_s']:.2f}s max {report['lag_max_s']:.2f}s")
+
+
+def snapshot_update(source, document):
+    """UpdateMany refreshing every booking whose copy of the document's fields is out of date"""
+    key, booking_key, fields = SNAPSHOTS[source]
+    values = {booking_field: document.get(field) for field, booking_field in fields}
+    return UpdateMany(
+        {booking_key: document[key], "$or": [{field: {"$ne": value}} for field, value in values.items()]},
+        {"$set": values},
+    )
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def apply_changes(db, pending, stats):
+    """Write one batch of pending {(source, key): (document, changed_at)} as a single bulk_write"""
+    if not pending:
+        return
+    operations = [snapshot_update(source, document) for (source, _), (document, _) in pending.items()]
+    result = await db.bookings.bulk_write(operations, ordered=False)
+    now = datetime.now(timezone.utc)
+    lags = [(now - changed_at).total_seconds() for _, changed_at in pending.values() if changed_at]
+    stats.record(len(pending), result.modified_count, lags)
+    pending.clear()
+
+
+async def load_state(db):
+    return await db[STATE_COLLECTION].find_one({"_id": STATE_ID}) or {}
+
+
+async def save_state(db, **fields):
+    await db[STATE_COLLECTION].update_one({"_id": STATE_ID}, {"$set": fields}, upsert=True)
+
+
+async def watch(db, stats, batch_size=500, flush_interval=1.0, report_interval=10.0):
+    """Follow costume and user changes through a change stream (needs a replica set)"""
+    pipeline = [{"$match": {
+        "operationType": {"$in": ["insert", "update", "replace"]},
+        "ns.coll": {"$in": list(SNAPSHOTS)},
+    }}]
+    state = await load_state(db)
+    pending = {}
+    last_flush = last_report = time.perf_counter()
+
+    async with db.watch(pipeline, full_document="updateLookup", resume_after=state.get("resume_token"),
+                        max_await_time_ms=int(flush_interval * 1000)) as stream:
+        print("Watching costume and user changes...")
+        while stream.alive:
+            change = await stream.try_next()
+            if change is not None:
+                source = change["ns"]["coll"]
+                fields = {field for field, _ in SNAPSHOTS[source][2]}
+                updated = change.get("updateDescription", {}).get("updatedFields", {})
+                document = change.get("fullDocument")
+                # Updates that leave every copied field alone need no booking writes
+                if document and (change["operationType"] != "update" or fields & set(updated)):
+                    changed_at = change.get("wallTime") or change["clusterTime"].as_datetime()
+                    pending[(source, document[SNAPSHOTS[source][0]])] = (document, _parse_time(changed_at))
+
+            now = time.perf_counter()
+            if len(pending) >= batch_size or (now - last_flush >= flush_interval):
+                await apply_changes(db, pending, stats)
+                # Saved after the writes, so a restart replays rather than skips changes
+                await save_state(db, resume_token=stream.resume_token)
+                last_flush = now
+            if now - last_report >= report_interval:
+                stats.print_report()
+                last_report = now
+
+
+async def poll(db, stats, batch_size=500, interval=5.0, once=False, report_interval=10.0):
+    """Pick up costume and user changes by updated_at, for deployments without change streams"""
+    state = await load_state(db)
+    # source -> [updated_at, key] of the last document applied
+    checkpoints = state.get("checkpoints", {})
+    last_report = time.perf_counter()
+
+    while True:
+        drained = True
+        for source, (key, _, fields) in SNAPSHOTS.items():
+            query = {"updated_at": {"$exists": True}}
+            if source in checkpoints:
+                updated_at, last_key = checkpoints[source]
+                # Keyset on (updated_at, key) so documents sharing a timestamp are never skipped
+                query = {"$or": [{"updated_at": {"$gt": updated_at}}, {"updated_at": updated_at, key: {"$gt": last_key}}]}
+            projection = {"_id": 0, key: 1, "updated_at": 1, **{field: 1 for field, _ in fields}}
+            cursor = (db[source].find(query, projection)
+                      .sort([("updated_at", ASCENDING), (key, ASCENDING)]).limit(batch_size))
+            documents = await cursor.to_list(length=batch_size)
+            if not documents:
+                continue
+            pending = {(source, document[key]): (document, _parse_time(document["updated_at"]))
+                       for document in documents}
+            await apply_changes(db, pending, stats)
+            checkpoints[source] = [documents[-1]["updated_at"], documents[-1][key]]
+            await save_state(db, checkpoints=checkpoints)
+            drained = drained and len(documents) < batch_size
+
+        if time.perf_counter() - last_report >= report_interval:
+            stats.print_report()
+            last_report = time.perf_counter()
+        if drained:
+            if once:
+                return
+            await asyncio.sleep(interval)
+
+
+async def reconcile(db, stats, batch_size=500):
+    """One full pass over every costume and user, fixing whatever bookings have drifted"""
+    for source, (key, _, fields) in SNAPSHOTS.items():
+        projection = {"_id": 0, key: 1, **{field: 1 for field, _ in fields}}
+        pending = {}
+        async for document in db[source].find({}, projection):
+            pending[(source, document[key])] = (document, None)
+            if len(pending) >= batch_size:
+                await apply_changes(db, pending, stats)
+        await apply_changes(db, pending, stats)
+
+
+async def refresh(mode, batch_size=500, flush_interval=1.0, poll_interval=5.0, once=False, report_interval=10.0):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    stats = RefreshStats()
+    try:
+        if mode == "watch":
+            try:
+                await watch(db, stats, batch_size, flush_interval, report_interval)
+            except OperationFailure as e:
+                # Standalone servers have no oplog to stream from
+                print(f"Change streams unavailable ({e.details.get('errmsg', e) if e.details else e}), "
+                      f"polling updated_at instead")
+                await poll(db, stats, batch_size, poll_interval, once, report_interval)
+        elif mode == "poll":
+            await poll(db, stats, batch_size, poll_interval, once, report_interval)
+        else:
+            await reconcile(db, stats, batch_size)
+    except asyncio.CancelledError:
+        # Ctrl-C: fall through to the final report
+        pass
+    finally:
+        client.close()
+        print("Booking snapshot refresh:")
+        stats.print_report()
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Keep the costume and user names copied into MongoDB bookings "
+                                                 "up to date (the Laravel backend uses its own queued job)")
+    parser.add_argument("--mode", choices=["watch", "poll", "full"], default="watch",
+                        help="follow a change stream, poll updated_at, or reconcile every booking once")
+    parser.add_argument("--batch-size", type=int, default=500, help="changed documents per bulk_write")
+    parser.add_argument("--flush-interval", type=float, default=1.0,
+                        help="longest a change waits for its batch to fill in watch mode")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="seconds between polls once caught up")
+    parser.add_argument("--once", action="store_true", help="in poll mode, exit once caught up (for cron)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between progress reports")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(refresh(args.mode, args.batch_size, args.flush_interval, args.poll_interval, args.once,
+                            args.report_interval))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,208 @@
+import argparse
+import gzip
+import json
+import math
+import os
+import secrets
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# Per-request columns of a segment; rows are JSON arrays in this order
+COLUMNS = ["at_ms", "test", "endpoint", "status", "total_ms", "ttfb_ms", "connect_ms", "tls_ms", "dns_ms",
+           "size_bytes", "reused_connection"]
+# Timings are kept to a hundredth of a millisecond, which also keeps the segments compressible
+PRECISION = 2
+RUNS_FILE = "runs.ndjson"
+SEGMENTS_DIR = "segments"
+
+
+def new_run_id(started=None):
+    """Sortable run id: UTC start time plus a random suffix"""
+    started = started or datetime.now(timezone.utc)
+    return f"{started.strftime('%Y%m%dT%H%M%SZ')}-{secrets.token_hex(3)}"
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def _round(value):
+    return round(value, PRECISION) if isinstance(value, float) else value
+
+
+def endpoint_summary(rows):
+    """Per-endpoint request counts and latency percentiles, as stored in the run index"""
+    grouped = defaultdict(list)
+    errors = defaultdict(int)
+    for row in rows:
+        status = row.get("status")
+        if status is None or status >= 400:
+            errors[row["endpoint"]] += 1
+        else:
+            grouped[row["endpoint"]].append(row["total_ms"])
+    summary = {}
+    for label in sorted(set(grouped) | set(errors)):
+        totals = sorted(grouped[label])
+        summary[label] = {
+            "requests": len(totals) + errors[label],
+            "errors": errors[label],
+            "mean_ms": _round(sum(totals) / len(totals)) if totals else 0.0,
+            "p50_ms": _round(_percentile(totals, 50)),
+            "p95_ms": _round(_percentile(totals, 95)),
+            "p99_ms": _round(_percentile(totals, 99)),
+            "max_ms": _round(totals[-1]) if totals else 0.0,
+        }
+    return summary
+
+
+class ResultsStore:
+    """Append-only history of test runs: one gzipped NDJSON segment of request rows per run,
+    plus a small run index carrying per-endpoint percentiles so trends never open the segments"""
+
+    def __init__(self, root):
+        self.root = root
+        self.runs_path = os.path.join(root, RUNS_FILE)
+
+    def append(self, run, rows=()):
+        """Store a run's request rows and index entry; `run` needs at least run_id and started_at"""
+        rows = list(rows)
+        entry = dict(run)
+        entry["requests"] = len(rows)
+        entry["endpoints"] = endpoint_summary(rows)
+        if rows:
+            entry["segment"] = self._write_segment(entry, rows)
+        os.makedirs(self.root, exist_ok=True)
+        # One write per line on an O_APPEND file, so concurrent runs don't interleave
+        with open(self.runs_path, "a") as f:
+            f.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+        return entry
+
+    def _write_segment(self, run, rows):
+        # Month directories keep any one directory small over a year of runs
+        relative = os.path.join(SEGMENTS_DIR, run["started_at"][:7], f"{run['run_id']}.ndjson.gz")
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        started = datetime.fromisoformat(run["started_at"]).timestamp()
+        temporary = f"{path}.tmp"
+        with gzip.open(temporary, "wt", compresslevel=9) as f:
+            f.write(json.dumps({"run_id": run["run_id"], "columns": COLUMNS}) + "\n")
+            for row in rows:
+                values = dict(row)
+                values["at_ms"] = (row["at"] - started) * 1000 if row.get("at") is not None else None
+                f.write(json.dumps([_round(values.get(column)) for column in COLUMNS],
+                                   separators=(",", ":")) + "\n")
+        # Readers never see a half-written segment
+        os.replace(temporary, path)
+        return relative
+
+    def runs(self, mode=None, since=None, last=None):
+        """Index entries, oldest first, optionally filtered by mode and start time (ISO prefix)"""
+        if not os.path.exists(self.runs_path):
+            return []
+        runs = []
+        with open(self.runs_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                run = json.loads(line)
+                if mode and run.get("mode") != mode:
+                    continue
+                if since and run["started_at"] < since:
+                    continue
+                runs.append(run)
+        return runs[-last:] if last else runs
+
+    def trend(self, endpoint, metric="p95_ms", **filters):
+        """(run_id, started_at, value) for every indexed run that hit the endpoint"""
+        return [(run["run_id"], run["started_at"], run["endpoints"][endpoint][metric])
+                for run in self.runs(**filters) if endpoint in run.get("endpoints", {})]
+
+    def requests(self, run_id, endpoint=None):
+        """Request rows of one run as dicts"""
+        run = next((run for run in self.runs() if run["run_id"] == run_id), None)
+        if run is None or not run.get("segment"):
+            return
+        with gzip.open(os.path.join(self.root, run["segment"]), "rt") as f:
+            columns = json.loads(f.readline())["columns"]
+            for line in f:
+                row = dict(zip(columns, json.loads(line)))
+                if endpoint is None or row["endpoint"] == endpoint:
+                    yield row
+
+    def samples(self, run_id):
+        """Per-endpoint latencies (ms) of a run's successful requests, for comparing runs"""
+        samples = defaultdict(list)
+        for row in self.requests(run_id):
+            if row["status"] is not None and row["status"] < 400:
+                samples[row["endpoint"]].append(row["total_ms"])
+        return samples
+
+    def disk_usage(self):
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
+
+
+def print_runs(store, runs):
+    print(f"{'run':24} {'started':20} {'mode':18} {'ok':>3} {'requests':>9} {'slowest p95':>12}")
+    for run in runs:
+        endpoints = run.get("endpoints", {})
+        slowest = max(endpoints.items(), key=lambda item: item[1]["p95_ms"], default=None)
+        slowest = f"{slowest[1]['p95_ms']:.0f}ms {slowest[0]}" if slowest else "-"
+        print(f"{run['run_id']:24} {run['started_at'][:19]:20} {run.get('mode', '-'):18} "
+              f"{'✅' if run.get('success') else '❌':>3} {run['requests']:>9} {slowest:>12}")
+    print(f"{len(runs)} runs, store size {store.disk_usage() / 1024:,.0f} KiB")
+
+
+def print_trend(store, endpoint, metric, runs):
+    points = store.trend(endpoint, metric, **runs)
+    if not points:
+        print(f"No indexed runs hit {endpoint}")
+        return
+    peak = max(value for _, _, value in points) or 1
+    for run_id, started_at, value in points:
+        print(f"{started_at[:19]:20} {run_id:24} {value:>9.1f}ms {'█' * max(1, round(value / peak * 40))}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query the backend test results history")
+    parser.add_argument("root", help="results history directory (backend_test.py --history)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs = commands.add_parser("runs", help="list indexed runs")
+    trend = commands.add_parser("trend", help="one endpoint's latency across runs, from the run index only")
+    trend.add_argument("endpoint", help="endpoint label, e.g. 'GET /api/costumes'")
+    trend.add_argument("--metric", default="p95_ms", choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    for command in (runs, trend):
+        command.add_argument("--mode", help="only runs of this mode, e.g. functional or load")
+        command.add_argument("--since", help="only runs started at or after this ISO date")
+        command.add_argument("--last", type=int, help="only the latest N matching runs")
+
+    requests = commands.add_parser("requests", help="dump one run's request rows as NDJSON")
+    requests.add_argument("run_id")
+    requests.add_argument("--endpoint", help="only rows for this endpoint label")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = ResultsStore(args.root)
+    started = time.perf_counter()
+    if args.command == "requests":
+        for row in store.requests(args.run_id, args.endpoint):
+            print(json.dumps(row))
+        return
+    filters = {"mode": args.mode, "since": args.since, "last": args.last}
+    if args.command == "runs":
+        print_runs(store, store.runs(**filters))
+    else:
+        print_trend(store, args.endpoint, args.metric, filters)
+    print(f"Queried in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
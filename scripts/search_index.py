@@ -0,0 +1,160 @@
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Per-occurrence weight of a token in each indexed field
+FIELD_WEIGHTS = {"name": 10, "category": 5, "description": 2}
+# Score multipliers for query terms that only match an indexed term by prefix or by typo
+PREFIX_WEIGHT = 0.5
+FUZZY_WEIGHT = 0.25
+# Shorter query terms only match exactly, since their prefixes cover much of the vocabulary
+MIN_PREFIX_LENGTH = 2
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def max_edits(term):
+    """Typos tolerated in a term: none below 4 characters, one below 8, then two"""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def deletion_variants(term, edits):
+    """The term with up to `edits` characters removed, the key for symmetric-delete fuzzy lookup"""
+    variants = {term}
+    frontier = {term}
+    for _ in range(edits):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b):
+    """Levenshtein distance counting an adjacent transposition as one edit"""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Inverted index over costume name, category and description with ranked prefix and fuzzy search"""
+
+    def __init__(self):
+        # term -> {document id: field-weighted occurrences}
+        self.postings = {}
+        self.document_terms = {}
+        # Sorted terms, so a prefix maps to one contiguous range
+        self.vocabulary = []
+        # deletion variant -> terms it was derived from
+        self.variants = defaultdict(set)
+
+    def __len__(self):
+        return len(self.document_terms)
+
+    def add(self, document):
+        """Index a costume, replacing any earlier version with the same id"""
+        document_id = document["id"]
+        self.remove(document_id)
+        weights = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(str(document.get(field) or "")):
+                weights[token] += weight
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._add_term(term)
+            postings[document_id] = weight
+        self.document_terms[document_id] = tuple(weights)
+
+    def remove(self, document_id):
+        for term in self.document_terms.pop(document_id, ()):
+            postings = self.postings[term]
+            del postings[document_id]
+            if not postings:
+                del self.postings[term]
+                self._remove_term(term)
+
+    def _add_term(self, term):
+        bisect.insort(self.vocabulary, term)
+        for variant in deletion_variants(term, max_edits(term)):
+            self.variants[variant].add(term)
+
+    def _remove_term(self, term):
+        del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+        for variant in deletion_variants(term, max_edits(term)):
+            terms = self.variants[variant]
+            terms.discard(term)
+            if not terms:
+                del self.variants[variant]
+
+    def expand(self, query_term):
+        """Indexed terms a query term matches, with the score multiplier of each match"""
+        matches = {}
+        if query_term in self.postings:
+            matches[query_term] = 1.0
+        if len(query_term) >= MIN_PREFIX_LENGTH:
+            for term in self.vocabulary[bisect.bisect_left(self.vocabulary, query_term):]:
+                if not term.startswith(query_term):
+                    break
+                matches.setdefault(term, PREFIX_WEIGHT)
+        edits = max_edits(query_term)
+        if edits:
+            candidates = set()
+            for variant in deletion_variants(query_term, edits):
+                candidates |= self.variants.get(variant, set())
+            for term in candidates:
+                if term not in matches and edit_distance(query_term, term) <= edits:
+                    matches[term] = FUZZY_WEIGHT
+        return matches
+
+    def scores(self, query):
+        """Relevance of every costume matching all query terms"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {}
+        total = len(self.document_terms)
+        scores = None
+        for query_term in terms:
+            term_scores = {}
+            for term, multiplier in self.expand(query_term).items():
+                postings = self.postings[term]
+                # Rare terms count for more, as in BM25's idf
+                idf = math.log(1 + total / len(postings))
+                for document_id, weight in postings.items():
+                    score = multiplier * weight * idf
+                    if score > term_scores.get(document_id, 0.0):
+                        term_scores[document_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {document_id: score + term_scores[document_id]
+                          for document_id, score in scores.items() if document_id in term_scores}
+            if not scores:
+                break
+        return scores
+
+    def search(self, query, limit=None, after=None, accept=None):
+        """(score, id) pairs best first, ties by id; `after` is the last pair of the previous page"""
+        results = self.scores(query).items()
+        if accept is not None:
+            results = [(document_id, score) for document_id, score in results if accept(document_id)]
+        ranked = ((-score, document_id) for document_id, score in results)
+        if after is not None:
+            position = (-after[0], after[1])
+            ranked = (key for key in ranked if key > position)
+        ranked = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+        return [(-negated, document_id) for negated, document_id in ranked]
@@ -1,10 +1,17 @@
+import argparse
 import asyncio
+import hashlib
+import json
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append('/app/backend')
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
-from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, UpdateOne
+from datetime import date, datetime, timedelta, timezone
 import uuid
 import os
 from dotenv import load_dotenv
@@ -15,45 +22,481 @@ load_dotenv(ROOT_DIR / '.env')
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-async def seed_database():
-    # Connect to MongoDB
-    mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
+# Distributions used by the bulk generator. Weights are rough shares of the
+# production catalog; price ranges are per-day rental prices per category.
+CATEGORIES = {
+    "Period": (0.26, 110.0, 220.0),
+    "Classical": (0.20, 90.0, 180.0),
+    "Modern": (0.18, 60.0, 140.0),
+    "Fantasy": (0.16, 80.0, 200.0),
+    "Musical": (0.12, 70.0, 160.0),
+    "Folk": (0.08, 50.0, 120.0),
+}
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+ADJECTIVES = ["Elegant", "Ornate", "Velvet", "Embroidered", "Gilded", "Rustic", "Silk", "Dramatic", "Regal", "Tattered"]
+GARMENTS = {
+    "Period": ["Gown", "Doublet", "Corset Dress", "Frock Coat", "Bustle Skirt"],
+    "Classical": ["Tunic", "Toga", "Tutu", "Cloak", "Chiton"],
+    "Modern": ["Ensemble", "Suit", "Jumpsuit", "Dress", "Trench Coat"],
+    "Fantasy": ["Robe", "Armor", "Fairy Dress", "Wizard Cloak", "Elven Tunic"],
+    "Musical": ["Showgirl Dress", "Tailcoat", "Sequin Jacket", "Flapper Dress", "Chorus Outfit"],
+    "Folk": ["Dirndl", "Kimono", "Sarafan", "Poncho", "Kilt"],
+}
+THEMES = ["Victorian", "Baroque", "Renaissance", "Swan Lake", "Hamlet", "Midsummer", "Art Deco", "Gothic", "Tudor", "Carnival"]
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Elif", "Felix", "Greta", "Hiro", "Ines", "Jonas", "Lena", "Mateo", "Nora", "Omar", "Paula", "Ravi"]
+LAST_NAMES = ["Schmidt", "Rossi", "Tanaka", "Novak", "Silva", "Kowalski", "Meyer", "Dubois", "Larsen", "Costa", "Weber", "Ivanova"]
+BULK_PASSWORDS = ["user123", "TestPass123!", "costume2024"]
+# Passwords per process-pool task: small enough to spread across cores, large
+# enough that bcrypt dominates the pickling overhead
+HASH_CHUNK_SIZE = 64
+
+# Stable key and insert-only fields per collection for incremental seeding.
+# Insert-only fields are never overwritten, so bcrypt salts, creation times and
+# booking statuses changed on staging survive a re-run.
+SEED_KEYS = {
+    "users": ("email", ("password", "created_at")),
+    "costumes": ("id", ("created_at",)),
+    "bookings": ("id", ("status", "created_at")),
+}
+COSTUME_ID_NAMESPACE = uuid.UUID("6f1c2b9e-3a4d-4e5f-8a7b-9c0d1e2f3a4b")
+BOOKING_STATUSES_PAST = (["completed", "cancelled"], [0.85, 0.15])
+BOOKING_STATUSES_FUTURE = (["pending", "confirmed", "cancelled"], [0.45, 0.45, 0.10])
+# Per-seed date bulk booking dates are spread around. Kept in the database so an
+# incremental re-run on a later day regenerates the same bookings.
+SEED_ANCHORS = "seed_anchors"
+
+# Indexes backing every query the API issues, per collection
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("updated_at", ASCENDING), ("email", ASCENDING)], name="updated_at_email"),
+    ],
+    "costumes": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("category", ASCENDING), ("created_at", DESCENDING)], name="category_created_at"),
+        IndexModel([("name", TEXT), ("description", TEXT)], name="name_description_text",
+                   weights={"name": 10, "description": 2}),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)], name="user_email_created_at"),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("start_date", ASCENDING)], name="start_date"),
+        IndexModel([("costume_id", ASCENDING), ("size", ASCENDING), ("start_date", ASCENDING)],
+                   name="costume_size_start_date"),
+    ],
+}
+
+# (collection, filter, sort) for each query shape the API runs
+QUERY_SHAPES = [
+    ("users", {"email": "user@test.com"}, None),
+    ("users", {"updated_at": {"$gt": "2026-01-01"}}, [("updated_at", ASCENDING), ("email", ASCENDING)]),
+    ("costumes", {"id": "costume-id"}, None),
+    ("costumes", {"id": {"$gt": "costume-id"}}, [("id", ASCENDING)]),
+    ("costumes", {"category": "Period"}, None),
+    ("costumes", {"$text": {"$search": "dress"}}, None),
+    ("costumes", {"updated_at": {"$gt": "2026-01-01"}}, [("updated_at", ASCENDING), ("id", ASCENDING)]),
+    ("bookings", {"id": "booking-id"}, None),
+    ("bookings", {"user_email": "user@test.com"}, [("created_at", DESCENDING)]),
+    ("bookings", {}, [("created_at", DESCENDING)]),
+    ("bookings", {"start_date": {"$gte": "2026-01-01", "$lte": "2026-01-31"}}, None),
+    ("bookings", {"costume_id": "costume-id", "size": "M", "status": {"$ne": "cancelled"},
+                  "start_date": {"$lte": "2026-01-10"}, "end_date": {"$gte": "2026-01-07"}}, None),
+]
+
+
+def costume_id(name):
+    return str(uuid.uuid5(COSTUME_ID_NAMESPACE, name))
+
+
+def content_hash(document, insert_only):
+    content = {key: value for key, value in document.items() if key not in insert_only and key != "_id"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+async def _abatched(documents, batch_size):
+    batch = []
+    async for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
+def _batched(documents, batch_size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_costumes(rng, count, images, now):
+    names = list(CATEGORIES)
+    weights = [CATEGORIES[name][0] for name in names]
+    for _ in range(count):
+        category = rng.choices(names, weights)[0]
+        _, low, high = CATEGORIES[category]
+        # Mostly contiguous size runs centred on M, like real stock
+        start = min(max(int(rng.gauss(1.5, 1.0)), 0), len(SIZES) - 2)
+        sizes = SIZES[start:start + rng.randint(2, 4)]
+        garment = rng.choice(GARMENTS[category])
+        theme = rng.choice(THEMES)
+        yield {
+            "id": _uuid(rng),
+            "name": f"{rng.choice(ADJECTIVES)} {theme} {garment}",
+            "description": f"{theme}-inspired {garment.lower()} for {category.lower()} productions. "
+                           f"Hand-finished seams, stage-tested fabrics and {len(sizes)} sizes in stock.",
+            "category": category,
+            "sizes": sizes,
+            "images": rng.sample(images, k=min(len(images), rng.randint(1, 3))),
+            "price_per_day": round(rng.triangular(low, high, low + (high - low) * 0.35) * 2) / 2,
+            "available": rng.random() < 0.9,
+            "created_at": (now - timedelta(days=rng.uniform(0, 730))).isoformat(),
+        }
+
+
+def generate_users(rng, count, now):
+    for i in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "email": f"user{i}@bulk.test",
+            # Plain text until hash_users replaces it
+            "password": BULK_PASSWORDS[i % len(BULK_PASSWORDS)],
+            "name": f"{first} {last}",
+            "role": "user",
+            "created_at": (now - timedelta(days=rng.uniform(0, 730))).isoformat(),
+        }
+
+
+def hash_passwords(passwords):
+    return [pwd_context.hash(password) for password in passwords]
+
+
+async def hash_users(users, workers=None, reuse_hashes=False):
+    # bcrypt is CPU-bound, so chunks are hashed in a process pool while this
+    # coroutine hands finished users on to the inserts in generation order.
+    # Users without a password (existing ones in incremental mode) pass through.
+    if not hasattr(users, "__aiter__"):
+        users = _aiter(users)
+
+    if reuse_hashes:
+        hashes = {}
+        async for user in users:
+            if "password" in user:
+                if user["password"] not in hashes:
+                    hashes[user["password"]] = pwd_context.hash(user["password"])
+                user["password"] = hashes[user["password"]]
+            yield user
+        return
+
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    queue = asyncio.Queue(maxsize=workers * 2)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async def produce():
+            cancelled = False
+            try:
+                async for chunk in _abatched(users, HASH_CHUNK_SIZE):
+                    needs_hash = [user for user in chunk if "password" in user]
+                    passwords = [user["password"] for user in needs_hash]
+                    await queue.put((chunk, needs_hash, loop.run_in_executor(pool, hash_passwords, passwords)))
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # Also when the source fails, so the consumer stops waiting and re-raises the error;
+                # a cancelled producer has no consumer left to tell
+                if not cancelled:
+                    await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await queue.get()) is not None:
+                chunk, needs_hash, hashed = item
+                for user, password in zip(needs_hash, await hashed):
+                    user["password"] = password
+                for user in chunk:
+                    yield user
+            # Raises whatever ended the producer early
+            await producer
+        finally:
+            producer.cancel()
+
+
+def _popular_index(rng, size):
+    # Pareto-skewed for most picks so a few costumes take a large share of bookings
+    if rng.random() < 0.6:
+        return min(int(rng.paretovariate(1.2)) - 1, size - 1)
+    return rng.randrange(size)
+
+
+def generate_bookings(rng, count, costumes, users, now, anchor=None):
+    """Bookings from a year before `anchor` (default today) to four months after it"""
+    today = anchor or now.date()
+    for _ in range(count):
+        costume_id, costume_name, sizes = costumes[_popular_index(rng, len(costumes))]
+        user_email, user_name = users[rng.randrange(len(users))]
+        start = today + timedelta(days=rng.randint(-365, 120))
+        end = start + timedelta(days=min(int(rng.expovariate(1 / 3.0)) + 1, 21))
+        statuses, weights = BOOKING_STATUSES_PAST if end < today else BOOKING_STATUSES_FUTURE
+        created = datetime.combine(start, datetime.min.time(), timezone.utc) - timedelta(days=rng.uniform(1, 60))
+        yield {
+            "id": _uuid(rng),
+            "user_email": user_email,
+            "user_name": user_name,
+            "costume_id": costume_id,
+            "costume_name": costume_name,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "size": rng.choice(sizes),
+            "notes": None,
+            "status": rng.choices(statuses, weights)[0],
+            "created_at": min(created, now).isoformat(),
+        }
+
+
+async def _write_batched(documents, batch_size, concurrency, write):
+    # Keep at most `concurrency` unordered writes in flight so the generator
+    # streams into Mongo without holding the whole dataset in memory
+    if not hasattr(documents, "__aiter__"):
+        documents = _aiter(documents)
+    in_flight = set()
+    written = 0
+    async for batch in _abatched(documents, batch_size):
+        if len(in_flight) >= concurrency:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            written += sum(task.result() for task in done)
+        in_flight.add(asyncio.create_task(write(batch)))
+    if in_flight:
+        done, _ = await asyncio.wait(in_flight)
+        written += sum(task.result() for task in done)
+    return written
+
+
+async def insert_batched(collection, documents, batch_size, concurrency):
+    async def write(batch):
+        result = await collection.insert_many(batch, ordered=False)
+        return len(result.inserted_ids)
+
+    return await _write_batched(documents, batch_size, concurrency, write)
+
+
+async def upsert_batched(collection, documents, batch_size, concurrency):
+    key, insert_only = SEED_KEYS[collection.name]
+
+    async def write(batch):
+        requests = []
+        for document in batch:
+            update = {"$set": {k: v for k, v in document.items() if k not in insert_only}}
+            on_insert = {k: v for k, v in document.items() if k in insert_only}
+            if on_insert:
+                update["$setOnInsert"] = on_insert
+            requests.append(UpdateOne({key: document[key]}, update, upsert=True))
+        result = await collection.bulk_write(requests, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    return await _write_batched(documents, batch_size, concurrency, write)
+
+
+async def changed_only(collection, documents, batch_size, stats):
+    # Look up stored content hashes a batch at a time and pass on only new or
+    # changed documents; changed ones lose their insert-only fields
+    key, insert_only = SEED_KEYS[collection.name]
+    if not hasattr(documents, "__aiter__"):
+        documents = _aiter(documents)
+    async for batch in _abatched(documents, batch_size):
+        updated_at = datetime.now(timezone.utc).isoformat()
+        for document in batch:
+            document["content_hash"] = content_hash(document, insert_only)
+            # Outside the hash; lets refresh_booking_snapshots.py --mode poll see the change
+            document["updated_at"] = updated_at
+        stored = {}
+        async for existing in collection.find({key: {"$in": [d[key] for d in batch]}}, {key: 1, "content_hash": 1}):
+            stored[existing[key]] = existing.get("content_hash")
+        for document in batch:
+            if document[key] not in stored:
+                stats["new"] += 1
+            elif stored[document[key]] != document["content_hash"]:
+                stats["changed"] += 1
+                for field in insert_only:
+                    document.pop(field, None)
+            else:
+                stats["unchanged"] += 1
+                continue
+            yield document
+
+
+def _with_content_hash(collection, documents):
+    # Stored on full loads too, so a later incremental run has something to compare
+    _, insert_only = SEED_KEYS[collection.name]
+    updated_at = datetime.now(timezone.utc).isoformat()
+    for document in documents:
+        document["content_hash"] = content_hash(document, insert_only)
+        document["updated_at"] = updated_at
+        yield document
+
+
+async def load_collection(collection, documents, batch_size=5000, concurrency=8, incremental=False,
+                          hash_workers=None, reuse_hashes=False):
+    stats = {"new": 0, "changed": 0, "unchanged": 0}
+    started = time.perf_counter()
+    if incremental:
+        documents = changed_only(collection, documents, batch_size, stats)
+    else:
+        documents = _with_content_hash(collection, documents)
+    if collection.name == "users":
+        documents = hash_users(documents, workers=hash_workers, reuse_hashes=reuse_hashes)
+    if incremental:
+        written = await upsert_batched(collection, documents, batch_size, concurrency)
+    else:
+        written = await insert_batched(collection, documents, batch_size, concurrency)
+    elapsed = time.perf_counter() - started
+
+    rate = written / elapsed if elapsed > 0 else 0
+    if incremental:
+        print(f"  {collection.name}: {stats['new']} new, {stats['changed']} changed, "
+              f"{stats['unchanged']} unchanged in {elapsed:.1f}s ({rate:,.0f} writes/s)")
+    else:
+        print(f"  {written} {collection.name} inserted in {elapsed:.1f}s ({rate:,.0f} docs/s)")
+    return written
+
+
+async def seed_bulk(db, costume_count, user_count, booking_count, seed=42, batch_size=5000, concurrency=8,
+                    sample_costumes=(), sample_users=(), hash_workers=None, reuse_hashes=False, incremental=False,
+                    anchor=None):
+    # One stream per collection, so growing one count leaves the others' documents unchanged
+    def rng(name):
+        return random.Random(f"{seed}:{name}")
+
+    now = datetime.now(timezone.utc)
+    images = sorted({url for costume in sample_costumes for url in costume["images"]})
+    # Only the fields bookings copy are kept in memory for the booking pass
+    costume_refs = [(c["id"], c["name"], c["sizes"]) for c in sample_costumes]
+    user_refs = [(u["email"], u["name"]) for u in sample_users if u["role"] == "user"]
+
+    def track_costumes(documents):
+        for document in documents:
+            costume_refs.append((document["id"], document["name"], document["sizes"]))
+            yield document
+
+    def track_users(documents):
+        for document in documents:
+            user_refs.append((document["email"], document["name"]))
+            yield document
+
+    options = dict(batch_size=batch_size, concurrency=concurrency, incremental=incremental)
+    await load_collection(db.costumes, track_costumes(generate_costumes(rng("costumes"), costume_count, images, now)), **options)
+    await load_collection(db.users, track_users(generate_users(rng("users"), user_count, now)),
+                          hash_workers=hash_workers, reuse_hashes=reuse_hashes, **options)
+
+    if booking_count:
+        if not costume_refs or not user_refs:
+            raise ValueError("Bulk bookings need at least one costume and one regular user")
+        await load_collection(db.bookings,
+                              generate_bookings(rng("bookings"), booking_count, costume_refs, user_refs, now, anchor),
+                              **options)
+
+
+async def booking_anchor(db, seed, incremental, anchor=None):
+    """The seed's stored anchor date on incremental runs, otherwise `anchor` or today, which is then stored"""
+    if incremental and anchor is None:
+        stored = await db[SEED_ANCHORS].find_one({"_id": seed})
+        if stored:
+            return date.fromisoformat(stored["anchor"])
+    anchor = anchor or datetime.now(timezone.utc).date()
+    await db[SEED_ANCHORS].replace_one({"_id": seed}, {"_id": seed, "anchor": anchor.isoformat()}, upsert=True)
+    return anchor
+
+
+async def ensure_indexes(db):
+    for name, indexes in INDEXES.items():
+        created = await db[name].create_indexes(indexes)
+        print(f"  {name}: {', '.join(created)}")
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+async def verify_query_plans(db):
+    # Fail loudly if any API query shape would scan a whole collection
+    collection_scans = []
+    for name, query, sort in QUERY_SHAPES:
+        cursor = db[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+        shape = f"{name}.find({query})" + (f".sort({sort})" if sort else "")
+        if "COLLSCAN" in stages:
+            collection_scans.append(shape)
+            print(f"  ✗ {shape}: {' <- '.join(stages)}")
+        else:
+            print(f"  ✓ {shape}: {' <- '.join(stages)}")
+    if collection_scans:
+        raise RuntimeError(f"{len(collection_scans)} query shape(s) fall back to a collection scan")
+
+
+async def provision_indexes():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
     db = client[os.environ['DB_NAME']]
-    
-    # Clear existing data
-    print("Clearing existing data...")
-    await db.users.delete_many({})
-    await db.costumes.delete_many({})
-    await db.bookings.delete_many({})
-    
-    # Create admin user
-    print("Creating admin user...")
+    try:
+        print("Creating indexes...")
+        await ensure_indexes(db)
+        print("Verifying query plans...")
+        await verify_query_plans(db)
+    finally:
+        client.close()
+
+
+def sample_users():
+    # Plain-text passwords; they are hashed on the way into the database
     admin_user = {
         "email": "admin@theatrical.com",
-        "password": pwd_context.hash("admin123"),
+        "password": "admin123",
         "name": "Admin User",
         "role": "admin",
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.users.insert_one(admin_user)
-    
-    # Create regular user
-    print("Creating test user...")
     test_user = {
         "email": "user@test.com",
-        "password": pwd_context.hash("user123"),
+        "password": "user123",
         "name": "Test User",
         "role": "user",
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.users.insert_one(test_user)
-    
-    # Create sample costumes
-    print("Creating sample costumes...")
+    return [admin_user, test_user]
+
+
+def sample_costumes():
     costumes = [
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Victorian Era Gown"),
             "name": "Victorian Era Gown",
             "description": "Elegant Victorian-era gown with intricate lace details and corset bodice. Perfect for period dramas and historical performances.",
             "category": "Period",
@@ -64,7 +507,7 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Ballet Tutu - Swan Lake"),
             "name": "Ballet Tutu - Swan Lake",
             "description": "Professional ballet tutu with layered tulle and embellished bodice. Ideal for classical ballet performances.",
             "category": "Classical",
@@ -75,7 +518,7 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Renaissance Nobleman Attire"),
             "name": "Renaissance Nobleman Attire",
             "description": "Luxurious Renaissance costume with velvet doublet, breeches, and cape. Authentic details for historical accuracy.",
             "category": "Period",
@@ -86,7 +529,7 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Modern Dramatic Ensemble"),
             "name": "Modern Dramatic Ensemble",
             "description": "Contemporary theatrical costume with dramatic silhouette. Perfect for modern performances and avant-garde productions.",
             "category": "Modern",
@@ -97,7 +540,7 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Shakespearean Hamlet Costume"),
             "name": "Shakespearean Hamlet Costume",
             "description": "Classic Shakespearean costume inspired by Hamlet productions. Includes tunic, cape, and period-appropriate accessories.",
             "category": "Classical",
@@ -108,7 +551,7 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         },
         {
-            "id": str(uuid.uuid4()),
+            "id": costume_id("Fantasy Enchanted Forest"),
             "name": "Fantasy Enchanted Forest",
             "description": "Ethereal fantasy costume with flowing fabrics and mystical elements. Ideal for fairy tale and fantasy productions.",
             "category": "Fantasy",
@@ -119,8 +562,52 @@ async def seed_database():
             "created_at": datetime.now(timezone.utc).isoformat()
         }
     ]
+    return costumes
+
+
+async def seed_database(costume_count=0, user_count=0, booking_count=0, seed=42, batch_size=5000, concurrency=8,
+                        hash_workers=None, reuse_hashes=False, incremental=False, anchor=None):
+    # Connect to MongoDB
+    mongo_url = os.environ['MONGO_URL']
+    client = AsyncIOMotorClient(mongo_url, maxPoolSize=max(concurrency, 10))
+    db = client[os.environ['DB_NAME']]
     
-    await db.costumes.insert_many(costumes)
+    if incremental:
+        # Upserts look documents up by their stable keys, so index those first
+        print("Incremental mode: only new or changed documents are written")
+        await ensure_indexes(db)
+    else:
+        # Clear existing data
+        print("Clearing existing data...")
+        await db.users.delete_many({})
+        await db.costumes.delete_many({})
+        await db.bookings.delete_many({})
+    
+    # Create admin and regular user (passwords are hashed on the way in)
+    print("Creating admin and test users...")
+    admin_user, test_user = sample_users()
+    await load_collection(db.users, [admin_user, test_user], incremental=incremental, reuse_hashes=True)
+    
+    # Create sample costumes
+    print("Creating sample costumes...")
+    costumes = sample_costumes()
+    
+    await load_collection(db.costumes, costumes, incremental=incremental)
+    
+    if costume_count or user_count or booking_count:
+        anchor = await booking_anchor(db, seed, incremental, anchor)
+        print(f"Generating bulk data (seed={seed}, bookings around {anchor})...")
+        await seed_bulk(db, costume_count, user_count, booking_count, seed=seed, batch_size=batch_size,
+                        concurrency=concurrency, sample_costumes=costumes, sample_users=[admin_user, test_user],
+                        hash_workers=hash_workers, reuse_hashes=reuse_hashes, incremental=incremental,
+                        anchor=anchor)
+    
+    # Indexes are built after the bulk load, which is faster than maintaining them per insert
+    if not incremental:
+        print("Creating indexes...")
+        await ensure_indexes(db)
+    print("Verifying query plans...")
+    await verify_query_plans(db)
     
     print("\n✓ Database seeded successfully!")
     print("\nAdmin credentials:")
@@ -129,9 +616,45 @@ async def seed_database():
     print("\nTest user credentials:")
     print("  Email: user@test.com")
     print("  Password: user123")
-    print(f"\n{len(costumes)} costumes created")
+    print(f"\n{len(costumes) + costume_count} costumes created")
     
     client.close()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the costume rental database")
+    parser.add_argument("--costumes", type=int, default=0, help="number of synthetic costumes to add")
+    parser.add_argument("--users", type=int, default=0, help="number of synthetic users to add")
+    parser.add_argument("--bookings", type=int, default=0, help="number of synthetic bookings to add")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for reproducible data")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many call")
+    parser.add_argument("--concurrency", type=int, default=8, help="insert_many calls in flight")
+    parser.add_argument("--hash-workers", type=int, default=None,
+                        help="processes hashing bulk user passwords (default: all cores)")
+    parser.add_argument("--reuse-password-hashes", action="store_true",
+                        help="hash each distinct bulk password once and share the hash across users")
+    parser.add_argument("--incremental", action="store_true",
+                        help="upsert only new or changed documents instead of clearing the database")
+    parser.add_argument("--anchor-date", type=date.fromisoformat,
+                        help="YYYY-MM-DD bulk bookings are spread around (default: the date stored for this "
+                             "--seed on incremental runs, otherwise today)")
+    parser.add_argument("--indexes-only", action="store_true",
+                        help="create indexes and verify query plans without reseeding")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    args = parse_args()
+    if args.indexes_only:
+        asyncio.run(provision_indexes())
+    else:
+        asyncio.run(seed_database(
+            costume_count=args.costumes,
+            user_count=args.users,
+            booking_count=args.bookings,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            hash_workers=args.hash_workers,
+            reuse_hashes=args.reuse_password_hashes,
+            incremental=args.incremental,
+            anchor=args.anchor_date,
+        ))
@@ -0,0 +1,44 @@
+import os
+
+from PIL import Image
+
+from build_thumbnails import THUMBNAIL_SIZES, costume_manifest, render_thumbnails, rendered
+
+BASE_URL = "https://cdn.example.com/thumbs"
+
+
+def entry(name):
+    return {"source_sha256": name, **{size: {"url": f"{BASE_URL}/{name}-{size}.webp"} for size in THUMBNAIL_SIZES}}
+
+
+def test_manifest_follows_image_order_and_skips_unrendered_images():
+    index = {"https://img/b": entry("b"), "https://img/a": entry("a")}
+    manifest = costume_manifest(["https://img/a", "https://img/missing", "https://img/b"], index)
+    assert [item["source"] for item in manifest] == ["https://img/a", "https://img/b"]
+    assert manifest[0]["small"] == index["https://img/a"]["small"]
+    # Only the sizes go into the costume, not the index's bookkeeping
+    assert set(manifest[0]) == {"source", *THUMBNAIL_SIZES}
+
+
+def test_manifest_of_a_costume_without_images_is_empty():
+    assert costume_manifest([], {"https://img/a": entry("a")}) == []
+
+
+def test_render_writes_each_size_once_under_its_hash(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    Image.new("RGB", (1600, 900), "crimson").save(fixtures / "photo-1.jpg")
+    output = tmp_path / "out"
+
+    first = render_thumbnails("https://images.example.com/photo-1?w=2000", str(output), BASE_URL, str(fixtures))
+    assert (first["medium"]["width"], first["medium"]["height"]) == (640, 360)
+    assert (first["small"]["width"], first["small"]["height"]) == (240, 135)
+    assert rendered(str(output), BASE_URL, first)
+
+    # Re-rendering the same source reuses the same content-addressed files
+    again = render_thumbnails("https://images.example.com/photo-1", str(output), BASE_URL, str(fixtures))
+    assert again == first
+    assert sum(len(files) for _, _, files in os.walk(output)) == len(THUMBNAIL_SIZES)
+
+    os.remove(output / first["small"]["url"].removeprefix(BASE_URL + "/"))
+    assert not rendered(str(output), BASE_URL, first)
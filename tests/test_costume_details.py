@@ -0,0 +1,46 @@
+import httpx
+
+from backend_test import CostumeRentalAPITester, run_async
+
+COSTUME_IDS = [f"c{number:03}" for number in range(10)]
+
+
+def check_details(detail_sample, broken=()):
+    requested = []
+
+    def handler(request):
+        costume_id = request.url.path.rsplit('/', 1)[-1]
+        requested.append(costume_id)
+        if costume_id in broken:
+            return httpx.Response(404)
+        return httpx.Response(200, json={'id': costume_id, 'name': f"Costume {costume_id}"})
+
+    tester = CostumeRentalAPITester("http://api.test", concurrency=4, detail_sample=detail_sample)
+    tester.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tester.quiet = True
+    tester.listed_costume_ids = list(COSTUME_IDS)
+    passed = run_async(tester, tester.test_all_costume_details())
+    return passed, sorted(requested), tester.test_results[-1]
+
+
+def test_only_the_first_detail_sample_costumes_are_fetched():
+    passed, requested, result = check_details(3)
+
+    assert passed
+    assert requested == COSTUME_IDS[:3]
+    assert (result['response_data']['checked'], result['response_data']['listed']) == (3, 10)
+
+
+def test_no_sample_checks_every_listed_costume():
+    passed, requested, _ = check_details(None)
+
+    assert passed
+    assert requested == COSTUME_IDS
+
+
+def test_a_failed_detail_fails_the_test_and_is_named():
+    passed, _, result = check_details(None, broken={'c007'})
+
+    assert not passed
+    assert "c007: status 404" in result['details']
+    assert result['response_data']['failed'] == 1
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from backend_test import leak_trend, mann_kendall_increasing
+
+
+def test_mann_kendall_matches_the_normal_approximation_by_hand():
+    # S = 10 over 5 values, variance 5 * 4 * 15 / 18
+    assert mann_kendall_increasing([1, 2, 3, 4, 5]) == pytest.approx(0.013743, abs=1e-6)
+
+
+def test_mann_kendall_only_reports_upward_trends():
+    assert mann_kendall_increasing([5, 4, 3, 2, 1]) == 1.0
+    assert mann_kendall_increasing([3] * 6) == 1.0
+
+
+def samples(values, step_s=60):
+    return [index * step_s for index in range(len(values))], values
+
+
+def test_leak_trend_flags_steady_growth():
+    rng = random.Random(1)
+    times, values = samples([100e6 * (1 + 0.002 * minute) + rng.uniform(-1e5, 1e5) for minute in range(120)])
+    trend = leak_trend(times, values)
+    assert trend["verdict"] == "rising"
+    assert trend["growth_per_hour"] == pytest.approx(0.12, rel=0.05)
+
+
+def test_leak_trend_lets_a_one_off_step_through():
+    # A pool filling up early: a significant trend by Mann-Kendall, but flat after the step
+    times, values = samples([100.0] * 20 + [150.0] * 100)
+    assert leak_trend(times, values)["verdict"] == "flat"
+
+
+def test_leak_trend_ignores_noise():
+    rng = random.Random(2)
+    times, values = samples([rng.gauss(50, 2) for _ in range(120)])
+    assert leak_trend(times, values)["verdict"] == "flat"
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from backend_test import CostumeRentalAPITester, LoadTester, TokenPool, endpoint_label
+
+
+def load_tester(handler=None, **options):
+    tester = CostumeRentalAPITester("http://api.test")
+    tokens = TokenPool(tester.api_url, {'user': [], 'admin': []}, cache_path=None)
+    load = LoadTester(tester, tokens=tokens, seed=1, **options)
+    return load, httpx.AsyncClient(transport=httpx.MockTransport(handler or (lambda request: httpx.Response(200))))
+
+
+def test_rate_ramps_linearly_from_one_request_a_second():
+    load, _ = load_tester(rate=40.0, ramp_up=10.0)
+
+    assert load.current_rate(0) == 1.0
+    assert load.current_rate(5) == 20.0
+    assert load.current_rate(10) == 40.0
+    assert load.current_rate(60) == 40.0
+
+
+def test_dispatch_counts_iterations_no_virtual_user_was_free_for():
+    load, _ = load_tester(rate=200.0, duration=0.25, ramp_up=0)
+    queue = asyncio.Queue(maxsize=5)
+
+    asyncio.run(load.dispatch(queue))
+
+    # Nothing takes from the queue, so all but the first five scheduled iterations are dropped
+    assert queue.qsize() == 5
+    assert queue.qsize() + load.dropped == 50
+
+
+def test_expected_conflicts_are_recorded_but_not_counted_as_errors():
+    statuses = iter([201, 409, 500])
+    load, client = load_tester(lambda request: httpx.Response(next(statuses)))
+
+    async def book():
+        async with client:
+            for _ in range(3):
+                await load.request(client, 'POST', 'bookings', {}, expected_statuses=(409,))
+
+    asyncio.run(book())
+
+    label = endpoint_label('POST', 'bookings')
+    assert load.statuses[label] == {201: 1, 409: 1, 500: 1}
+    assert load.errors[label] == 1
+    assert load.report()['booking_conflicts'] == 1
@@ -0,0 +1,60 @@
+import sys
+import threading
+
+import pytest
+
+from local_server import MemoryStore
+
+
+@pytest.fixture
+def fast_switching():
+    # Thread switches mid-iteration are what break an unlocked dict walk, so make them frequent
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def costume(number):
+    return {"id": f"c{number:06}", "name": f"Costume {number}", "category": "Period", "description": ""}
+
+
+def booking(number):
+    return {"id": f"b{number:06}", "user_email": "user@test.com", "costume_id": f"c{number:06}", "size": "M",
+            "start_date": "2026-11-01", "end_date": "2026-11-02", "status": "pending",
+            "created_at": f"2026-10-18T00:00:{number % 60:02}"}
+
+
+def test_reads_survive_concurrent_inserts(fast_switching):
+    store = MemoryStore()
+    for number in range(20000):
+        store.costumes[costume(number)["id"]] = costume(number)
+        store.bookings[booking(number)["id"]] = booking(number)
+    writing = True
+    errors = []
+
+    def write():
+        nonlocal writing
+        for number in range(20000, 20400):
+            store.insert_costume(costume(number))
+            store.insert_booking_if_available(booking(number))
+        writing = False
+
+    def read():
+        try:
+            while writing:
+                store.list_costumes(category="Period")
+                store.user_bookings("user@test.com")
+                store.all_bookings()
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store.list_costumes()) == 20400
+    assert len(store.user_bookings("user@test.com")) == 20400
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+from profiling import UNMATCHED, match_requests, query_breakdown, query_shape
+
+
+def at(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def test_find_shape_hides_values_and_keeps_the_sort():
+    entry = {"ns": "rental.bookings", "op": "query",
+             "command": {"find": "bookings", "filter": {"user_email": "a@b.c", "status": {"$in": ["x", "y"]}},
+                         "sort": {"created_at": -1}}}
+    assert query_shape(entry) == ("bookings", "find",
+                                  '{"user_email": "?", "status": {"$in": "?"}} sort {"created_at": "?"}')
+
+
+def test_queries_differing_only_in_values_share_a_shape():
+    first = {"ns": "rental.costumes", "op": "query", "command": {"find": "costumes", "filter": {"id": "1"}}}
+    second = {"ns": "rental.costumes", "op": "query", "command": {"find": "costumes", "filter": {"id": "2"}}}
+    assert query_shape(first) == query_shape(second)
+
+
+def test_aggregate_shape_lists_its_stages():
+    entry = {"ns": "rental.bookings", "op": "command",
+             "command": {"aggregate": "bookings", "pipeline": [
+                 {"$match": {"$or": [{"costume_id": "a"}, {"size": "M"}]}}, {"$group": {"_id": "$status"}}]}}
+    assert query_shape(entry) == ("bookings", "aggregate",
+                                  '$match {"$or": [{"costume_id": "?"}, {"size": "?"}]} | $group')
+
+
+def test_get_more_counts_against_the_query_that_opened_the_cursor():
+    entry = {"ns": "rental.costumes", "op": "getmore", "command": {"getMore": 1, "collection": "costumes"},
+             "originatingCommand": {"find": "costumes", "filter": {"category": "Period"}}}
+    assert query_shape(entry) == ("costumes", "find getMore", '{"category": "?"}')
+
+
+def test_updates_and_inserts_keep_their_operation():
+    entry = {"ns": "rental.bookings", "op": "update", "command": {"q": {"id": "x"}, "u": {"$set": {}}}}
+    assert query_shape(entry) == ("bookings", "update", '{"id": "?"}')
+    assert query_shape({"ns": "rental.bookings", "op": "insert", "command": {"insert": "bookings"}}) == \
+        ("bookings", "insert", "")
+
+
+def test_entries_match_the_latest_request_running_at_the_time():
+    requests = [("GET /a", 100.0, 100.5), ("GET /b", 100.2, 100.3), ("GET /c", 101.0, 101.1)]
+    entries = [{"ts": at(100.1)}, {"ts": at(100.25)}, {"ts": at(100.4)}, {"ts": at(100.8)},
+               # Naive timestamps are UTC, as pymongo returns them by default
+               {"ts": at(101.05).replace(tzinfo=None)}]
+    assert [route for route, _ in match_requests(entries, requests)] == ["GET /a", "GET /b", "GET /a", UNMATCHED,
+                                                                        "GET /c"]
+
+
+def test_millisecond_timestamps_still_land_in_their_request():
+    # The profiler truncates to milliseconds, so an entry can appear to start just before its request
+    requests = [("GET /a", 100.0005, 100.0100)]
+    assert match_requests([{"ts": at(100.0)}], requests)[0][0] == "GET /a"
+
+
+def test_breakdown_groups_by_route_and_shape():
+    requests = [("GET /a", 0, 1), ("GET /a", 2, 3)]
+    find = {"ns": "rental.costumes", "op": "query", "command": {"find": "costumes", "filter": {"id": "1"}},
+            "millis": 3, "docsExamined": 100, "keysExamined": 0, "nreturned": 1, "planSummary": "COLLSCAN"}
+    matched = [("GET /a", find), ("GET /a", {**find, "millis": 5})]
+    [query] = query_breakdown(matched, requests)["GET /a"]
+    assert query["calls"] == 2 and query["millis"] == 8 and query["per_request"] == 1.0
+    assert query["collection_scan"] and query["examined_per_returned"] == 100.0
+    assert query["plans"] == ["COLLSCAN"]
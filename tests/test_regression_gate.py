@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from backend_test import compare_results, endpoint_label, mann_whitney_greater
+
+
+def test_mann_whitney_matches_the_normal_approximation_by_hand():
+    # U = 9 of a possible 9, mean 4.5, variance 3 * 3 / 12 * 7 = 5.25, with continuity correction
+    assert mann_whitney_greater([4, 5, 6], [1, 2, 3]) == pytest.approx(0.040428, abs=1e-6)
+    assert mann_whitney_greater([1, 2, 3], [4, 5, 6]) == pytest.approx(0.985452, abs=1e-6)
+
+
+def test_mann_whitney_without_any_spread_finds_nothing():
+    assert mann_whitney_greater([5.0] * 5, [5.0] * 5) == 1.0
+
+
+def test_mann_whitney_ranks_ties_together():
+    # Shifting every value of both samples by the same amount leaves the ranks, and the p-value, unchanged
+    current, baseline = [2, 3, 3, 4, 5, 5], [1, 2, 2, 3, 3, 4]
+    assert mann_whitney_greater(current, baseline) == pytest.approx(
+        mann_whitney_greater([v + 10 for v in current], [v + 10 for v in baseline]))
+    assert 0.01 < mann_whitney_greater(current, baseline) < 0.2
+
+
+def run(latencies_by_endpoint):
+    return {"results": [{"timings": [{"endpoint": endpoint, "status": 200, "total_ms": ms} for ms in latencies]}
+                        for endpoint, latencies in latencies_by_endpoint.items()]}
+
+
+def test_compare_results_flags_only_significant_and_material_slowdowns():
+    rng = random.Random(3)
+    baseline = run({"GET /slower": [rng.gauss(100, 5) for _ in range(40)],
+                    "GET /same": [rng.gauss(100, 5) for _ in range(40)],
+                    "GET /rare": [100.0] * 3})
+    current = run({"GET /slower": [rng.gauss(140, 5) for _ in range(40)],
+                   "GET /same": [rng.gauss(102, 5) for _ in range(40)],
+                   "GET /rare": [500.0] * 3})
+    comparison = compare_results(baseline, current, threshold=0.2, alpha=0.01, min_samples=5)
+    assert comparison["regressions"] == ["GET /slower"]
+    assert comparison["endpoints"]["GET /same"]["verdict"] == "ok"
+    assert comparison["endpoints"]["GET /rare"]["verdict"] == "insufficient samples"
+
+
+def test_compare_results_ignores_failed_requests():
+    baseline = run({"GET /a": [10.0] * 10})
+    current = run({"GET /a": [10.0] * 10})
+    current["results"][0]["timings"] += [{"endpoint": "GET /a", "status": 500, "total_ms": 9000.0}] * 10
+    assert compare_results(baseline, current)["regressions"] == []
+
+
+def test_endpoint_labels_group_record_ids_together():
+    assert endpoint_label('GET', 'costumes/1554fade-1eed-5424-a217-048fceb8013e') == 'GET /api/costumes/{id}'
+    assert endpoint_label('PUT', 'bookings/65f1c2b9e3a4d4e5f8a7b9c0/status') == 'PUT /api/bookings/{id}/status'
+    assert endpoint_label('GET', 'costumes', {'search': 'x', 'limit': 20}) == 'GET /api/costumes?limit=&search='
+    assert endpoint_label('GET', 'admin/bookings/summary') == 'GET /api/admin/bookings/summary'
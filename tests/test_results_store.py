@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from results_store import COLUMNS, ResultsStore, endpoint_summary, new_run_id
+
+
+def row(endpoint, total_ms, status=200, at=1_700_000_000.5):
+    return {"at": at, "test": "t", "endpoint": endpoint, "status": status, "total_ms": total_ms,
+            "ttfb_ms": total_ms / 2, "connect_ms": 0.0, "tls_ms": 0.0, "dns_ms": None,
+            "size_bytes": 10, "reused_connection": True}
+
+
+def test_endpoint_summary_leaves_errors_out_of_the_percentiles():
+    rows = [row("GET /api/costumes", ms) for ms in (10.0, 20.0, 30.0, 40.0)]
+    rows += [row("GET /api/costumes", 5000.0, status=500), row("GET /api/costumes", 1.0, status=None)]
+    summary = endpoint_summary(rows)["GET /api/costumes"]
+    assert summary == {"requests": 6, "errors": 2, "mean_ms": 25.0, "p50_ms": 20.0,
+                       "p95_ms": 40.0, "p99_ms": 40.0, "max_ms": 40.0}
+
+
+def test_endpoint_summary_of_an_endpoint_that_only_failed():
+    summary = endpoint_summary([row("POST /api/bookings", 3.0, status=409)])["POST /api/bookings"]
+    assert summary["requests"] == 1 and summary["errors"] == 1
+    assert summary["mean_ms"] == summary["max_ms"] == 0.0
+
+
+def test_run_ids_sort_by_start_time():
+    earlier = new_run_id(datetime(2026, 10, 18, 9, 59, 59, tzinfo=timezone.utc))
+    later = new_run_id(datetime(2026, 10, 18, 10, 0, 0, tzinfo=timezone.utc))
+    assert earlier.startswith("20261018T095959Z-")
+    assert earlier < later
+    # Runs started in the same second still get distinct ids
+    assert new_run_id(datetime(2026, 10, 18, tzinfo=timezone.utc)) != new_run_id(datetime(2026, 10, 18,
+                                                                                         tzinfo=timezone.utc))
+
+
+def append(store, started_at, mode, rows):
+    return store.append({"run_id": f"{started_at}-run", "started_at": started_at, "mode": mode}, rows)
+
+
+def test_append_indexes_the_run_and_round_trips_its_rows(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    rows = [row("GET /api/costumes", 12.3456, at=1_700_000_000.25), row("GET /api/costumes/{id}", 7.0, status=404)]
+    entry = append(store, "2026-10-18T10:00:00+00:00", "functional", rows)
+
+    assert entry["requests"] == 2
+    assert entry["segment"].startswith(os.path.join("segments", "2026-10"))
+    assert [run["run_id"] for run in store.runs()] == [entry["run_id"]]
+    with gzip.open(tmp_path / entry["segment"], "rt") as f:
+        assert json.loads(f.readline())["columns"] == COLUMNS
+
+    stored = list(store.requests(entry["run_id"]))
+    assert [r["total_ms"] for r in stored] == [12.35, 7.0]
+    assert stored[0]["dns_ms"] is None
+    assert list(store.requests(entry["run_id"], endpoint="GET /api/costumes/{id}"))[0]["status"] == 404
+    assert store.samples(entry["run_id"]) == {"GET /api/costumes": [12.35]}
+
+
+def test_runs_filter_by_mode_start_and_count(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    append(store, "2026-10-01T00:00:00+00:00", "functional", [row("GET /api/costumes", 10.0)])
+    append(store, "2026-10-02T00:00:00+00:00", "load", [row("GET /api/costumes", 30.0)])
+    append(store, "2026-10-03T00:00:00+00:00", "functional", [row("GET /api/costumes", 20.0)])
+    append(store, "2026-10-04T00:00:00+00:00", "functional", [])
+
+    assert len(store.runs(mode="functional")) == 3
+    assert [run["started_at"][:10] for run in store.runs(since="2026-10-02")] == ["2026-10-02", "2026-10-03",
+                                                                                 "2026-10-04"]
+    assert [run["mode"] for run in store.runs(last=2)] == ["functional", "functional"]
+    assert [value for _, _, value in store.trend("GET /api/costumes", "p50_ms", mode="functional")] == [10.0, 20.0]
+    assert "segment" not in store.runs()[-1]
+
+
+def test_a_missing_store_has_no_runs(tmp_path):
+    store = ResultsStore(str(tmp_path / "absent"))
+    assert store.runs() == []
+    assert list(store.requests("nope")) == []
+
+
+def test_a_results_file_reads_its_latencies_back_from_the_history(tmp_path):
+    from backend_test import latency_samples
+
+    store = ResultsStore(str(tmp_path))
+    entry = append(store, "2026-10-18T10:00:00+00:00", "functional",
+                   [row("GET /api/costumes", 10.0), row("GET /api/costumes", 9000.0, status=500)])
+    results = {"results": [{"test": "t", "success": True}], "run_id": entry["run_id"], "history": str(tmp_path)}
+    assert latency_samples(results) == {"GET /api/costumes": [10.0]}
+    # Without a history the rows are in the file itself
+    assert latency_samples({"requests": [row("GET /api/costumes", 12.0)]}) == {"GET /api/costumes": [12.0]}
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from backend_test import CostumeRentalAPITester
+
+
+class RecordingTester(CostumeRentalAPITester):
+    """Runs plan steps as short sleeps, recording when each starts and finishes"""
+
+    def __init__(self):
+        super().__init__("http://api.test")
+        self.events = []
+        self.running = self.peak = 0
+
+    async def run_test(self, name):
+        self.events.append(('start', name))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        self.events.append(('finish', name))
+
+
+def run(plan, workers):
+    tester = RecordingTester()
+    asyncio.run(tester.run_plan(plan, workers))
+    return tester
+
+
+def test_consumers_start_only_after_their_producers_finish():
+    plan = [
+        ('login', [], ['token']),
+        ('create', ['token'], ['costume_id']),
+        ('book', ['token', 'costume_id'], []),
+        ('list', [], []),
+    ]
+
+    events = run(plan, workers=4).events
+
+    assert events.index(('finish', 'login')) < events.index(('start', 'create'))
+    assert events.index(('finish', 'create')) < events.index(('start', 'book'))
+    # Nothing list consumes, so it doesn't queue behind the chain
+    assert events.index(('start', 'list')) < events.index(('finish', 'login'))
+
+
+def test_no_more_than_workers_tests_run_at_once():
+    plan = [(f"test_{number}", [], []) for number in range(6)]
+
+    tester = run(plan, workers=2)
+
+    assert tester.peak == 2
+    assert sum(kind == 'finish' for kind, _ in tester.events) == 6
+
+
+def test_cyclic_dependencies_are_reported():
+    plan = [('a', ['from_b'], ['from_a']), ('b', ['from_a'], ['from_b'])]
+
+    with pytest.raises(ValueError, match="Unsatisfiable"):
+        run(plan, workers=2)
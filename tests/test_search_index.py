@@ -0,0 +1,86 @@
+from search_index import SearchIndex, deletion_variants, edit_distance, max_edits
+
+
+def costume(costume_id, name, category="Period", description=""):
+    return {"id": costume_id, "name": name, "category": category, "description": description}
+
+
+def build(*documents):
+    index = SearchIndex()
+    for document in documents:
+        index.add(document)
+    return index
+
+
+def ids(results):
+    return [document_id for _, document_id in results]
+
+
+def test_edit_distance_counts_a_transposition_as_one_edit():
+    assert edit_distance("victorian", "victorain") == 1
+    assert edit_distance("gown", "gwon") == 1
+    assert edit_distance("kimono", "kimomo") == 1
+    assert edit_distance("cloak", "clock") == 1
+    assert edit_distance("dress", "") == 5
+
+
+def test_deletion_variants_cover_up_to_the_allowed_edits():
+    assert deletion_variants("gown", 0) == {"gown"}
+    assert deletion_variants("gown", 1) == {"gown", "own", "gwn", "gon", "gow"}
+    assert "gn" in deletion_variants("gown", 2)
+    assert [max_edits(term) for term in ("tutu", "gown", "baroque", "victorian", "ab")] == [1, 1, 1, 2, 0]
+
+
+def test_exact_matches_outrank_prefix_and_typo_matches():
+    index = build(costume("a", "Velvet Gown"), costume("b", "Gowned Dancer"), costume("c", "Town Crier"))
+    assert ids(index.search("gown")) == ["a", "b", "c"]
+
+
+def test_field_weights_rank_name_above_description():
+    index = build(costume("a", "Cloak", description="a warm gown"), costume("b", "Gown", description="a warm cloak"))
+    assert ids(index.search("gown")) == ["b", "a"]
+
+
+def test_every_query_term_must_match():
+    index = build(costume("a", "Victorian Gown"), costume("b", "Victorian Cloak"))
+    assert ids(index.search("victorian gown")) == ["a"]
+    assert index.search("victorian tutu") == []
+    assert index.search("!!") == []
+
+
+def test_short_terms_only_match_exactly():
+    index = build(costume("a", "Art Deco Dress"), costume("b", "Arthurian Knight"))
+    assert ids(index.search("a")) == []
+    assert ids(index.search("art")) == ["a", "b"]
+
+
+def test_pages_after_a_position_cover_every_match_once():
+    index = build(*(costume(f"{n:02}", f"Pirate Outfit {n}") for n in range(7)))
+    seen = []
+    after = None
+    while True:
+        page = index.search("pirate", limit=3, after=after)
+        if not page:
+            break
+        seen += ids(page)
+        after = page[-1]
+    assert seen == [f"{n:02}" for n in range(7)]
+
+
+def test_accept_filters_before_the_limit():
+    index = build(costume("a", "Silk Kimono", "Asian"), costume("b", "Silk Kimono", "Asian"),
+                  costume("c", "Silk Gown"))
+    assert ids(index.search("silk", limit=1, accept=lambda document_id: document_id == "c")) == ["c"]
+
+
+def test_readding_replaces_and_removing_forgets_terms():
+    index = build(costume("a", "Steampunk Aviator"))
+    index.add(costume("a", "Gothic Cloak"))
+    assert index.search("steampunk") == []
+    assert ids(index.search("gothic")) == ["a"]
+
+    index.remove("a")
+    assert len(index) == 0
+    assert index.vocabulary == []
+    assert not index.variants
+    assert index.search("gothic") == []
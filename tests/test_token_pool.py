@@ -0,0 +1,102 @@
+import asyncio
+import base64
+import json
+import os
+import stat
+import time
+
+import httpx
+
+from backend_test import TokenPool
+
+
+def jwt(expires_in):
+    claims = base64.urlsafe_b64encode(json.dumps({'exp': time.time() + expires_in}).encode()).decode().rstrip('=')
+    return f"header.{claims}.signature"
+
+
+class AuthServer:
+    """Just enough of /auth for the pool: registered accounts log in, others get a 401"""
+
+    def __init__(self, expires_in=3600, registered=()):
+        self.expires_in = expires_in
+        self.registered = set(registered)
+        self.calls = []
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        self.calls.append((request.url.path, body['email']))
+        if request.url.path.endswith('/auth/register'):
+            self.registered.add(body['email'])
+        elif body['email'] not in self.registered:
+            return httpx.Response(401)
+        return httpx.Response(200, json={'access_token': jwt(self.expires_in)})
+
+
+def tokens(pool, server, count, role='user'):
+    async def take():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+            return [await pool.token(client, role) for _ in range(count)]
+
+    return asyncio.run(take())
+
+
+def accounts(*emails):
+    return {'user': [{'email': email, 'password': 'pw', 'name': email} for email in emails]}
+
+
+def test_each_account_logs_in_once_and_its_token_is_reused():
+    server = AuthServer(registered={'a@test.com', 'b@test.com'})
+    pool = TokenPool("http://api.test/api", accounts('a@test.com', 'b@test.com'), cache_path=None)
+
+    issued = tokens(pool, server, 6)
+
+    assert len(server.calls) == 2
+    assert issued[0::2] == [issued[0]] * 3 and issued[1::2] == [issued[1]] * 3
+    assert pool.stats() == {'accounts': 2, 'logins': 2, 'registrations': 0, 'reused': 4}
+
+
+def test_tokens_about_to_expire_are_refreshed():
+    server = AuthServer(expires_in=30, registered={'a@test.com'})
+    pool = TokenPool("http://api.test/api", accounts('a@test.com'), cache_path=None, refresh_margin=60)
+
+    tokens(pool, server, 3)
+
+    assert pool.logins == 3 and pool.reused == 0
+
+
+def test_unknown_accounts_are_registered_once():
+    server = AuthServer()
+    pool = TokenPool("http://api.test/api", accounts('new@test.com'), cache_path=None)
+
+    tokens(pool, server, 3)
+
+    assert [path for path, _ in server.calls] == ['/api/auth/login', '/api/auth/register']
+    assert pool.registrations == 1
+
+
+def test_cached_tokens_survive_a_new_pool_and_the_file_is_private(tmp_path):
+    path = str(tmp_path / "cache" / "tokens.json")
+    server = AuthServer(registered={'a@test.com'})
+    pool = TokenPool("http://api.test/api", accounts('a@test.com'), cache_path=path)
+    first = tokens(pool, server, 1)
+    pool.save()
+
+    again = TokenPool("http://api.test/api", accounts('a@test.com'), cache_path=path)
+
+    assert tokens(again, server, 1) == first
+    assert len(server.calls) == 1
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_servers_whose_tokens_all_expired_leave_the_cache(tmp_path):
+    path = str(tmp_path / "tokens.json")
+    with open(path, 'w') as f:
+        json.dump({"http://old.test/api": {'a@test.com': {'token': 't', 'expires_at': time.time() - 1}}}, f)
+    pool = TokenPool("http://api.test/api", accounts('a@test.com'), cache_path=path)
+    tokens(pool, AuthServer(registered={'a@test.com'}), 1)
+
+    pool.save()
+
+    with open(path) as f:
+        assert list(json.load(f)) == ["http://api.test/api"]